@@ -7,6 +7,8 @@ Baseado no projeto original que funcionava
 import pandas as pd
 from datetime import datetime
 
+from extrato_parquet import EXTRATOS_DIR_PADRAO, ler_planilha
+
 def analyze_original_project():
     """Analisar o projeto original para entender o padrão correto"""
     
@@ -96,7 +98,7 @@ def analyze_ts09_data():
     print("-" * 70)
     
     try:
-        df = pd.read_excel('TS.09 VERSION 01 - SEPT 2025 - YYZ.xls')
+        df = ler_planilha('TS.09 VERSION 01 - SEPT 2025 - YYZ.xls', cache_dir=EXTRATOS_DIR_PADRAO)
         
         print(f"Total de voos: {len(df)}")
         
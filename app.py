@@ -1,9 +1,187 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import io
 import os
-from sirium_to_ssim_converter import gerar_ssim_sirium, gerar_ssim_todas_companias, gerar_ssim_multiplas_companias
+import time
+from concurrent.futures import ThreadPoolExecutor
 from version import get_version_info
+from cache_companhias import CACHE_DIR_PADRAO
+from extrato_parquet import EXTRATOS_DIR_PADRAO, ler_planilha
+from conversao_background import (submeter_conversao, conversao_pre_codificada, cancelar_conversao, taxa_linhas,
+                                  fracao_concluida, tabela_rejeitadas)
+from blocos_upload import codificar_blocos
+from companhias import codigos_companhia
+from validacao import MOTIVOS
+from resumo_upload import resumir_upload, metricas_selecao
+from indice_estacoes import SENTIDOS, estacoes_disponiveis, indexar_estacoes, posicoes_estacoes
+
+@st.cache_resource
+def obter_executor():
+    """Executor compartilhado entre as sessões para as conversões em segundo plano"""
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_data(max_entries=4, show_spinner="Reading schedule...")
+def carregar_upload(conteudo, nome):
+    """
+    Leitura, resumo e índice de estações do extrato (Excel, CSV ou Parquet), uma vez por arquivo enviado
+    (as interações da página e a conversão reaproveitam)
+    """
+    df = ler_planilha(io.BytesIO(conteudo), header=4, nome=nome)
+    return df, resumir_upload(df), indexar_estacoes(df)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def pre_codificar_upload(conteudo, nome):
+    """
+    Blocos tipo 3 de cada companhia do upload, codificados em segundo plano uma vez por arquivo
+    (ver blocos_upload): a troca de modo/seleção só monta o arquivo a partir deles
+    """
+    df, _, _ = carregar_upload(conteudo, nome)
+    return obter_executor().submit(codificar_blocos, df)
+
+def rotulo_companhia(resumo, codigo):
+    """'EK – Emirates' para as companhias do iata_airlines.csv, só o código para as demais"""
+    nome = resumo['nomes_companhias'].get(codigo)
+    return f"{codigo} – {nome}" if nome else codigo
+
+def mostrar_conversao(job, available_airlines):
+    """Barra de progresso (com cancelamento) enquanto o job roda; resultado quando termina"""
+    if job['status'] == 'processando':
+        texto = f"Converting {job['label']} schedule to SSIM..."
+        if job['etapa']:
+            texto += f" [{job['etapa']}]"
+        if job['total']:
+            texto += f" {job['processadas']:,}/{job['total']:,} rows"
+        if job['companhia']:
+            texto += f" • {job['companhia']}"
+        texto += f" • {taxa_linhas(job):,.0f} rows/s"
+        st.progress(fracao_concluida(job), text=texto)
+        
+        if st.button("⏹️ Cancel conversion", use_container_width=True):
+            cancelar_conversao(job)
+        
+        # Atualizar a página até o job terminar
+        time.sleep(0.5)
+        st.rerun()
+    
+    elif job['status'] == 'cancelado':
+        st.warning("⏹️ Conversion cancelled")
+    
+    elif job['status'] == 'concluido':
+        duracao = job['fim'] - job['inicio']
+        st.caption(f"⏱️ {duracao:.1f}s • {job['processadas']:,} rows • {taxa_linhas(job):,.0f} rows/s")
+        if job['estacoes']:
+            st.caption(f"📍 Stations {', '.join(job['estacoes']['estacoes'])}: {job['estacoes']['linhas_saida']:,} of "
+                       f"{job['estacoes']['linhas_entrada']:,} rows")
+        if job['codeshare']:
+            codeshare = job['codeshare']
+            st.caption(f"✂️ Operating carrier only: {codeshare['removidas'] - codeshare['sem_operadora']:,} codeshare "
+                       f"duplicates removed ({codeshare['linhas_entrada']:,} → {codeshare['linhas_saida']:,} rows, "
+                       f"-{codeshare['reducao']:.1%})")
+            if codeshare['sem_operadora']:
+                st.caption(f"⚠️ {codeshare['sem_operadora']:,} codeshare rows dropped: the operating carrier's own "
+                           f"row is not in the extract")
+        mostrar_resultado_conversao(job['resultado'], job['modo'], job['companhias'], job['selected_airline'], available_airlines)
+        mostrar_rejeitadas(job)
+    
+    else:
+        st.error("❌ Conversion failed. Please check your data and try again.")
+        if job['erro']:
+            st.error(f"❌ Conversion error: {job['erro']}")
+
+def mostrar_rejeitadas(job):
+    """Resumo das linhas rejeitadas por motivo, com a tabela completa para conferência"""
+    if not job['motivos']:
+        return
+    total = sum(job['motivos'].values())
+    with st.expander(f"🚫 {total:,} rejected rows"):
+        for motivo, quantidade in sorted(job['motivos'].items(), key=lambda item: -item[1]):
+            st.write(f"**{motivo}** ({quantidade:,}): {MOTIVOS.get(motivo, motivo)}")
+        st.dataframe(tabela_rejeitadas(job), use_container_width=True, hide_index=True)
+
+def mostrar_resultado_conversao(result, conversion_mode, selected_airlines, selected_airline, available_airlines):
+    """Download, estatísticas, validação e prévia do SSIM gerado"""
+    st.success("✅ SSIM conversion completed successfully!")
+    st.info(f"📄 Generated file: {result}")
+
+    # Offer download
+    with open(result, 'rb') as file:
+        st.download_button(
+            label="📥 Download SSIM File",
+            data=file.read(),
+            file_name=os.path.basename(result),
+            mime="text/plain",
+            type="primary",
+            use_container_width=True
+        )
+
+    # Conversion Statistics
+    st.subheader("📊 Conversion Statistics")
+
+    # Read generated file for stats
+    with open(result, 'r') as f:
+        ssim_lines = f.readlines()
+
+    flight_lines = [line for line in ssim_lines if line.startswith('3 ')]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("📄 SSIM Lines", len(ssim_lines))
+    with col2:
+        st.metric("✈️ Flight Records", len(flight_lines))
+    with col3:
+        if conversion_mode == "ALL_COMPANIES":
+            st.metric("🏢 Airlines", f"{len(available_airlines)} companies")
+        elif conversion_mode == "MULTIPLE":
+            st.metric("🏢 Airlines", f"{len(selected_airlines)} selected")
+        else:
+            st.metric("🏢 Airline", selected_airline)
+    with col4:
+        st.metric("📁 File Size", f"{os.path.getsize(result)} bytes")
+
+    # SSIM Validation
+    st.subheader("✅ SSIM Format Validation")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("**Line Length Validation:**")
+        valid_lines = 0
+        for line in ssim_lines[:10]:  # Check first 10 lines
+            if len(line.rstrip()) == 200:
+                valid_lines += 1
+
+        if valid_lines == len(ssim_lines[:10]):
+            st.success(f"✅ All lines have correct length (200 chars)")
+        else:
+            st.warning(f"⚠️ {valid_lines}/{len(ssim_lines[:10])} lines have correct length")
+
+    with col2:
+        st.write("**SSIM Structure:**")
+        has_header = any(line.startswith('1') for line in ssim_lines)
+        has_carrier = any(line.startswith('2U') for line in ssim_lines)
+        has_flights = any(line.startswith('3 ') for line in ssim_lines)
+        has_footer = any(line.startswith('5 ') for line in ssim_lines)
+
+        st.write(f"Header (1): {'✅' if has_header else '❌'}")
+        st.write(f"Carrier (2U): {'✅' if has_carrier else '❌'}")
+        st.write(f"Flights (3): {'✅' if has_flights else '❌'}")
+        st.write(f"Footer (5): {'✅' if has_footer else '❌'}")
+
+    # Show SSIM preview
+    st.subheader("👀 SSIM File Preview")
+
+    # Show first 50 lines for preview
+    preview_lines = []
+    line_count = 0
+    for line in ssim_lines:
+        preview_lines.append(line.rstrip())
+        line_count += 1
+        if line_count >= 50:  # Show max 50 lines
+            break
+
+    st.code("\\n".join(preview_lines), language="text")
+
 
 def main():
     st.set_page_config(
@@ -111,9 +289,9 @@ def main():
     # File Upload Section
     st.subheader("📁 Upload Schedule File")
     uploaded_file = st.file_uploader(
-        "Select Excel file with CIRIUM schedule:",
-        type=['xlsx', 'xls'],
-        help="Upload Excel file containing schedule in CIRIUM format (header on row 5)"
+        "Select CIRIUM schedule file:",
+        type=['xlsx', 'xls', 'csv', 'parquet'],
+        help="Upload the CIRIUM schedule as Excel (header on row 5) or as a CSV/Parquet export with the same columns (header on the first row)"
     )
     
     if uploaded_file is not None:
@@ -125,44 +303,17 @@ def main():
             with open(temp_file_path, "wb") as f:
                 f.write(uploaded_file.getbuffer())
             
-            # Read and analyze data
-            df = pd.read_excel(temp_file_path, header=4)
+            # Read and analyze data (cached per upload)
+            df, resumo, indice = carregar_upload(uploaded_file.getvalue(), uploaded_file.name)
             
             st.subheader("👀 Data Preview")
             
-            # Find airline column
-            airline_col = None
-            for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
-                if col in df.columns:
-                    airline_col = col
-                    break
+            airline_col = resumo['coluna_companhia']
             
             if airline_col:
-                # Get available airlines (filtrar apenas códigos IATA válidos)
-                try:
-                    unique_values = df[airline_col].astype(str)
-                    unique_values = unique_values[
-                        (unique_values != 'nan') & 
-                        (unique_values != '') & 
-                        (unique_values.notna())
-                    ].unique()
-                    
-                    # Filtrar apenas códigos IATA válidos (2 caracteres, letras)
-                    available_airlines = []
-                    for x in unique_values:
-                        x_str = str(x).strip().upper()
-                        if (len(x_str) == 2 and 
-                            x_str.isalpha() and 
-                            x_str not in ['nan', '', 'None', 'NA'] and
-                            'Schedule' not in x_str and
-                            'Extract' not in x_str and
-                            'Report' not in x_str):
-                            available_airlines.append(x_str)
-                    
-                    available_airlines = sorted(available_airlines)
-                except Exception as e:
-                    st.error(f"⚠️ Erro ao processar companhias: {e}")
-                    available_airlines = [str(x) for x in df[airline_col].dropna().unique()]
+                # Companhias disponíveis (apenas códigos IATA válidos)
+                available_airlines = resumo['companhias']
+                blocos_futuro = pre_codificar_upload(uploaded_file.getvalue(), uploaded_file.name)
                 
                 # Métricas profissionais
                 st.markdown("### 📊 Data Overview")
@@ -180,15 +331,16 @@ def main():
                         help="Number of valid airline codes found"
                     )
                 with col3:
-                    if 'Flight' in df.columns:
-                        unique_flights = df['Flight'].nunique()
+                    if resumo['voos_unicos'] is not None:
                         st.metric(
                             label="✈️ Unique Flights", 
-                            value=f"{unique_flights:,}",
+                            value=f"{resumo['voos_unicos']:,}",
                             help="Number of unique flight numbers"
                         )
                     else:
                         st.metric(label="✈️ Flight Records", value=f"{len(df):,}")
+                if resumo['data_inicio'] and resumo['data_fim']:
+                    st.caption(f"📅 Schedule period: {resumo['data_inicio']:%d %b %Y} – {resumo['data_fim']:%d %b %Y}")
                 
                 # Airlines disponíveis em formato mais profissional
                 st.markdown("### 🏢 Available Airlines")
@@ -201,10 +353,12 @@ def main():
                     cols = st.columns(len(row))
                     for i, airline in enumerate(row):
                         with cols[i]:
-                            airline_count = len(df[df[airline_col] == airline])
+                            airline_count = resumo['voos_por_companhia'][airline]
+                            airline_name = resumo['nomes_companhias'].get(airline) or "&nbsp;"
                             st.markdown(f"""
                             <div style="background: #f8f9fa; border: 1px solid #dee2e6; border-radius: 0.5rem; padding: 1rem; text-align: center; margin: 0.25rem 0;">
                                 <h4 style="margin: 0; color: #1f77b4; font-size: 1.2rem;">{airline}</h4>
+                                <p style="margin: 0; color: #495057; font-size: 0.8rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">{airline_name}</p>
                                 <p style="margin: 0; color: #6c757d; font-size: 0.9rem;">{airline_count:,} flights</p>
                             </div>
                             """, unsafe_allow_html=True)
@@ -212,6 +366,11 @@ def main():
                 # Seção de conversão profissional
                 st.markdown("---")
                 st.markdown("### ⚙️ Conversion Settings")
+                blocos_prontos = blocos_futuro.done() and blocos_futuro.exception() is None
+                if blocos_prontos:
+                    st.caption("⚡ Airline blocks pre-encoded: conversions are assembled instantly")
+                elif not blocos_futuro.done():
+                    st.caption("⏳ Pre-encoding airline blocks in the background...")
                 
                 # Layout melhorado para configurações
                 col1, col2 = st.columns([2, 1])
@@ -237,6 +396,7 @@ def main():
                         selected_airline = st.selectbox(
                             "Select Airline:",
                             options=available_airlines,
+                            format_func=lambda codigo: rotulo_companhia(resumo, codigo),
                             help="Choose specific airline for conversion"
                         )
                         selected_airlines = [selected_airline]
@@ -245,6 +405,7 @@ def main():
                         selected_airlines = st.multiselect(
                             "Select Airlines to Include:",
                             options=available_airlines,
+                            format_func=lambda codigo: rotulo_companhia(resumo, codigo),
                             default=[],
                             help="Choose multiple airlines to include in one SSIM file"
                         )
@@ -262,21 +423,48 @@ def main():
                         help="Leave empty for automatic naming based on selection",
                         label_visibility="collapsed"
                     )
+                    operating_only = st.checkbox(
+                        "✂️ Operating carrier only",
+                        help="One record per operated flight (carrier = Op Al); codeshare duplicates are dropped"
+                    )
+                    estacoes = estacoes_disponiveis(indice)
+                    selected_stations = st.multiselect(
+                        "📍 Stations (optional):",
+                        options=list(estacoes),
+                        format_func=lambda codigo: f"{codigo} ({estacoes[codigo]:,})",
+                        help="Only convert flights departing from or arriving at these airports"
+                    )
+                    station_direction = st.radio(
+                        "Station direction:",
+                        options=SENTIDOS,
+                        format_func=lambda x: {
+                            "ambos": "Departures + arrivals",
+                            "origem": "Departures",
+                            "destino": "Arrivals"
+                        }[x],
+                        horizontal=True,
+                        disabled=not selected_stations
+                    )
                 
-                # Filter data by selected airline(s)
+                # Filter data by selected airline(s) - métricas a partir do resumo
                 if conversion_mode == "ALL_COMPANIES":
-                    df_filtered = df  # Usar todos os dados
+                    companhias_filtro = None  # Usar todos os dados
                     display_airline = "ALL"
                 elif conversion_mode == "MULTIPLE":
+                    companhias_filtro = selected_airlines
                     if selected_airlines:
-                        df_filtered = df[df[airline_col].isin(selected_airlines)]
                         display_airline = f"{len(selected_airlines)} airlines ({', '.join(selected_airlines)})"
                     else:
-                        df_filtered = pd.DataFrame()  # DataFrame vazio se nada selecionado
                         display_airline = "None selected"
                 else:  # SINGLE
-                    df_filtered = df[df[airline_col] == selected_airline]
+                    companhias_filtro = [selected_airline]
                     display_airline = selected_airline
+                total_voos, voos_unicos, total_rotas = metricas_selecao(resumo, companhias_filtro)
+                df_base = df
+                if selected_stations:
+                    # Recorte pelo índice do upload: métricas e prévia só olham as linhas das estações
+                    df_base = df.iloc[posicoes_estacoes(indice, selected_stations, station_direction)]
+                    total_voos, voos_unicos, total_rotas = metricas_selecao(resumir_upload(df_base), companhias_filtro)
                 
                 # Show filtered data preview
                 if conversion_mode == "ALL_COMPANIES":
@@ -291,29 +479,32 @@ def main():
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("✈️ Flights", len(df_filtered))
+                    st.metric("✈️ Flights", total_voos)
                 with col2:
-                    if 'Flight' in df_filtered.columns:
-                        st.metric("🔢 Unique Flights", df_filtered['Flight'].nunique())
+                    if voos_unicos is not None:
+                        st.metric("🔢 Unique Flights", voos_unicos)
                 with col3:
-                    if 'Orig' in df_filtered.columns and 'Dest' in df_filtered.columns:
-                        routes = df_filtered[['Orig', 'Dest']].drop_duplicates()
-                        st.metric("🗺️ Routes", len(routes))
+                    if total_rotas is not None:
+                        st.metric("🗺️ Routes", total_rotas)
                 
                 # Show sample data
-                if len(df_filtered) > 0:
+                if total_voos > 0:
+                    if companhias_filtro is None:
+                        df_preview = df_base.head(10)
+                    else:
+                        df_preview = df_base[codigos_companhia(df_base[airline_col]).isin(companhias_filtro)].head(10)
                     cols_to_show = []
                     for col in ['Flight', 'Orig', 'Dest', 'Eff Date', 'Disc Date', 'Op Days']:
-                        if col in df_filtered.columns:
+                        if col in df_preview.columns:
                             cols_to_show.append(col)
                     
                     if cols_to_show:
                         st.dataframe(
-                            df_filtered[cols_to_show].head(10),
+                            df_preview[cols_to_show],
                             use_container_width=True
                         )
                     else:
-                        st.dataframe(df_filtered.head(10), use_container_width=True)
+                        st.dataframe(df_preview, use_container_width=True)
                 
                 # Data Integrity Check
                 st.subheader("🔍 Data Integrity Check")
@@ -332,16 +523,16 @@ def main():
                 
                 with col2:
                     # Check selected airline data
-                    if len(df_filtered) > 0:
+                    if total_voos > 0:
                         if conversion_mode == "ALL_COMPANIES":
-                            st.success(f"✅ {len(df_filtered)} flights found for all companies")
+                            st.success(f"✅ {total_voos} flights found for all companies")
                         elif conversion_mode == "MULTIPLE":
                             if selected_airlines:
-                                st.success(f"✅ {len(df_filtered)} flights found for {len(selected_airlines)} selected airlines")
+                                st.success(f"✅ {total_voos} flights found for {len(selected_airlines)} selected airlines")
                             else:
                                 st.warning("⚠️ Please select at least one airline")
                         else:
-                            st.success(f"✅ {len(df_filtered)} flights found for {selected_airline}")
+                            st.success(f"✅ {total_voos} flights found for {selected_airline}")
                     else:
                         if conversion_mode == "ALL_COMPANIES":
                             st.error(f"❌ No flights found for any company")
@@ -366,7 +557,7 @@ def main():
                             st.error("❌ Please select at least one airline for conversion")
                             return
                             
-                        if len(df_filtered) == 0:
+                        if total_voos == 0:
                             if conversion_mode == "ALL_COMPANIES":
                                 st.error(f"❌ Cannot convert: no flights found for any company")
                             elif conversion_mode == "MULTIPLE":
@@ -375,123 +566,52 @@ def main():
                                 st.error(f"❌ Cannot convert: no flights found for {selected_airline}")
                             return
                         
-                        # Label para spinner
+                        # Label para o progresso
                         if conversion_mode == "ALL_COMPANIES":
                             conversion_label = "all companies"
                         elif conversion_mode == "MULTIPLE":
                             conversion_label = f"{len(selected_airlines)} selected airlines ({', '.join(selected_airlines)})"
                         else:
                             conversion_label = selected_airline
+                        
+                        try:
+                            # Determine output filename
+                            if output_filename:
+                                output_file = output_filename if output_filename.endswith('.ssim') else output_filename + '.ssim'
+                            else:
+                                output_file = None
                             
-                        with st.spinner(f"Converting {conversion_label} schedule to SSIM..."):
-                            try:
-                                # Determine output filename
-                                if output_filename:
-                                    output_file = output_filename if output_filename.endswith('.ssim') else output_filename + '.ssim'
-                                else:
-                                    output_file = None
-                                
-                                # Execute conversion
-                                if conversion_mode == "ALL_COMPANIES":
-                                    result = gerar_ssim_todas_companias(temp_file_path, output_file)
-                                elif conversion_mode == "MULTIPLE":
-                                    result = gerar_ssim_multiplas_companias(temp_file_path, selected_airlines, output_file)
-                                else:  # SINGLE
-                                    result = gerar_ssim_sirium(temp_file_path, selected_airline, output_file)
-                                
-                                if result:
-                                    st.success("✅ SSIM conversion completed successfully!")
-                                    st.info(f"📄 Generated file: {result}")
-                                    
-                                    # Offer download
-                                    with open(result, 'rb') as file:
-                                        st.download_button(
-                                            label="📥 Download SSIM File",
-                                            data=file.read(),
-                                            file_name=os.path.basename(result),
-                                            mime="text/plain",
-                                            type="primary",
-                                            use_container_width=True
-                                        )
-                                    
-                                    # Conversion Statistics
-                                    st.subheader("📊 Conversion Statistics")
-                                    
-                                    # Read generated file for stats
-                                    with open(result, 'r') as f:
-                                        ssim_lines = f.readlines()
-                                    
-                                    flight_lines = [line for line in ssim_lines if line.startswith('3 ')]
-                                    
-                                    col1, col2, col3, col4 = st.columns(4)
-                                    with col1:
-                                        st.metric("📄 SSIM Lines", len(ssim_lines))
-                                    with col2:
-                                        st.metric("✈️ Flight Records", len(flight_lines))
-                                    with col3:
-                                        if conversion_mode == "ALL_COMPANIES":
-                                            st.metric("🏢 Airlines", f"{len(available_airlines)} companies")
-                                        elif conversion_mode == "MULTIPLE":
-                                            st.metric("🏢 Airlines", f"{len(selected_airlines)} selected")
-                                        else:
-                                            st.metric("🏢 Airline", selected_airline)
-                                    with col4:
-                                        st.metric("📁 File Size", f"{os.path.getsize(result)} bytes")
-                                    
-                                    # SSIM Validation
-                                    st.subheader("✅ SSIM Format Validation")
-                                    
-                                    col1, col2 = st.columns(2)
-                                    
-                                    with col1:
-                                        st.write("**Line Length Validation:**")
-                                        valid_lines = 0
-                                        for line in ssim_lines[:10]:  # Check first 10 lines
-                                            if len(line.rstrip()) == 200:
-                                                valid_lines += 1
-                                        
-                                        if valid_lines == len(ssim_lines[:10]):
-                                            st.success(f"✅ All lines have correct length (200 chars)")
-                                        else:
-                                            st.warning(f"⚠️ {valid_lines}/{len(ssim_lines[:10])} lines have correct length")
-                                    
-                                    with col2:
-                                        st.write("**SSIM Structure:**")
-                                        has_header = any(line.startswith('1') for line in ssim_lines)
-                                        has_carrier = any(line.startswith('2U') for line in ssim_lines)
-                                        has_flights = any(line.startswith('3 ') for line in ssim_lines)
-                                        has_footer = any(line.startswith('5 ') for line in ssim_lines)
-                                        
-                                        st.write(f"Header (1): {'✅' if has_header else '❌'}")
-                                        st.write(f"Carrier (2U): {'✅' if has_carrier else '❌'}")
-                                        st.write(f"Flights (3): {'✅' if has_flights else '❌'}")
-                                        st.write(f"Footer (5): {'✅' if has_footer else '❌'}")
-                                    
-                                    # Show SSIM preview
-                                    st.subheader("👀 SSIM File Preview")
-                                    
-                                    # Show first 50 lines for preview
-                                    preview_lines = []
-                                    line_count = 0
-                                    for line in ssim_lines:
-                                        preview_lines.append(line.rstrip())
-                                        line_count += 1
-                                        if line_count >= 50:  # Show max 50 lines
-                                            break
-                                    
-                                    st.code("\\n".join(preview_lines), language="text")
-                                    
-                                else:
-                                    st.error("❌ Conversion failed. Please check your data and try again.")
-                                
-                            except Exception as e:
-                                st.error(f"❌ Conversion error: {str(e)}")
-                                st.exception(e)
-                            
-                            finally:
-                                # Clean up temporary file
-                                if os.path.exists(temp_file_path):
-                                    os.remove(temp_file_path)
+                            if blocos_prontos and not operating_only and not selected_stations:
+                                # Selection assembled from the pre-encoded blocks of this upload
+                                job = conversao_pre_codificada(blocos_futuro.result(), conversion_mode,
+                                                               selected_airlines, output_file)
+                            else:
+                                # Run conversion in the background (repeated uploads are served from the disk cache)
+                                job = submeter_conversao(
+                                    obter_executor(),
+                                    temp_file_path,
+                                    conversion_mode,
+                                    selected_airlines,
+                                    output_file,
+                                    cache_blocos=CACHE_DIR_PADRAO,
+                                    cache_extrato=EXTRATOS_DIR_PADRAO,
+                                    somente_operadora=operating_only,
+                                    estacoes=selected_stations or None,
+                                    sentido_estacoes=station_direction,
+                                    indice_estacoes=indice
+                                )
+                            job['label'] = conversion_label
+                            job['selected_airline'] = selected_airline
+                            st.session_state['conversao'] = job
+                        
+                        finally:
+                            # Clean up temporary file (the job keeps its own copy)
+                            if os.path.exists(temp_file_path):
+                                os.remove(temp_file_path)
+                    
+                    # Progress / result of the current conversion
+                    if 'conversao' in st.session_state:
+                        mostrar_conversao(st.session_state['conversao'], available_airlines)
             
             else:
                 st.error("❌ Could not identify airline column in the file")
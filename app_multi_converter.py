@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import io
 import os
 
+from deteccao_formato import detectar
+
 # Importar os conversores
 try:
     from ts09_to_ssim_converter import gerar_ssim_ts09
@@ -17,39 +20,22 @@ except ImportError:
     SFO_AVAILABLE = False
 
 def detect_file_type(uploaded_file):
-    """Detecta o tipo de arquivo baseado no conteúdo"""
+    """
+    Detecta o tipo de arquivo pelos bytes iniciais e pelas primeiras linhas (sem ler a planilha inteira)
+    Retorna (tipo, confianca, excel): tipo "TS09", "SFO", "UNKNOWN" ou "ERROR"; excel é o
+    pd.ExcelFile já aberto, repassado à prévia e ao conversor
+    """
     try:
-        # Salvar arquivo temporário
-        temp_file_path = f"temp_detect_{uploaded_file.name}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        # Tentar ler como TS.09 (header padrão)
-        try:
-            df_ts09 = pd.read_excel(temp_file_path)
-            if 'Flight-Number' in df_ts09.columns and 'Onward Flight' in df_ts09.columns:
-                os.remove(temp_file_path)
-                return "TS09"
-        except:
-            pass
-        
-        # Tentar ler como SFO (header=4)
-        try:
-            df_sfo = pd.read_excel(temp_file_path, header=4)
-            if any(col in df_sfo.columns for col in ['Mkt Al', 'Op Al']) and 'Orig' in df_sfo.columns:
-                os.remove(temp_file_path)
-                return "SFO"
-        except:
-            pass
-        
-        # Limpar arquivo temporário
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-        
-        return "UNKNOWN"
-        
+        deteccao = detectar(io.BytesIO(uploaded_file.getvalue()))
+        # Extratos SFO usam o layout CIRIUM
+        tipo = "SFO" if deteccao['formato'] == "CIRIUM" else deteccao['formato']
+        return tipo, deteccao['confianca'], deteccao['excel']
     except Exception as e:
-        return "ERROR"
+        return "ERROR", 0.0, None
+
+def abrir_planilha(uploaded_file, excel=None):
+    """Planilha aberta para leitura: a da detecção ou uma nova a partir do upload (escolha manual do formato)"""
+    return excel if excel is not None else pd.ExcelFile(io.BytesIO(uploaded_file.getvalue()))
 
 def main():
     st.set_page_config(
@@ -107,21 +93,21 @@ def main():
     if uploaded_file is not None:
         # Detectar tipo de arquivo
         with st.spinner("Analisando formato do arquivo..."):
-            file_type = detect_file_type(uploaded_file)
+            file_type, confianca, excel = detect_file_type(uploaded_file)
         
         st.markdown("---")
         
         if file_type == "TS09":
-            st.success("🎯 **Formato Detectado: TS.09**")
+            st.success(f"🎯 **Formato Detectado: TS.09** (confiança {confianca:.0%})")
             if TS09_AVAILABLE:
-                handle_ts09_conversion(uploaded_file)
+                handle_ts09_conversion(uploaded_file, excel)
             else:
                 st.error("❌ Conversor TS.09 não está disponível")
                 
         elif file_type == "SFO":
-            st.success("🎯 **Formato Detectado: SFO Schedule**")
+            st.success(f"🎯 **Formato Detectado: SFO Schedule** (confiança {confianca:.0%})")
             if SFO_AVAILABLE:
-                handle_sfo_conversion(uploaded_file)
+                handle_sfo_conversion(uploaded_file, excel)
             else:
                 st.error("❌ Conversor SFO não está disponível")
                 
@@ -136,9 +122,9 @@ def main():
             )
             
             if format_choice == "TS.09 Format" and TS09_AVAILABLE:
-                handle_ts09_conversion(uploaded_file)
+                handle_ts09_conversion(uploaded_file, excel)
             elif format_choice == "SFO Format" and SFO_AVAILABLE:
-                handle_sfo_conversion(uploaded_file)
+                handle_sfo_conversion(uploaded_file, excel)
             else:
                 st.error("❌ Conversor selecionado não está disponível")
                 
@@ -174,7 +160,7 @@ def main():
         Desenvolvido pela **Capacity Dnata Brasil** para operações aéreas profissionais.
         """)
 
-def handle_ts09_conversion(uploaded_file):
+def handle_ts09_conversion(uploaded_file, excel=None):
     """Manipula conversão de arquivos TS.09"""
     st.subheader("⚙️ Configuração TS.09")
     
@@ -200,11 +186,8 @@ def handle_ts09_conversion(uploaded_file):
     
     # Prévia dos dados
     try:
-        temp_file_path = f"temp_{uploaded_file.name}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        df = pd.read_excel(temp_file_path)
+        excel = abrir_planilha(uploaded_file, excel)
+        df = pd.read_excel(excel)
         
         st.subheader("👀 Prévia dos Dados TS.09")
         
@@ -227,7 +210,7 @@ def handle_ts09_conversion(uploaded_file):
             with st.spinner("Convertendo TS.09 para SSIM..."):
                 try:
                     output_file = nome_arquivo if nome_arquivo else None
-                    resultado = gerar_ssim_ts09(temp_file_path, codigo_iata, output_file)
+                    resultado = gerar_ssim_ts09(excel, codigo_iata, output_file)
                     
                     if resultado:
                         st.success("✅ Conversão TS.09 realizada com sucesso!")
@@ -245,26 +228,19 @@ def handle_ts09_conversion(uploaded_file):
                         
                 except Exception as e:
                     st.error(f"❌ Erro na conversão TS.09: {str(e)}")
-        
-        # Limpar arquivo temporário
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
             
     except Exception as e:
         st.error(f"❌ Erro ao processar arquivo TS.09: {str(e)}")
 
-def handle_sfo_conversion(uploaded_file):
+def handle_sfo_conversion(uploaded_file, excel=None):
     """Manipula conversão de arquivos SFO"""
     st.subheader("⚙️ Configuração SFO")
     
     # Primeiro, ler arquivo para obter companhias disponíveis
     companhias_disponiveis = []
     try:
-        temp_file_path = f"temp_{uploaded_file.name}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        df_preview = pd.read_excel(temp_file_path, header=4)
+        excel = abrir_planilha(uploaded_file, excel)
+        df_preview = pd.read_excel(excel, header=4)
         
         airline_col = None
         for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
@@ -331,7 +307,7 @@ def handle_sfo_conversion(uploaded_file):
                 with st.spinner("Convertendo SFO para SSIM..."):
                     try:
                         output_file = nome_arquivo if nome_arquivo else None
-                        resultado = gerar_ssim_sfo(temp_file_path, codigo_iata, output_file)
+                        resultado = gerar_ssim_sfo(excel, codigo_iata, output_file)
                         
                         if resultado:
                             st.success("✅ Conversão SFO realizada com sucesso!")
@@ -354,9 +330,8 @@ def handle_sfo_conversion(uploaded_file):
             if companhias_disponiveis:
                 st.info(f"Companhias disponíveis: {', '.join(companhias_disponiveis)}")
     
-    # Limpar arquivo temporário
-    if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-        os.remove(temp_file_path)
+    except Exception as e:
+        st.error(f"❌ Erro ao processar arquivo SFO: {str(e)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos conversores SSIM - Dnata Brasil
+Mede tempo (relógio/CPU) e pico de memória de cada entrada gerar_ssim_* sobre planilhas sintéticas
+de 1k a 500k linhas, grava os resultados em JSON e compara com um baseline (falha em regressões)
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from gerador_sintetico import COMPANHIAS_REAIS, arquivo_sintetico
+
+TAMANHOS = (1000, 10000, 100000, 500000)
+
+# nome: (formato da planilha, módulo, argumentos antes do output_file)
+CASOS = {
+    'gerar_ssim_todas_companias': ('CIRIUM', 'sirium_to_ssim_converter', ()),
+    'gerar_ssim_multiplas_companias': ('CIRIUM', 'sirium_to_ssim_converter', (COMPANHIAS_REAIS[:2],)),
+    'gerar_ssim_sirium': ('CIRIUM', 'sirium_to_ssim_converter', (COMPANHIAS_REAIS[0],)),
+    'gerar_ssim_sfo': ('SFO', 'sfo_to_ssim_converter', (COMPANHIAS_REAIS[0],)),
+    'gerar_ssim_ts09': ('TS09', 'ts09_to_ssim_converter', ('TS',)),
+}
+
+# Diferenças abaixo destes valores são ruído de medição
+TOLERANCIA_TEMPO = 0.25        # +25%
+TOLERANCIA_MEMORIA = 0.20      # +20%
+MINIMO_TEMPO = 0.05            # segundos
+MINIMO_MEMORIA = 10.0          # MB
+
+# Módulos que só tocam arquivos SSIM (e a CLI): devem iniciar sem as dependências pesadas
+MODULOS_LEVES = ('ssim_layout', 'ssim_utils', 'ssim_diff', 'ssim_converter_ts09', 'siriumtossim')
+DEPENDENCIAS_PESADAS = ('pandas', 'numpy', 'streamlit', 'pyarrow', 'openpyxl')
+LIMITE_IMPORTACAO = 0.2        # segundos
+
+def chave_caso(nome, linhas):
+    return f"{nome}[{linhas}]"
+
+def executar_caso(nome, arquivo, output_file):
+    """
+    Executado em um processo novo (um por medição), para o pico de memória ser só desta conversão
+    Retorna as métricas do relatório de desempenho
+    """
+    from perfil_conversao import converter_com_perfil
+
+    _, modulo, argumentos = CASOS[nome]
+    conversor = getattr(importlib.import_module(modulo), nome)
+    with contextlib.redirect_stdout(io.StringIO()):
+        saida, relatorio = converter_com_perfil(conversor, arquivo, *argumentos, output_file)
+    if not saida:
+        raise RuntimeError(f"{nome} não gerou o arquivo SSIM")
+    return {chave: relatorio[chave] for chave in
+            ('duracao', 'cpu', 'memoria_pico_mb', 'linhas_entrada', 'linhas_saida', 'linhas_por_segundo')}
+
+def executar_caso_memoria(nome, arquivo, output_file):
+    """Medição separada com tracemalloc (fora das medições de tempo): pico de alocação por etapa em MB"""
+    from perfil_memoria import converter_com_memoria
+
+    _, modulo, argumentos = CASOS[nome]
+    conversor = getattr(importlib.import_module(modulo), nome)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, relatorio = converter_com_memoria(conversor, arquivo, *argumentos, output_file, top=3)
+    return relatorio
+
+def medir_importacao(modulo):
+    """
+    Tempo de importação de um módulo em um interpretador novo (python -X importtime)
+    Retorna {'modulo', 'segundos', 'pesadas': dependências pesadas carregadas junto}
+    """
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {modulo}"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}: {processo.stderr.strip().splitlines()[-1]}")
+
+    segundos = 0.0
+    carregados = set()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, nome = linha.split('|')
+        nome = nome.strip()
+        carregados.add(nome.split('.')[0])
+        if nome == modulo:
+            segundos = int(cumulativo) / 1e6
+    return {'modulo': modulo, 'segundos': segundos,
+            'pesadas': [dependencia for dependencia in DEPENDENCIAS_PESADAS if dependencia in carregados]}
+
+def regressoes_importacao(medicoes, limite=LIMITE_IMPORTACAO):
+    """
+    Lista de regressões (texto) das medições de importação: dependência pesada ou acima do limite
+    limite=None confere só as dependências (o tempo de um import a frio varia com a carga da máquina)
+    """
+    regressoes = []
+    for medicao in medicoes:
+        if medicao['pesadas']:
+            regressoes.append(f"{medicao['modulo']}: importa {', '.join(medicao['pesadas'])}")
+        if limite is not None and medicao['segundos'] > limite:
+            regressoes.append(f"{medicao['modulo']}: importação {medicao['segundos']:.3f}s (limite {limite:.3f}s)")
+    return regressoes
+
+def executar_benchmark(tamanhos=TAMANHOS, casos=None, companhias=8, repeticoes=3, pasta=None, memoria=False):
+    """
+    Roda cada caso em cada tamanho `repeticoes` vezes (menor tempo, maior pico de memória)
+    pasta: onde ficam as planilhas sintéticas (reaproveitadas entre execuções)
+    memoria: mais uma execução por caso com tracemalloc, registrando o pico por etapa
+    Retorna o dicionário de resultados (formato do JSON de baseline)
+    """
+    casos = list(casos or CASOS)
+    pasta = pasta or os.path.join(tempfile.gettempdir(), "ssim_benchmark")
+    resultados = {}
+
+    print(f"🏁 BENCHMARK: {len(casos)} conversor(es) × {len(tamanhos)} tamanho(s), {repeticoes} repetição(ões)")
+    print("=" * 60)
+
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto, max_tasks_per_child=1) as pool:
+        for linhas in tamanhos:
+            for nome in casos:
+                formato = CASOS[nome][0]
+                arquivo = arquivo_sintetico(formato, linhas, companhias, pasta)
+                output_file = os.path.join(pasta, f"{nome}_{linhas}.ssim")
+                medicoes = [pool.submit(executar_caso, nome, arquivo, output_file).result() for _ in range(repeticoes)]
+
+                memorias = [m['memoria_pico_mb'] for m in medicoes if m['memoria_pico_mb'] is not None]
+                resultado = {
+                    'linhas': linhas,
+                    'duracao': min(m['duracao'] for m in medicoes),
+                    'cpu': min(m['cpu'] for m in medicoes),
+                    'memoria_pico_mb': max(memorias) if memorias else None,
+                    'registros': medicoes[0]['linhas_saida'],
+                    'linhas_por_segundo': max(m['linhas_por_segundo'] for m in medicoes),
+                }
+                if memoria:
+                    perfil = pool.submit(executar_caso_memoria, nome, arquivo, output_file).result()
+                    resultado['memoria_etapas_mb'] = {etapa: dados['pico_mb'] for etapa, dados in perfil['etapas'].items()}
+                    resultado['etapa_pico'] = perfil['etapa_pico']
+                resultados[chave_caso(nome, linhas)] = resultado
+                print(f"⏱️  {chave_caso(nome, linhas):<42} {resultado['duracao']:9.3f}s  "
+                      f"{resultado['memoria_pico_mb'] or 0:8.1f} MB  {resultado['registros']:>8} voos")
+                if memoria:
+                    print("      " + "  ".join(f"{etapa} {pico:.1f} MB" for etapa, pico in resultado['memoria_etapas_mb'].items()))
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'companhias': companhias,
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+
+def comparar_com_baseline(atual, baseline, tolerancia_tempo=TOLERANCIA_TEMPO, tolerancia_memoria=TOLERANCIA_MEMORIA):
+    """Lista de regressões (texto) dos casos presentes nos dois resultados"""
+    regressoes = []
+    for chave, resultado in atual['resultados'].items():
+        anterior = baseline['resultados'].get(chave)
+        if anterior is None:
+            continue
+        limite = anterior['duracao'] * (1 + tolerancia_tempo)
+        if resultado['duracao'] > limite and resultado['duracao'] - anterior['duracao'] > MINIMO_TEMPO:
+            regressoes.append(f"{chave}: tempo {anterior['duracao']:.3f}s → {resultado['duracao']:.3f}s")
+        if resultado['memoria_pico_mb'] and anterior.get('memoria_pico_mb'):
+            limite = anterior['memoria_pico_mb'] * (1 + tolerancia_memoria)
+            if (resultado['memoria_pico_mb'] > limite
+                    and resultado['memoria_pico_mb'] - anterior['memoria_pico_mb'] > MINIMO_MEMORIA):
+                regressoes.append(f"{chave}: memória {anterior['memoria_pico_mb']:.1f} MB → "
+                                  f"{resultado['memoria_pico_mb']:.1f} MB")
+        if resultado['registros'] != anterior['registros']:
+            regressoes.append(f"{chave}: registros {anterior['registros']} → {resultado['registros']}")
+    return regressoes
+
+def salvar_resultados(resultados, path):
+    with open(path, 'w') as file:
+        json.dump(resultados, file, indent=2, ensure_ascii=False)
+
+def carregar_resultados(path):
+    with open(path, 'r') as file:
+        return json.load(file)
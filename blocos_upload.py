@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Blocos pré-codificados do upload - Dnata Brasil
+O app codifica uma vez por arquivo enviado (em segundo plano) os registros tipo 3 de cada companhia,
+com marcadores no lugar do período global; qualquer seleção (SINGLE, MULTIPLE, ALL_COMPANIES) vira a
+concatenação dos blocos + header/footer e numeração das linhas, com o mesmo conteúdo de converter_modo
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from companhias import coluna_companhia, codigos_companhia
+from conversao_streaming import MARCADOR_MAX, MARCADOR_MIN
+from etapas_voo import carregar_timezones, converter_datas
+from sirium_to_ssim_converter import gerar_linhas_companhia, parse_date_sfo, periodo_global
+from ssim_layout import escrever_ssim
+from validacao import validar_cirium
+
+def _limites(df):
+    """(menor Eff Date, maior Disc Date) das linhas, None onde a coluna não tem data válida"""
+    if 'Eff Date' not in df.columns or 'Disc Date' not in df.columns:
+        return None, None
+    eff = converter_datas(df['Eff Date']).dropna()
+    disc = converter_datas(df['Disc Date']).dropna()
+    return (eff.min() if len(eff) else None), (disc.max() if len(disc) else None)
+
+def codificar_blocos(df):
+    """
+    Valida o extrato lido (cabeçalho CIRIUM na linha 5) e codifica cada companhia uma vez
+    Retorna {'blocos': {codigo: registros}, 'linhas': {codigo: n}, 'limites': {codigo: (min, max)},
+             'periodo_todas': (min, max) do ALL, 'rejeitadas': tabela da limpeza}
+    """
+    df_clean, rejeitadas = validar_cirium(df)
+    pre = {'blocos': {}, 'linhas': {}, 'limites': {}, 'periodo_todas': periodo_global(df_clean), 'rejeitadas': rejeitadas}
+    airline_col = coluna_companhia(df_clean)
+    if airline_col is None:
+        return pre
+
+    iata_to_timezone = carregar_timezones()
+    codigos = codigos_companhia(df_clean[airline_col])
+    for companhia, posicoes in codigos.groupby(codigos, sort=True).indices.items():
+        df_companhia = df_clean.iloc[posicoes]
+        pre['blocos'][companhia] = gerar_linhas_companhia(df_companhia, companhia, iata_to_timezone,
+                                                          MARCADOR_MIN, MARCADOR_MAX)
+        pre['linhas'][companhia] = len(df_companhia)
+        pre['limites'][companhia] = _limites(df_companhia)
+    print(f"🧱 Blocos pré-codificados: {len(pre['blocos'])} companhias, {sum(pre['linhas'].values())} linhas")
+    return pre
+
+def _periodo_selecao(pre, companhias):
+    """Período global das companhias selecionadas (mesma regra de periodo_global sobre as linhas delas)"""
+    inicios = [pre['limites'][c][0] for c in companhias if pre['limites'][c][0] is not None]
+    fins = [pre['limites'][c][1] for c in companhias if pre['limites'][c][1] is not None]
+    if inicios and fins:
+        return min(inicios), max(fins)
+    return datetime.now(), datetime.now() + timedelta(days=30)
+
+def companhias_da_selecao(pre, modo, companhias=None):
+    """Companhias com bloco, na ordem em que entram no arquivo"""
+    if modo == "ALL_COMPANIES":
+        return sorted(pre['blocos'])
+    return [c for c in (companhias or []) if c in pre['blocos']]
+
+def montar_ssim(pre, modo, companhias=None, output_file=None):
+    """
+    Arquivo SSIM de uma seleção a partir dos blocos pré-codificados
+    Mesmos nomes padrão, período, código e separador dos conversores CIRIUM; None se a seleção não tem voos
+    """
+    selecionadas = companhias_da_selecao(pre, modo, companhias)
+    if not selecionadas:
+        return None
+
+    if modo == "ALL_COMPANIES":
+        data_min, data_max = pre['periodo_todas']
+        codigo, separador = "ALL", " "
+    else:
+        data_min, data_max = _periodo_selecao(pre, selecionadas)
+        codigo = "MIX" if modo == "MULTIPLE" and len(companhias) > 1 else companhias[0]
+        separador = "  "
+    data_min_str = parse_date_sfo(data_min)
+    data_max_str = parse_date_sfo(data_max)
+    data_emissao = datetime.now().strftime("%d%b%y").upper()
+    data_emissao2 = datetime.now().strftime("%Y%m%d")
+
+    if output_file is None:
+        if modo == "ALL_COMPANIES":
+            output_file = f"ALL_COMPANIES_{data_emissao2}_{data_min_str}-{data_max_str}.ssim"
+        elif modo == "MULTIPLE":
+            output_file = f"MULTIPLE_{'_'.join(companhias)}_{data_emissao2}_{data_min_str}-{data_max_str}.ssim"
+        else:
+            output_file = f"{codigo} {data_emissao2} {data_min_str}-{data_max_str}.ssim"
+
+    def registros():
+        for companhia in selecionadas:
+            for registro in pre['blocos'][companhia]:
+                if '#' in registro:
+                    registro = registro.replace(MARCADOR_MIN, data_min_str).replace(MARCADOR_MAX, data_max_str)
+                yield registro
+
+    with open(output_file, 'w') as file:
+        numero_linha = escrever_ssim(file, codigo, data_min_str, data_max_str, data_emissao, registros(), separador)
+    print(f"⚡ SSIM montado dos blocos pré-codificados: {output_file} ({numero_linha} linhas, {os.path.getsize(output_file)} bytes)")
+    return output_file
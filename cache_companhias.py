@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Cache de blocos SSIM por companhia - Dnata Brasil
+Guarda em disco os registros tipo 3 (sem serial) de cada companhia junto com o hash dos dados de entrada
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+from cache_conversao import ARQUIVO_AIRPORTS, hash_referencia
+from version import VERSION
+
+CACHE_DIR_PADRAO = os.path.join('.ssim_cache', 'companhias')
+
+def hash_companhia(df_companhia, data_min_str, data_max_str, janela=None):
+    """
+    Hash das linhas de entrada de uma companhia + contexto que altera a codificação
+    (versão do conversor, airport.csv e janela de datas). O período global só entra quando alguma linha
+    depende dele (Eff Date/Disc Date ausentes), para não invalidar todo o cache a cada extrato.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df_companhia, index=False).values.tobytes())
+    h.update(",".join(map(str, df_companhia.columns)).encode())
+    h.update(VERSION.encode())
+    h.update(hash_referencia(ARQUIVO_AIRPORTS).encode())
+    if janela is not None:
+        h.update(f"janela{janela[0].date()}{janela[1].date()}".encode())
+
+    usa_periodo_global = any(
+        col not in df_companhia.columns or df_companhia[col].isna().any()
+        for col in ('Eff Date', 'Disc Date')
+    )
+    if usa_periodo_global:
+        h.update(f"{data_min_str}{data_max_str}".encode())
+
+    return h.hexdigest()
+
+def _caminho_bloco(cache_dir, companhia):
+    return os.path.join(cache_dir, f"{companhia}.bloco")
+
+def carregar_bloco(cache_dir, companhia, chave):
+    """Retorna as linhas do bloco em cache se o hash confere, senão None"""
+    try:
+        with open(_caminho_bloco(cache_dir, companhia), 'r') as file:
+            if file.readline().rstrip('\n') != chave:
+                return None
+            return [linha.rstrip('\n') for linha in file]
+    except OSError:
+        return None
+
+def salvar_bloco(cache_dir, companhia, chave, linhas):
+    """Grava o bloco da companhia (escrita atômica: arquivo temporário + rename)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        destino = _caminho_bloco(cache_dir, companhia)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        with open(temporario, 'w') as file:
+            file.write(chave + "\n")
+            for linha in linhas:
+                file.write(linha + "\n")
+        os.replace(temporario, destino)
+    except OSError as e:
+        print(f"⚠️ Erro ao salvar bloco da companhia {companhia} no cache: {e}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de conversões SSIM - Dnata Brasil
+Reaproveita o resultado de uma conversão já feita com o mesmo arquivo e os mesmos parâmetros
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+from version import VERSION
+
+MODOS = ("SINGLE", "MULTIPLE", "ALL_COMPANIES")
+
+# Tabela de referência que altera a codificação (fusos horários dos aeroportos)
+ARQUIVO_AIRPORTS = 'airport.csv'
+
+CACHE_CONVERSAO_DIR = os.path.join('.ssim_cache', 'conversoes')
+TAMANHO_MAXIMO_PADRAO = 200 * 1024 * 1024   # 200 MB
+IDADE_MAXIMA_PADRAO = 7 * 24 * 3600          # 7 dias
+
+def converter_modo(excel_path, modo, companhias=None, output_file=None, cache_blocos=None, progresso=None,
+                   cache_extrato=None, exportar_para=None, somente_operadora=False, estacoes=None,
+                   sentido_estacoes='ambos', indice_estacoes=None, janela=None):
+    """Executa a conversão CIRIUM no modo SINGLE, MULTIPLE ou ALL_COMPANIES"""
+    from sirium_to_ssim_converter import gerar_ssim_sirium, gerar_ssim_multiplas_companias, gerar_ssim_todas_companias
+
+    extras = {'progresso': progresso, 'cache_extrato': cache_extrato, 'exportar_para': exportar_para,
+              'somente_operadora': somente_operadora, 'estacoes': estacoes, 'sentido_estacoes': sentido_estacoes,
+              'indice_estacoes': indice_estacoes, 'janela': janela}
+    if modo == "ALL_COMPANIES":
+        return gerar_ssim_todas_companias(excel_path, output_file, cache_dir=cache_blocos, **extras)
+    if modo == "MULTIPLE":
+        return gerar_ssim_multiplas_companias(excel_path, list(companhias), output_file, **extras)
+    if modo == "SINGLE":
+        return gerar_ssim_sirium(excel_path, companhias[0], output_file, **extras)
+    raise ValueError(f"Modo de conversão inválido: {modo}")
+
+def hash_arquivo(path):
+    """SHA-256 do conteúdo do arquivo de entrada (lido em blocos)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for bloco in iter(lambda: file.read(1024 * 1024), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def hash_referencia(path):
+    """SHA-256 de um arquivo de referência da codificação (vazio se não existir)"""
+    try:
+        return hash_arquivo(path)
+    except OSError:
+        return ''
+
+def chave_conversao(hash_entrada, modo, companhias, data_emissao, somente_operadora=False, estacoes=None,
+                    sentido_estacoes='ambos', janela=None):
+    """
+    Chave do cache: hash da entrada, modo, companhias, versão do conversor, data de emissão, airport.csv,
+    modo só operadora, filtro de estações e janela de datas (já resolvida: 'próximos N dias' muda com o dia)
+    """
+    from etapas_voo import interpretar_janela
+    from indice_estacoes import normalizar_estacoes
+
+    parametros = {
+        'entrada': hash_entrada,
+        'modo': modo,
+        'companhias': [] if modo == "ALL_COMPANIES" else list(companhias or []),
+        'versao': VERSION,
+        'emissao': data_emissao,
+        'airports': hash_referencia(ARQUIVO_AIRPORTS),
+    }
+    if somente_operadora:
+        # Só entra na chave quando ligado: as entradas já gravadas continuam valendo
+        parametros['operadora'] = True
+    if estacoes:
+        parametros['estacoes'] = normalizar_estacoes(estacoes)
+        parametros['sentido_estacoes'] = sentido_estacoes
+    janela = interpretar_janela(janela)
+    if janela is not None:
+        parametros['janela'] = [str(janela[0].date()), str(janela[1].date())]
+    return hashlib.sha256(json.dumps(parametros, sort_keys=True).encode()).hexdigest()
+
+def limpar_cache(cache_dir=CACHE_CONVERSAO_DIR, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, idade_maxima=IDADE_MAXIMA_PADRAO):
+    """
+    Remove entradas mais antigas que idade_maxima e, se o cache passar de tamanho_maximo,
+    as menos usadas recentemente (LRU pelo mtime, atualizado a cada acerto)
+    """
+    try:
+        nomes = [nome for nome in os.listdir(cache_dir) if nome.endswith('.ssim')]
+    except OSError:
+        return 0
+
+    entradas = []
+    for nome in nomes:
+        try:
+            info = os.stat(os.path.join(cache_dir, nome))
+        except OSError:
+            continue
+        entradas.append((info.st_mtime, info.st_size, nome[:-len('.ssim')]))
+    entradas.sort()
+
+    agora = time.time()
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for mtime, tamanho, chave in entradas:
+        if agora - mtime <= idade_maxima and total <= tamanho_maximo:
+            continue
+        for extensao in ('.ssim', '.json'):
+            try:
+                os.remove(os.path.join(cache_dir, chave + extensao))
+            except OSError:
+                pass
+        total -= tamanho
+        removidas += 1
+    return removidas
+
+def converter_com_cache(excel_path, modo, companhias=None, output_file=None,
+                        cache_dir=CACHE_CONVERSAO_DIR, tamanho_maximo=TAMANHO_MAXIMO_PADRAO,
+                        idade_maxima=IDADE_MAXIMA_PADRAO, cache_blocos=None, progresso=None, cache_extrato=None,
+                        exportar_para=None, somente_operadora=False, estacoes=None, sentido_estacoes='ambos',
+                        indice_estacoes=None, janela=None):
+    """
+    Converte com cache em disco na frente de gerar_ssim_sirium / gerar_ssim_multiplas_companias /
+    gerar_ssim_todas_companias. Retorna o caminho do arquivo SSIM (ou None em caso de falha).
+    Numa conversão reaproveitada, a exportação (exportar_para) é gerada a partir do SSIM do cache.
+    """
+    from indice_estacoes import normalizar_estacoes
+
+    data_emissao = datetime.now().strftime("%d%b%y").upper()
+    chave = chave_conversao(hash_arquivo(excel_path), modo, companhias, data_emissao, somente_operadora, estacoes,
+                            sentido_estacoes, janela)
+    entrada_ssim = os.path.join(cache_dir, chave + '.ssim')
+    entrada_meta = os.path.join(cache_dir, chave + '.json')
+
+    try:
+        with open(entrada_meta, 'r') as file:
+            meta = json.load(file)
+        if output_file is not None or meta.get('nome_padrao'):
+            destino = output_file or meta['arquivo']
+            shutil.copyfile(entrada_ssim, destino)
+            os.utime(entrada_ssim)
+            print(f"♻️  Conversão {modo} reutilizada do cache: {destino}")
+            if exportar_para:
+                from exportacao import exportar_ssim
+                exportar_ssim(destino, exportar_para)
+            return destino
+    except (OSError, ValueError, KeyError):
+        pass
+
+    resultado = converter_modo(excel_path, modo, companhias, output_file, cache_blocos, progresso, cache_extrato,
+                               exportar_para, somente_operadora, estacoes, sentido_estacoes, indice_estacoes,
+                               janela)
+    if not resultado:
+        return resultado
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporario = f"{entrada_ssim}.{os.getpid()}.tmp"
+        shutil.copyfile(resultado, temporario)
+        os.replace(temporario, entrada_ssim)
+        with open(entrada_meta, 'w') as file:
+            json.dump({
+                'arquivo': os.path.basename(resultado),
+                'nome_padrao': output_file is None,
+                'modo': modo,
+                'companhias': list(companhias or []),
+                'somente_operadora': somente_operadora,
+                'estacoes': normalizar_estacoes(estacoes),
+                'sentido_estacoes': sentido_estacoes,
+                'versao': VERSION,
+            }, file)
+        limpar_cache(cache_dir, tamanho_maximo, idade_maxima)
+    except OSError as e:
+        print(f"⚠️ Erro ao gravar conversão no cache: {e}")
+
+    return resultado
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Modo só operadora (sem duplicatas de codeshare) - Dnata Brasil
+Nos extratos CIRIUM cada voo físico aparece uma vez por companhia que o comercializa (Mkt Al).
+deduplicar_codeshare mantém uma linha por etapa operada, identificada pelo hash da operadora,
+aeroportos, horários, período e dias de operação, preferindo a linha da própria operadora
+(que traz o número de voo operacional). Etapas sem a linha da operadora (extrato filtrado por
+companhia comercial) ficam de fora: o número de voo operacional não está no extrato
+"""
+
+import numpy as np
+import pandas as pd
+
+from progresso_conversao import notificar
+
+# Colunas que identificam a etapa operada (o número do voo muda a cada companhia que comercializa)
+COLUNAS_OPERACAO = ['Op Al', 'Orig', 'Dest', 'Dep Time', 'Arr Time', 'Eff Date', 'Disc Date', 'Op Days']
+
+COLUNAS_PARCEIROS = ['operadora', 'voo', 'orig', 'dest', 'parceiros']
+
+def chave_operacao(df):
+    """Hash (uint64) da etapa operada de cada linha"""
+    colunas = [coluna for coluna in COLUNAS_OPERACAO if coluna in df.columns]
+    return pd.util.hash_pandas_object(df[colunas], index=False)
+
+def _codigos_voo(df):
+    voos = pd.to_numeric(df['Flight'], errors='coerce').astype('Int64').astype(str)
+    return df['Mkt Al'].astype(str).str.strip() + ' ' + voos
+
+def deduplicar_codeshare(df, parceiros=False):
+    """
+    Uma linha por etapa operada, na ordem original do extrato
+    Etapas em que nenhuma linha é da própria operadora (Mkt Al == Op Al) são descartadas
+    parceiros: monta também a tabela de codeshares (operadora, voo, orig, dest, 'EK 5412, QF 8413')
+    Retorna (df_operado, tabela_parceiros ou None, linhas descartadas sem a operadora)
+    """
+    if 'Op Al' not in df.columns or len(df) == 0:
+        return df, None, 0
+
+    chaves = chave_operacao(df).to_numpy()
+    propria = np.ones(len(df), dtype=bool)
+    if 'Mkt Al' in df.columns:
+        propria = (df['Mkt Al'].astype(str).str.strip() == df['Op Al'].astype(str).str.strip()).to_numpy()
+
+    # Primeira linha de cada chave, com a linha da própria operadora na frente das de codeshare
+    ordem = np.lexsort((~propria, chaves))
+    primeiras = ordem[np.r_[True, chaves[ordem][1:] != chaves[ordem][:-1]]]
+    mantidas = np.zeros(len(df), dtype=bool)
+    mantidas[primeiras] = True
+    com_operadora = np.isin(chaves, chaves[propria])
+    mantidas &= com_operadora
+    df_operado = df[mantidas]
+
+    tabela = None
+    if parceiros and {'Mkt Al', 'Flight'} <= set(df.columns):
+        codigos = _codigos_voo(df)
+        mantido = pd.Series(codigos.to_numpy()[mantidas], index=chaves[mantidas])
+        grupos = pd.DataFrame({'chave': chaves, 'codigo': codigos.to_numpy()})
+        grupos = grupos[grupos['codigo'].to_numpy() != mantido.reindex(chaves).to_numpy()].drop_duplicates()
+        lista = grupos.groupby('chave', sort=False)['codigo'].agg(', '.join)
+        com_parceiros = pd.Series(chaves[mantidas], index=df_operado.index).map(lista).dropna()
+        linhas = df_operado.loc[com_parceiros.index]
+        tabela = pd.DataFrame({
+            'operadora': linhas['Op Al'].to_numpy(),
+            'voo': pd.to_numeric(linhas['Flight'], errors='coerce').astype('Int64').to_numpy(),
+            'orig': linhas['Orig'].to_numpy(),
+            'dest': linhas['Dest'].to_numpy(),
+            'parceiros': com_parceiros.to_numpy(),
+        }, columns=COLUNAS_PARCEIROS)
+    return df_operado, tabela, int((~com_operadora).sum())
+
+def aplicar_somente_operadora(df, progresso=None):
+    """
+    Deduplica o extrato limpo e reporta a redução (print + evento 'codeshare')
+    A tabela de parceiros só é montada quando há callback de progresso para recebê-la
+    """
+    df_operado, tabela, sem_operadora = deduplicar_codeshare(df, parceiros=progresso is not None)
+    removidas = len(df) - len(df_operado)
+    reducao = removidas / len(df) if len(df) else 0.0
+    print(f"✂️  Só operadora: {len(df)} → {len(df_operado)} linhas ({removidas - sem_operadora} duplicatas de codeshare, -{reducao:.1%})")
+    if sem_operadora:
+        print(f"⚠️  {sem_operadora} linhas de codeshare sem a linha da operadora no extrato foram descartadas")
+    notificar(progresso, 'codeshare', linhas_entrada=len(df), linhas_saida=len(df_operado), removidas=removidas,
+              sem_operadora=sem_operadora, reducao=round(reducao, 4), tabela=tabela)
+    return df_operado
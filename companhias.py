@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Descoberta de companhias nos extratos - Dnata Brasil
+Uma única regra para listar e filtrar companhias (app, conversores CIRIUM/SFO e streaming):
+o código é normalizado e validado uma vez por valor distinto da coluna (codificação categórica),
+contra o padrão de duas letras e a lista de designadores do iata_airlines.csv (carregada uma vez)
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+ARQUIVO_IATA = 'iata_airlines.csv'
+
+# Ordem de escolha da coluna de companhia: a operadora primeiro no modo só operadora
+COLUNAS_COMPANHIA = ['Mkt Al', 'Op Al', 'Airline', 'Carrier']
+COLUNAS_OPERADORA = ['Op Al', 'Mkt Al', 'Airline', 'Carrier']
+
+# Duas letras valem mesmo fora da lista (companhias novas, códigos sintéticos); designadores com
+# dígito (G3, A3, 2A) só quando estão no iata_airlines.csv, para não aceitar lixo do relatório
+PADRAO_LETRAS = r'[A-Z]{2}'
+TEXTOS_INVALIDOS = ['NA']
+
+def coluna_companhia(df, somente_operadora=False):
+    """Primeira coluna de companhia presente no DataFrame (None se não houver)"""
+    colunas = COLUNAS_OPERADORA if somente_operadora else COLUNAS_COMPANHIA
+    return next((col for col in colunas if col in df.columns), None)
+
+@lru_cache(maxsize=None)
+def companhias_iata(path=ARQUIVO_IATA):
+    """{designador: nome} do iata_airlines.csv (sem o '*' dos designadores duplicados); {} sem o arquivo"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        tabela = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar companhias IATA: {e}")
+        return {}
+    codigos = tabela['IATA Designator'].str.strip().str.upper().str.rstrip('*')
+    tabela = tabela.assign(codigo=codigos)[codigos.str.fullmatch(r'[A-Z0-9]{2}', na=False)]
+    tabela = tabela.drop_duplicates('codigo')
+    return dict(zip(tabela['codigo'], tabela['Airline Name'].str.strip()))
+
+def codigos_companhia(serie):
+    """Códigos IATA normalizados (maiúsculas, sem espaços); NaN para textos do relatório e valores vazios"""
+    posicoes, unicos = pd.factorize(serie)
+    valores = pd.Index(unicos, dtype=object).astype(str).str.strip().str.upper()
+    validos = (valores.str.fullmatch(PADRAO_LETRAS) & ~valores.isin(TEXTOS_INVALIDOS)) | valores.isin(list(companhias_iata()))
+    codigos = np.append(np.where(validos, valores.to_numpy(dtype=object), np.nan), np.nan).astype(object)
+    return pd.Series(codigos[posicoes], index=serie.index, dtype=object)
+
+def descobrir_companhias(serie, codigos=None):
+    """
+    Tabela das companhias da coluna: codigo, linhas e nome (vazio fora do iata_airlines.csv), ordenada pelo código
+    codigos: codigos_companhia(serie), quando quem chama já calculou
+    """
+    if codigos is None:
+        codigos = codigos_companhia(serie)
+    contagem = codigos.value_counts().sort_index()
+    nomes = companhias_iata()
+    return pd.DataFrame({
+        'codigo': contagem.index.astype(object),
+        'linhas': contagem.to_numpy(dtype='int64'),
+        'nome': [nomes.get(codigo, '') for codigo in contagem.index],
+    })
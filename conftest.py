@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Fixtures compartilhadas dos testes: arquivos reais de exemplo da raiz do repositório
+Sem o arquivo, o teste é marcado como ignorado (skip) em vez de passar sem testar nada
+"""
+
+import os
+
+import pytest
+
+EXTRATO = 'Schedule_Weekly_Extract_Report_83692.xlsx'
+EXTRATO_SEGUINTE = 'Schedule_Weekly_Extract_Report_83910.xlsx'
+MALHA_TS09 = 'TS.09 VERSION 01 - SEPT 2025 - YYZ.xls'
+
+def _arquivo_exemplo(path):
+    if not os.path.exists(path):
+        pytest.skip(f"arquivo de exemplo ausente: {path}")
+    return path
+
+@pytest.fixture
+def extrato():
+    """Extrato CIRIUM real (Schedule Weekly Extract Report)"""
+    return _arquivo_exemplo(EXTRATO)
+
+@pytest.fixture
+def extrato_seguinte():
+    """Extrato CIRIUM real da semana seguinte (comparação de malhas)"""
+    return _arquivo_exemplo(EXTRATO_SEGUINTE)
+
+@pytest.fixture
+def malha_ts09():
+    """Malha TS.09 real"""
+    return _arquivo_exemplo(MALHA_TS09)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Conversões em segundo plano para o app Streamlit - Dnata Brasil
+O job roda em um executor compartilhado e o app acompanha o progresso pelo dicionário do job
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from blocos_upload import companhias_da_selecao, montar_ssim
+from cache_conversao import converter_com_cache
+from progresso_conversao import ConversaoCancelada
+from validacao import COLUNAS_REJEITADAS, reportar_rejeitadas
+
+def _callback_progresso(job):
+    """Atualiza o job com os eventos do conversor e interrompe se o cancelamento foi pedido"""
+    def progresso(evento):
+        if job['cancelar'].is_set():
+            raise ConversaoCancelada()
+        if 'processadas' in evento:
+            job['processadas'] = evento['processadas']
+            job['total'] = evento.get('total') or job['total']
+        if evento.get('companhia'):
+            job['companhia'] = evento['companhia']
+        if evento['evento'] == 'etapa_inicio':
+            job['etapa'] = evento['etapa']
+        elif evento['evento'] == 'companhia':
+            job['companhias_concluidas'] += 1
+        elif evento['evento'] == 'codeshare':
+            job['codeshare'] = evento
+        elif evento['evento'] == 'estacoes':
+            job['estacoes'] = evento
+        elif evento['evento'] == 'rejeitadas':
+            for motivo, quantidade in evento['motivos'].items():
+                job['motivos'][motivo] = job['motivos'].get(motivo, 0) + quantidade
+            job['rejeitadas'].append(evento['tabela'])
+    return progresso
+
+def _executar(job, excel_path, modo, companhias, output_file, cache_blocos, cache_extrato, somente_operadora,
+              estacoes, sentido_estacoes, indice_estacoes):
+    try:
+        job['resultado'] = converter_com_cache(excel_path, modo, companhias, output_file,
+                                               cache_blocos=cache_blocos, progresso=_callback_progresso(job),
+                                               cache_extrato=cache_extrato, somente_operadora=somente_operadora,
+                                               estacoes=estacoes, sentido_estacoes=sentido_estacoes,
+                                               indice_estacoes=indice_estacoes)
+        job['status'] = 'concluido' if job['resultado'] else 'erro'
+    except ConversaoCancelada:
+        job['status'] = 'cancelado'
+    except Exception as e:
+        job['erro'] = str(e)
+        job['status'] = 'erro'
+    finally:
+        job['fim'] = time.time()
+        shutil.rmtree(job['pasta'], ignore_errors=True)
+
+def _novo_job(modo, companhias, pasta=None):
+    return {
+        'status': 'processando', 'modo': modo, 'companhias': list(companhias or []),
+        'etapa': None, 'processadas': 0, 'total': 0, 'companhia': None, 'companhias_concluidas': 0,
+        'motivos': {}, 'rejeitadas': [], 'codeshare': None, 'estacoes': None, 'resultado': None, 'erro': None, 'inicio': time.time(), 'fim': None,
+        'cancelar': threading.Event(), 'pasta': pasta,
+    }
+
+def submeter_conversao(executor, excel_path, modo, companhias=None, output_file=None, cache_blocos=None,
+                       cache_extrato=None, somente_operadora=False, estacoes=None, sentido_estacoes='ambos',
+                       indice_estacoes=None):
+    """
+    Copia a entrada para uma pasta do job (o app apaga o arquivo temporário a cada execução)
+    e agenda a conversão no executor. Retorna o dicionário do job.
+    indice_estacoes: índice de estações do upload, reaproveitado pelo conversor (ver indice_estacoes)
+    """
+    pasta = tempfile.mkdtemp(prefix="ssim_job_")
+    entrada = os.path.join(pasta, os.path.basename(excel_path))
+    shutil.copyfile(excel_path, entrada)
+
+    job = _novo_job(modo, companhias, pasta)
+    job['futuro'] = executor.submit(_executar, job, entrada, modo, companhias, output_file, cache_blocos,
+                                   cache_extrato, somente_operadora, estacoes, sentido_estacoes, indice_estacoes)
+    return job
+
+def conversao_pre_codificada(pre, modo, companhias=None, output_file=None):
+    """
+    Job já concluído, montado dos blocos pré-codificados do upload (ver blocos_upload) sem rodar o conversor
+    Mesmo dicionário de submeter_conversao, para o app mostrar o resultado e as rejeitadas igual
+    """
+    job = _novo_job(modo, companhias)
+    try:
+        job['resultado'] = montar_ssim(pre, modo, companhias, output_file)
+        job['status'] = 'concluido' if job['resultado'] else 'erro'
+    except Exception as e:
+        job['erro'] = str(e)
+        job['status'] = 'erro'
+    selecionadas = companhias_da_selecao(pre, modo, companhias)
+    job['processadas'] = job['total'] = sum(pre['linhas'][companhia] for companhia in selecionadas)
+    job['companhias_concluidas'] = len(selecionadas)
+    reportar_rejeitadas(_callback_progresso(job), pre['rejeitadas'], 'limpeza')
+    job['fim'] = time.time()
+    return job
+
+def cancelar_conversao(job):
+    job['cancelar'].set()
+
+def taxa_linhas(job):
+    """Linhas processadas por segundo"""
+    decorrido = (job['fim'] or time.time()) - job['inicio']
+    return job['processadas'] / decorrido if decorrido > 0 else 0.0
+
+def fracao_concluida(job):
+    if job['status'] != 'processando':
+        return 1.0
+    return min(job['processadas'] / job['total'], 1.0) if job['total'] else 0.0
+
+def tabela_rejeitadas(job):
+    """Todas as linhas rejeitadas do job em uma única tabela"""
+    if not job['rejeitadas']:
+        return pd.DataFrame(columns=COLUNAS_REJEITADAS)
+    return pd.concat(job['rejeitadas'], ignore_index=True).sort_values('linha', ignore_index=True)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Conversão em lote de arquivos de malha - Dnata Brasil
+Converte vários arquivos CIRIUM/SFO/TS.09 em paralelo e gera um resumo JSON
+"""
+
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from deteccao_formato import EXTENSOES_SUPORTADAS, detectar_formato
+from perfil_conversao import converter_com_perfil
+
+def listar_arquivos(entradas):
+    """Expande diretórios e padrões glob na lista de arquivos a converter (sem repetição)"""
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(os.path.join(entrada, nome) for nome in os.listdir(entrada))
+        else:
+            candidatos = sorted(glob.glob(entrada)) or [entrada]
+        for path in candidatos:
+            nome = os.path.basename(path)
+            if nome.startswith(('~$', 'temp_')) or not nome.lower().endswith(EXTENSOES_SUPORTADAS):
+                continue
+            if path not in arquivos:
+                arquivos.append(path)
+    return arquivos
+
+def nomes_saida(arquivos):
+    """
+    Nome base (sem extensão) da saída de cada arquivo, único no diretório de destino
+    Arquivos com o mesmo nome (x.xlsx e x.csv, a/x.xlsx e b/x.xlsx) ganham a extensão e, se ainda
+    repetirem, a pasta de origem; em último caso um contador
+    """
+    def repetidos(nomes):
+        contagem = {}
+        for nome in nomes.values():
+            contagem[nome] = contagem.get(nome, 0) + 1
+        return {path for path, nome in nomes.items() if contagem[nome] > 1}
+
+    nomes = {path: os.path.splitext(os.path.basename(path))[0] for path in arquivos}
+    for path in repetidos(nomes):
+        nome, extensao = os.path.splitext(os.path.basename(path))
+        nomes[path] = f"{nome}_{extensao.lstrip('.').lower()}"
+    for path in repetidos(nomes):
+        pasta = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        nomes[path] = f"{pasta}_{nomes[path]}"
+    usados = set()
+    for path in arquivos:
+        nome, contador = nomes[path], 2
+        while nomes[path] in usados:
+            nomes[path] = f"{nome}_{contador}"
+            contador += 1
+        usados.add(nomes[path])
+    return nomes
+
+def contar_registros(ssim_path):
+    """Número de registros de voo (tipo 3) no arquivo SSIM"""
+    with open(ssim_path, 'r') as file:
+        return sum(1 for linha in file if linha.startswith('3'))
+
+def conversor_do_formato(path, formato, opcoes, output_file):
+    """Conversor, argumentos e extras (keywords) para o formato detectado"""
+    exportar_para = os.path.splitext(output_file)[0] + '.' + opcoes['exportar'] if opcoes.get('exportar') else None
+    if formato == "CIRIUM":
+        from cache_conversao import converter_com_cache, converter_modo
+        conversor = converter_com_cache if opcoes.get('usar_cache') else converter_modo
+        extras = {'cache_blocos': opcoes.get('cache_blocos'), 'cache_extrato': opcoes.get('cache_extratos'),
+                  'exportar_para': exportar_para, 'somente_operadora': opcoes.get('somente_operadora', False),
+                  'janela': opcoes.get('janela')}
+        return conversor, (path, opcoes['modo'], opcoes.get('companhias'), output_file), extras
+    if formato == "TS09":
+        from ts09_to_ssim_converter import gerar_ssim_ts09
+        extras = {'cache_extrato': opcoes.get('cache_extratos'), 'exportar_para': exportar_para, 'janela': opcoes.get('janela')}
+        return gerar_ssim_ts09, (path, opcoes.get('codigo_ts09', 'TS'), output_file), extras
+    raise ValueError("Formato de arquivo não reconhecido")
+
+def resultado_vazio(path, erro=None):
+    return {'arquivo': path, 'formato': None, 'saida': None, 'registros': 0, 'duracao': 0.0, 'erro': erro}
+
+def converter_arquivo(path, destino_dir, opcoes, nome=None):
+    """
+    Converte um arquivo detectando o formato. Executado nos processos do pool:
+    a saída dos conversores é capturada para não misturar logs entre arquivos.
+    Retorna o dicionário de resultado do arquivo para o resumo (com o relatório de desempenho).
+    nome: nome base da saída (padrão: nome do arquivo sem extensão; ver nomes_saida)
+    Com opcoes['perfil'], grava o cProfile da conversão em <destino>/<nome>.prof
+    """
+    inicio = time.perf_counter()
+    resultado = resultado_vazio(path)
+    log = io.StringIO()
+    base = os.path.join(destino_dir, nome or os.path.splitext(os.path.basename(path))[0])
+
+    try:
+        with contextlib.redirect_stdout(log):
+            formato = detectar_formato(path)
+            resultado['formato'] = formato
+            conversor, argumentos, extras = conversor_do_formato(path, formato, opcoes, base + '.ssim')
+
+            cprofile_path = base + '.prof' if opcoes.get('perfil') else None
+            saida, relatorio = converter_com_perfil(conversor, *argumentos, cprofile_path=cprofile_path, **extras)
+            for chave in ('etapas', 'linhas_entrada', 'rejeitadas', 'motivos', 'codeshare_removidas', 'bytes', 'linhas_por_segundo',
+                          'memoria_pico_mb', 'cprofile'):
+                resultado[chave] = relatorio[chave]
+
+        if not saida:
+            # Conversores CIRIUM imprimem o erro e retornam None
+            erros = [linha for linha in log.getvalue().splitlines() if '❌' in linha]
+            raise RuntimeError(erros[-1] if erros else "Falha na conversão")
+
+        resultado['saida'] = saida
+        resultado['registros'] = contar_registros(saida)
+        if extras.get('exportar_para'):
+            resultado['exportacao'] = extras['exportar_para']
+    except Exception as e:
+        resultado['erro'] = str(e)
+
+    resultado['duracao'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+def converter_lote(entradas, destino_dir, opcoes=None, workers=None, resumo_path=None):
+    """
+    Converte todos os arquivos das entradas (diretórios/globs) em paralelo.
+    workers: tamanho do pool de processos (padrão: número de CPUs)
+    Retorna o resumo (e grava em resumo_path, se informado).
+    """
+    opcoes = dict(opcoes or {})
+    opcoes.setdefault('modo', "ALL_COMPANIES")
+    arquivos = listar_arquivos(entradas)
+    nomes = nomes_saida(arquivos)
+    os.makedirs(destino_dir, exist_ok=True)
+
+    print(f"🔄 CONVERSÃO EM LOTE: {len(arquivos)} arquivo(s)")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    resultados = []
+    if arquivos:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = [pool.submit(converter_arquivo, path, destino_dir, opcoes, nomes[path]) for path in arquivos]
+            for path, futuro in zip(arquivos, futuros):
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    # Processo do pool encerrado (BrokenProcessPool, falta de memória): falha só deste arquivo
+                    resultado = resultado_vazio(path, f"Processo de conversão interrompido: {e or type(e).__name__}")
+                resultados.append(resultado)
+                if resultado['erro']:
+                    print(f"❌ {resultado['arquivo']}: {resultado['erro']}")
+                else:
+                    print(f"✅ {resultado['arquivo']} → {resultado['saida']} "
+                          f"({resultado['registros']} voos, {resultado['duracao']:.2f}s, "
+                          f"{resultado.get('linhas_por_segundo', 0):,.0f} linhas/s)")
+
+    resumo = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'opcoes': opcoes,
+        'total': len(resultados),
+        'sucesso': sum(1 for r in resultados if not r['erro']),
+        'falhas': sum(1 for r in resultados if r['erro']),
+        'registros': sum(r['registros'] for r in resultados),
+        'duracao': round(time.perf_counter() - inicio, 3),
+        'arquivos': resultados,
+    }
+
+    if resumo_path:
+        with open(resumo_path, 'w') as file:
+            json.dump(resumo, file, indent=2, ensure_ascii=False)
+
+    print(f"📊 {resumo['sucesso']} convertido(s), {resumo['falhas']} falha(s) em {resumo['duracao']:.2f}s")
+    return resumo
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Conversão CIRIUM → SSIM em streaming - Dnata Brasil
+Lê o extrato em blocos de linhas, codifica cada bloco e grava o SSIM incrementalmente
+com memória limitada (ordenação por voo via runs ordenados em disco + merge)
+"""
+
+import heapq
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from companhias import coluna_companhia, codigos_companhia
+from etapas_voo import carregar_timezones, converter_datas, interpretar_janela, periodo_na_janela, recortar_periodo, registros_tipo3
+from exportacao import exportacao_registros
+from extrato_parquet import COLUNAS_TEXTO_CSV
+from ssim_layout import escrever_ssim
+from sirium_to_ssim_converter import adaptar_cirium, limpar_dados_cirium, parse_date_sfo
+
+CHUNK_PADRAO = 50000
+
+# Marcadores de 7 caracteres para datas ausentes (trocados pelo período global no merge)
+MARCADOR_MIN = "#MIN###"
+MARCADOR_MAX = "#MAX###"
+
+# Ordinal usado para Eff Date ausente (fica por último, como o NaT no sort_values)
+SEM_DATA = 99999999
+
+def ler_blocos_extrato(path, chunk_size=CHUNK_PADRAO, header=None):
+    """
+    Gera DataFrames de até chunk_size linhas do extrato
+    Excel (.xlsx): openpyxl read-only (iter_rows); CSV: pandas chunksize; Parquet: row groups em lotes (pyarrow)
+    header: linha do cabeçalho (padrão 4 para Excel CIRIUM, 0 para CSV)
+    """
+    if path.lower().endswith('.csv'):
+        yield from pd.read_csv(path, header=header or 0, chunksize=chunk_size, dtype=COLUNAS_TEXTO_CSV)
+        return
+
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield lote.to_pandas()
+        return
+
+    if path.lower().endswith('.xls'):
+        # openpyxl não lê .xls; arquivos .xls são limitados a 65536 linhas
+        df = pd.read_excel(path, header=4 if header is None else header)
+        for inicio in range(0, len(df), chunk_size):
+            yield df.iloc[inicio:inicio + chunk_size]
+        return
+
+    import openpyxl
+    from pandas.io.parsers import TextParser
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        planilha = workbook.worksheets[0]
+        planilha.reset_dimensions()  # extratos CIRIUM não trazem a dimensão correta da planilha
+        linhas = planilha.iter_rows(values_only=True)
+        for _ in range(4 if header is None else header):
+            next(linhas, None)
+
+        cabecalho = list(next(linhas, None) or [])
+
+        def montar(bloco):
+            # Mesmo parser que o pd.read_excel usa (inferência de tipos e valores NA)
+            return TextParser([cabecalho] + bloco, header=0).read()
+
+        bloco = []
+        for valores in linhas:
+            bloco.append(list(valores[:len(cabecalho)]))
+            if len(bloco) >= chunk_size:
+                yield montar(bloco)
+                bloco = []
+        if bloco:
+            yield montar(bloco)
+    finally:
+        workbook.close()
+
+def _gravar_run(pasta, numero, registros):
+    """Ordena um bloco de registros e grava como run em disco"""
+    registros.sort()
+    path = os.path.join(pasta, f"run_{numero:05d}.tsv")
+    with open(path, 'w') as file:
+        for ordem, voo, eff, seq, numero_voo, prefixo in registros:
+            file.write(f"{ordem}\t{voo!r}\t{eff}\t{seq}\t{numero_voo}\t{prefixo}\n")
+    return path
+
+def _ler_run(path):
+    """Lê um run ordenado do disco"""
+    with open(path, 'r') as file:
+        for linha in file:
+            ordem, voo, eff, seq, numero_voo, prefixo = linha.rstrip('\n').split('\t', 5)
+            yield ordem, float(voo), int(eff), int(seq), numero_voo, prefixo
+
+def gerar_ssim_streaming(excel_path, companhias=None, output_file=None, chunk_size=CHUNK_PADRAO, header=None,
+                         exportar_para=None, janela=None):
+    """
+    Gera SSIM a partir de extratos muito grandes sem carregar o arquivo inteiro
+    companhias=None → todas as companhias (ALL); lista → companhias selecionadas (MIX ou a própria)
+    exportar_para: arquivo .csv/.parquet/.jsonl com os registros tipo 3, gravado em lotes junto com o SSIM
+    janela: só os períodos dentro de (inicio, fim), 'AAAA-MM-DD:AAAA-MM-DD' ou N próximos dias, recortados a ela
+    """
+    try:
+        janela = interpretar_janela(janela)
+        print(f"🔄 GERANDO SSIM EM STREAMING ({'TODAS AS COMPANHIAS' if not companhias else ', '.join(companhias)})")
+        print("=" * 60)
+
+        iata_to_timezone = carregar_timezones()
+        selecionadas = {codigo: i for i, codigo in enumerate(companhias)} if companhias else None
+
+        data_min = None
+        data_max = None
+        linhas_lidas = 0
+        linhas_validas = 0
+        seq = 0
+
+        with tempfile.TemporaryDirectory(prefix="ssim_stream_") as pasta:
+            runs = []
+
+            # Passo 1: ler, limpar e codificar cada bloco, gravando runs ordenados
+            for bloco in ler_blocos_extrato(excel_path, chunk_size, header):
+                linhas_lidas += len(bloco)
+                if 'Orig' not in bloco.columns or 'Dest' not in bloco.columns:
+                    raise ValueError("Colunas Orig/Dest não encontradas no extrato")
+
+                bloco = limpar_dados_cirium(bloco)
+                airline_col = coluna_companhia(bloco)
+                if not airline_col:
+                    raise ValueError("Coluna de companhia aérea não encontrada")
+
+                # Códigos IATA normalizados (mesma regra do ALL em memória, ver companhias)
+                codigos = codigos_companhia(bloco[airline_col])
+                if selecionadas is None:
+                    mascara = codigos.notna()
+                else:
+                    mascara = codigos.isin(list(selecionadas))
+
+                # Período global: ALL usa todas as linhas limpas, seleção usa só as companhias escolhidas
+                base_periodo = bloco if selecionadas is None else bloco[mascara]
+                if 'Eff Date' in base_periodo.columns and 'Disc Date' in base_periodo.columns:
+                    eff = converter_datas(base_periodo['Eff Date']).dropna()
+                    disc = converter_datas(base_periodo['Disc Date']).dropna()
+                    if len(eff) and len(disc):
+                        data_min = eff.min() if data_min is None else min(data_min, eff.min())
+                        data_max = disc.max() if data_max is None else max(data_max, disc.max())
+
+                bloco, codigos = bloco[mascara], codigos[mascara]
+                linhas_validas += len(bloco)
+
+                # Registros com ocorrência 01 e marcadores de período: acertados no merge
+                etapas = adaptar_cirium(bloco, codigos, iata_to_timezone)
+                if janela is not None:
+                    etapas = recortar_periodo(etapas, janela)
+                prefixos = registros_tipo3(etapas, MARCADOR_MIN, MARCADOR_MAX, contar_ocorrencias=False)
+
+                registros = []
+                for companhia, voo, eff_dt, prefixo in zip(etapas['companhia'], etapas['voo'], etapas['data_inicio'], prefixos):
+                    # ALL: ordem alfabética das companhias; seleção: ordem escolhida pelo usuário
+                    ordem = companhia if selecionadas is None else f"{selecionadas[companhia]:04d}"
+                    eff = int(eff_dt.strftime("%Y%m%d")) if pd.notna(eff_dt) else SEM_DATA
+                    registros.append((ordem, float(voo), eff, seq, str(voo), prefixo))
+                    seq += 1
+
+                if registros:
+                    runs.append(_gravar_run(pasta, len(runs), registros))
+                print(f"  📦 Bloco processado: {linhas_lidas} linhas lidas, {linhas_validas} válidas")
+
+            if data_min is None or data_max is None:
+                data_min = datetime.now()
+                data_max = datetime.now() + timedelta(days=30)
+            data_min, data_max = periodo_na_janela(data_min, data_max, janela)
+            data_min_str = parse_date_sfo(data_min)
+            data_max_str = parse_date_sfo(data_max)
+            data_emissao = datetime.now().strftime("%d%b%y").upper()
+            data_emissao2 = datetime.now().strftime("%Y%m%d")
+
+            if not companhias:
+                codigo = "ALL"
+            else:
+                codigo = "MIX" if len(companhias) > 1 else companhias[0]
+
+            if output_file is None:
+                if not companhias:
+                    output_file = f"ALL_COMPANIES_{data_emissao2}_{data_min_str}-{data_max_str}.ssim"
+                else:
+                    output_file = f"MULTIPLE_{'_'.join(companhias)}_{data_emissao2}_{data_min_str}-{data_max_str}.ssim"
+
+            print(f"📝 Gerando arquivo: {output_file}")
+
+            # Passo 2: merge dos runs ordenados, atribuindo contador de datas e período global
+            def registros_ordenados():
+                flight_date_counter = {}
+                for _, _, _, _, numero_voo, prefixo in heapq.merge(*(_ler_run(path) for path in runs)):
+                    companhia = prefixo[2:4].strip()
+                    voo_key = f"{companhia}_{numero_voo}"
+                    flight_date_counter[voo_key] = flight_date_counter.get(voo_key, 0) + 1
+
+                    posicao = 5 + len(numero_voo.zfill(4))
+                    prefixo = prefixo[:posicao] + str(flight_date_counter[voo_key]).zfill(2) + prefixo[posicao + 2:]
+                    if '#' in prefixo:
+                        prefixo = prefixo.replace(MARCADOR_MIN, data_min_str).replace(MARCADOR_MAX, data_max_str)
+                    yield prefixo
+
+            separador = " " if codigo == "ALL" else "  "
+            with open(output_file, 'w') as file, exportacao_registros(exportar_para) as exportar:
+                numero_linha = escrever_ssim(file, codigo, data_min_str, data_max_str, data_emissao, registros_ordenados(),
+                                             separador, exportar=exportar)
+
+        print(f"✅ Arquivo SSIM (streaming) gerado: {output_file}")
+        print(f"📊 Total de linhas: {numero_linha}")
+        print(f"✈️  Voos processados: {linhas_validas} de {linhas_lidas} linhas lidas")
+
+        return output_file
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Detecção do formato de arquivos de malha - Dnata Brasil
+Identifica extratos CIRIUM/SFO (cabeçalho na linha 5) e malhas TS.09 (cabeçalho na linha 1)
+olhando só os bytes iniciais (assinatura xlsx/xls/Parquet) e as primeiras linhas da planilha.
+A planilha aberta (pd.ExcelFile) é devolvida para o conversor ler sem abrir o arquivo de novo.
+Exportações CSV e Parquet trazem as mesmas colunas com o cabeçalho na primeira linha.
+"""
+
+import csv
+import io
+import os
+
+import pandas as pd
+
+EXTENSOES_SUPORTADAS = ('.xlsx', '.xls', '.csv', '.parquet')
+
+# Assinaturas: xlsx é um zip, xls é um documento OLE2 (CSV não tem assinatura: vale a extensão)
+ASSINATURAS = {
+    b'PK\x03\x04': ('xlsx', 'openpyxl'),
+    b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1': ('xls', 'xlrd'),
+    b'PAR1': ('parquet', 'pyarrow'),
+}
+TIPOS_TABELA = ('csv', 'parquet')
+BYTES_AMOSTRA_CSV = 64 * 1024
+
+LINHAS_AMOSTRA = 10
+CONFIANCA_MINIMA = 0.5
+
+# nome: {'linha_cabecalho', 'obrigatorias' (colunas ou tuplas de alternativas), 'indicativas'}
+FORMATOS = {}
+
+def registrar_formato(nome, linha_cabecalho, obrigatorias, indicativas=()):
+    """
+    Registra um formato de entrada
+    linha_cabecalho: índice (0 = primeira linha) que o conversor usa como header
+    obrigatorias: colunas que precisam existir; uma tupla aceita qualquer uma das alternativas
+    indicativas: colunas que só aumentam a confiança
+    """
+    FORMATOS[nome] = {
+        'linha_cabecalho': linha_cabecalho,
+        'obrigatorias': [grupo if isinstance(grupo, tuple) else (grupo,) for grupo in obrigatorias],
+        'indicativas': list(indicativas),
+    }
+
+registrar_formato("TS09", 0, ['Flight-Number', 'Onward Flight'],
+                  ['Route', 'Date-LT', 'Week-Day-LT', 'Std-LT', 'Sta-LT', 'Flight-Carrier', 'Aircraft-Type'])
+# Extratos SFO usam o mesmo layout CIRIUM e são detectados como "CIRIUM"
+registrar_formato("CIRIUM", 4, [('Mkt Al', 'Op Al'), 'Orig'],
+                  ['Dest', 'Flight', 'Eff Date', 'Disc Date', 'Op Days', 'Equip', 'Dep Time', 'Arr Time'])
+
+def tipo_arquivo(fonte, nome=None):
+    """
+    ('xlsx'|'xls'|'parquet', engine) pela assinatura dos primeiros bytes, ('csv', 'c') pela extensão
+    do nome (ou do caminho), ou (None, None)
+    """
+    if isinstance(fonte, (bytes, bytearray)):
+        inicio = bytes(fonte[:8])
+    elif hasattr(fonte, 'read'):
+        posicao = fonte.tell()
+        inicio = fonte.read(8)
+        fonte.seek(posicao)
+    else:
+        with open(fonte, 'rb') as file:
+            inicio = file.read(8)
+    for assinatura, tipo in ASSINATURAS.items():
+        if inicio.startswith(assinatura):
+            return tipo
+    if nome is None and isinstance(fonte, (str, os.PathLike)):
+        nome = os.fspath(fonte)
+    if nome and nome.lower().endswith('.csv'):
+        return 'csv', 'c'
+    return None, None
+
+def primeiras_linhas(excel, linhas=LINHAS_AMOSTRA):
+    """Primeiras linhas da primeira aba como listas de textos (leitura em streaming, sem carregar a planilha)"""
+    if excel.engine == 'openpyxl':
+        planilha = excel.book.worksheets[0]
+        if getattr(planilha, 'reset_dimensions', None):
+            # Modo read-only: dimensões gravadas no arquivo podem estar erradas (mesmo ajuste do pandas)
+            planilha.reset_dimensions()
+        valores = planilha.iter_rows(max_row=linhas, values_only=True)
+    else:
+        planilha = excel.book.sheet_by_index(0)
+        valores = (planilha.row_values(i) for i in range(min(linhas, planilha.nrows)))
+    return [[str(valor).strip() for valor in linha if valor is not None and str(valor).strip()] for linha in valores]
+
+def primeiras_linhas_tabela(fonte, tipo, linhas=LINHAS_AMOSTRA):
+    """Primeiras linhas de um CSV (só o início do arquivo) ou os nomes das colunas de um Parquet"""
+    if tipo == 'parquet':
+        import pyarrow.parquet as pq
+        return [list(pq.ParquetFile(fonte).schema_arrow.names)]
+
+    if hasattr(fonte, 'read'):
+        posicao = fonte.tell()
+        inicio = fonte.read(BYTES_AMOSTRA_CSV)
+        fonte.seek(posicao)
+    else:
+        with open(fonte, 'rb') as file:
+            inicio = file.read(BYTES_AMOSTRA_CSV)
+    texto = inicio.decode('utf-8-sig', errors='replace').splitlines()[:linhas]
+    return [[valor.strip() for valor in linha if valor.strip()] for linha in csv.reader(texto)]
+
+def pontuar(linhas, formato, linha_cabecalho=None):
+    """
+    (confiança 0-1, linha do cabeçalho) do formato nas primeiras linhas
+    linha_cabecalho: linha esperada do cabeçalho (padrão: a do formato no Excel)
+    """
+    definicao = FORMATOS[formato]
+    esperada = definicao['linha_cabecalho'] if linha_cabecalho is None else linha_cabecalho
+    total = len(definicao['obrigatorias']) + len(definicao['indicativas'])
+    melhor = (0.0, None)
+    for indice, celulas in enumerate(linhas):
+        colunas = set(celulas)
+        if not all(colunas.intersection(grupo) for grupo in definicao['obrigatorias']):
+            continue
+        confianca = (len(definicao['obrigatorias']) + sum(col in colunas for col in definicao['indicativas'])) / total
+        if indice != esperada:
+            # O conversor lê o cabeçalho numa linha fixa: em outra linha o arquivo provavelmente não converte
+            confianca /= 2
+        melhor = max(melhor, (round(confianca, 3), indice), key=lambda item: item[0])
+    return melhor
+
+def detectar(fonte, linhas=LINHAS_AMOSTRA, nome=None):
+    """
+    Detecta o formato de um caminho, bytes ou arquivo em memória. Retorna um dicionário:
+      formato ("TS09", "CIRIUM" ou "UNKNOWN"), confianca, linha_cabecalho, tipo ('xlsx'/'xls'/'csv'/'parquet'),
+      candidatos {formato: confianca} e excel (pd.ExcelFile aberto, para repassar ao conversor; None se não abriu
+      ou se a entrada é CSV/Parquet)
+    nome: nome do arquivo enviado (arquivos em memória), usado para reconhecer CSV pela extensão
+    """
+    if isinstance(fonte, (bytes, bytearray)):
+        fonte = io.BytesIO(fonte)
+    resultado = {'formato': "UNKNOWN", 'confianca': 0.0, 'linha_cabecalho': None, 'tipo': None,
+                 'candidatos': {}, 'excel': None}
+
+    tipo, engine = tipo_arquivo(fonte, nome)
+    if tipo is None:
+        return resultado
+    resultado['tipo'] = tipo
+
+    linha_cabecalho = None
+    try:
+        if tipo in TIPOS_TABELA:
+            amostra = primeiras_linhas_tabela(fonte, tipo, linhas)
+            linha_cabecalho = 0
+        else:
+            excel = pd.ExcelFile(fonte, engine=engine)
+            amostra = primeiras_linhas(excel, linhas)
+            resultado['excel'] = excel
+    except Exception:
+        return resultado
+
+    pontuacoes = {formato: pontuar(amostra, formato, linha_cabecalho) for formato in FORMATOS}
+    resultado['candidatos'] = {formato: confianca for formato, (confianca, _) in pontuacoes.items()}
+    formato, (confianca, linha) = max(pontuacoes.items(), key=lambda item: item[1][0])
+    if confianca >= CONFIANCA_MINIMA:
+        resultado.update(formato=formato, confianca=confianca, linha_cabecalho=linha)
+    return resultado
+
+def detectar_formato(path):
+    """
+    Retorna "TS09", "CIRIUM" ou "UNKNOWN" a partir das colunas do arquivo
+    (extratos SFO usam o mesmo layout CIRIUM e são detectados como "CIRIUM")
+    """
+    deteccao = detectar(path)
+    if deteccao['excel'] is not None:
+        deteccao['excel'].close()
+    return deteccao['formato']
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tabela canônica de etapas de voo - Dnata Brasil
+Cada formato tem um adaptador no módulo do seu conversor (adaptar_cirium, adaptar_sfo, adaptar_ts09)
+que normaliza a planilha numa tabela colunar, uma linha por registro tipo 3. registros_tipo3 monta
+os registros SSIM dessa tabela para todos os formatos, formatando cada valor distinto uma única vez
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from progresso_conversao import PASSO_LINHAS, notificar
+
+# Colunas da tabela: (tipo, valor padrão quando o formato não traz a informação)
+COLUNAS_ETAPAS = {
+    'companhia': (object, ''),                    # código IATA da companhia
+    'voo': ('int64', 1),
+    'status': (object, 'J'),                      # J passageiro, F carga
+    'data_inicio': ('datetime64[ns]', pd.NaT),    # NaT: início do período global
+    'data_fim': ('datetime64[ns]', pd.NaT),       # NaT: fim do período global
+    'dias': ('uint8', 0b1111111),                 # máscara de operação: bit 0 = segunda ... bit 6 = domingo
+    'origem': (object, ''),
+    'destino': (object, ''),
+    'partida': ('int64', 0),                      # HHMM local
+    'chegada': ('int64', 0),
+    'origem_tz': ('float64', 0.0),                # offset UTC em horas
+    'destino_tz': ('float64', 0.0),
+    'equipamento': (object, '320'),               # código IATA da aeronave
+    'proximo_voo': (object, ''),                  # voo seguinte da aeronave (TS.09 Onward Flight)
+}
+
+# Frequência SSIM de cada máscara de dias ('1 3  67')
+FREQUENCIAS = [''.join(str(dia + 1) if mascara >> dia & 1 else ' ' for dia in range(7)) for mascara in range(128)]
+
+def tabela_etapas(index, **colunas):
+    """Tabela canônica no índice da planilha de origem (colunas não informadas recebem o padrão)"""
+    etapas = pd.DataFrame(index=index)
+    for coluna, (tipo, padrao) in COLUNAS_ETAPAS.items():
+        valores = colunas.get(coluna, padrao)
+        if isinstance(valores, pd.Series):
+            valores = valores.to_numpy()
+        etapas[coluna] = pd.Series(valores, index=index).astype(tipo) if tipo != object else pd.Series(
+            valores, index=index, dtype=object)
+    return etapas
+
+def mapear_unicos(serie, funcao):
+    """Aplica funcao uma vez por valor distinto da coluna (conversões de texto/data em colunas repetitivas)"""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    convertidos = np.empty(len(unicos), dtype=object)
+    convertidos[:] = [funcao(valor) for valor in unicos]
+    return pd.Series(convertidos[codigos], index=serie.index)
+
+def _data(valor):
+    if pd.isna(valor):
+        return pd.NaT
+    return pd.to_datetime(str(valor), errors='coerce')
+
+def converter_datas(serie):
+    """Datas valor a valor (só os valores distintos); texto inválido ou vazio vira NaT"""
+    return pd.to_datetime(mapear_unicos(serie, _data))
+
+def formatar_data(data):
+    """Data no formato SSIM (DDMMMYY)"""
+    return data.strftime("%d%b%y").upper()
+
+def dias_de_texto(valor):
+    """Máscara de dias de 'Op Days' ('1.3..67'); vazio ou fora do padrão de 7 posições = todos os dias"""
+    if pd.isna(valor):
+        return 0b1111111
+    texto = str(valor).strip()
+    if len(texto) != 7:
+        return 0b1111111
+    return sum(1 << dia for dia, caractere in enumerate(texto) if caractere not in '. ')
+
+def format_timezone_offset(offset_str):
+    """Formata offset de timezone para padrão SSIM"""
+    try:
+        offset = float(offset_str)
+        hours = int(offset)
+        minutes = int(abs(offset - hours) * 60)
+        if offset >= 0:
+            sign = '+'
+        else:
+            sign = '-'
+            hours = -hours
+        return f"{sign}{abs(hours):02}{minutes:02}"
+    except (ValueError, TypeError):
+        return '+0000'
+
+def carregar_timezones():
+    """Carrega o mapeamento IATA -> timezone (horas) a partir do airport.csv"""
+    try:
+        airport_df = pd.read_csv('airport.csv')
+        airport_df['IATA'] = airport_df['IATA'].str.strip().str.upper()
+        airport_df['Timezone'] = airport_df['Timezone'].replace('\\N', '0')
+        airport_df['Timezone'] = pd.to_numeric(airport_df['Timezone'], errors='coerce').fillna(0)
+        iata_to_timezone = dict(zip(airport_df['IATA'], airport_df['Timezone']))
+        print(f"✅ Aeroportos carregados: {len(airport_df)}")
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar aeroportos: {e}")
+        iata_to_timezone = {}
+    return iata_to_timezone
+
+def carregar_aeronaves():
+    """Carrega o mapeamento ICAO -> IATA de aeronaves a partir do ACT TYPE.xlsx"""
+    try:
+        aircraft_df = pd.read_excel('ACT TYPE.xlsx')
+        aircraft_df['ICAO'] = aircraft_df['ICAO'].str.strip().str.upper()
+        aircraft_df['IATA'] = aircraft_df['IATA'].str.strip()
+        icao_to_iata_aircraft = dict(zip(aircraft_df['ICAO'], aircraft_df['IATA']))
+        print(f"✅ Aeronaves carregadas: {len(aircraft_df)}")
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar aeronaves: {e}")
+        icao_to_iata_aircraft = {}
+    return icao_to_iata_aircraft
+
+def offsets(estacoes, iata_to_timezone):
+    """Offset UTC (horas) de cada aeroporto; 0 para aeroportos fora do airport.csv"""
+    return pd.to_numeric(estacoes.map(iata_to_timezone), errors='coerce').fillna(0.0)
+
+def interpretar_janela(janela, hoje=None):
+    """
+    Janela de datas (inicio, fim) como pd.Timestamp à meia-noite, inclusiva nas duas pontas
+    janela: (inicio, fim) com datas ou textos ISO, 'AAAA-MM-DD:AAAA-MM-DD', ou N / 'N' = próximos N dias a partir de hoje
+    """
+    if janela is None:
+        return None
+    if isinstance(janela, str):
+        janela = janela.strip()
+        janela = int(janela) if janela.isdigit() else tuple(janela.split(':'))
+    if isinstance(janela, (int, np.integer)):
+        if janela < 1:
+            raise ValueError(f"Janela inválida: {janela} dias")
+        inicio = pd.Timestamp(hoje or datetime.now()).normalize()
+        return inicio, inicio + pd.Timedelta(days=int(janela) - 1)
+    if len(janela) != 2:
+        raise ValueError(f"Janela inválida: {janela} (use inicio:fim ou número de dias)")
+    inicio, fim = (pd.Timestamp(valor).normalize() for valor in janela)
+    if inicio > fim:
+        raise ValueError(f"Janela inválida: {inicio.date()} depois de {fim.date()}")
+    return inicio, fim
+
+def periodo_na_janela(data_min, data_max, janela):
+    """Período global recortado pela janela (a própria janela quando não há interseção)"""
+    if janela is None:
+        return data_min, data_max
+    inicio, fim = max(pd.Timestamp(data_min), janela[0]), min(pd.Timestamp(data_max), janela[1])
+    return (inicio, fim) if inicio <= fim else janela
+
+def _dia_semana(datas):
+    """Dia da semana de um array datetime64 (0 = segunda; 01/01/1970 foi uma quinta)"""
+    return (datas.astype('datetime64[D]').astype('int64') + 3) % 7
+
+def _dias_ate_operacao(dias, dia_semana, passo):
+    """Dias até a primeira data de operação a partir de dia_semana, para frente (1) ou para trás (-1); 7 se nenhuma"""
+    deslocamento = np.full(len(dias), 7)
+    for k in range(6, -1, -1):
+        deslocamento = np.where((dias >> ((dia_semana + passo * k) % 7)) & 1 == 1, k, deslocamento)
+    return deslocamento
+
+def _dias_presentes(inicio, fim):
+    """Máscara dos dias da semana que ocorrem entre inicio e fim (inclusive)"""
+    quantidade = np.clip((fim - inicio) // np.timedelta64(1, 'D') + 1, 0, 7)
+    base = (1 << quantidade) - 1
+    dia = _dia_semana(inicio)
+    return ((base << dia) | (base >> (7 - dia))) & 0b1111111
+
+def recortar_periodo(etapas, janela):
+    """
+    Etapas dentro da janela (inicio, fim), por interseção de intervalos em toda a tabela de uma vez:
+    períodos fora da janela saem e data_inicio/data_fim são recortadas a ela. Nas etapas recortadas o
+    período passa a começar e terminar em dias de operação e os dias da semana que deixam de ocorrer
+    saem da máscara (etapas que não operam mais na janela são descartadas). Etapas sem data usam o
+    período global, que o conversor recorta com periodo_na_janela
+    """
+    inicio_janela, fim_janela = janela
+    inicio = etapas['data_inicio'].clip(lower=inicio_janela)
+    fim = etapas['data_fim'].clip(upper=fim_janela)
+    recortadas = (((inicio != etapas['data_inicio']) | (fim != etapas['data_fim'])) & inicio.notna() & fim.notna()).to_numpy()
+
+    inicios = inicio.to_numpy(copy=True)
+    fins = fim.to_numpy(copy=True)
+    dias = etapas['dias'].to_numpy().astype('int64')
+    dias_recortadas = dias[recortadas]
+    um_dia = np.timedelta64(1, 'D')
+    inicios_recortadas = inicios[recortadas] + _dias_ate_operacao(dias_recortadas, _dia_semana(inicios[recortadas]), 1) * um_dia
+    fins_recortadas = fins[recortadas] - _dias_ate_operacao(dias_recortadas, _dia_semana(fins[recortadas]), -1) * um_dia
+    dias[recortadas] = dias_recortadas & _dias_presentes(inicios_recortadas, fins_recortadas)
+    inicios[recortadas] = inicios_recortadas
+    fins[recortadas] = fins_recortadas
+
+    # Etapas com uma só data: fora se a data conhecida já está depois/antes da janela
+    mantidas = ~(etapas['data_inicio'] > fim_janela).to_numpy() & ~(etapas['data_fim'] < inicio_janela).to_numpy()
+    mantidas &= ~recortadas | ((inicios <= fins) & (dias != 0))
+    return etapas.assign(data_inicio=inicios, data_fim=fins, dias=dias.astype('uint8'))[mantidas]
+
+def ordenar_etapas(etapas):
+    """Ordem dos registros CIRIUM: número do voo e início do período (sem data por último)"""
+    return etapas.sort_values(['voo', 'data_inicio'], kind='stable', na_position='last')
+
+def _formatados(serie, funcao):
+    return mapear_unicos(serie, funcao).tolist()
+
+def registros_tipo3(etapas, data_min_str, data_max_str, continuacao=False, contar_ocorrencias=True,
+                    progresso=None, companhia=None, processadas=0, total=None):
+    """
+    Registros tipo 3 (sem o número da linha) da tabela de etapas, na ordem da tabela
+    data_min_str/data_max_str: período global, usado nas etapas sem data
+    continuacao: inclui o bloco de voo seguinte do TS.09 (companhia + proximo_voo)
+    contar_ocorrencias: numera as repetições de cada voo (False grava 01, para quem numera depois)
+    progresso: evento 'linhas' a cada PASSO_LINHAS registros; processadas/total: contagem da conversão toda
+    """
+    if len(etapas) == 0:
+        return []
+
+    if contar_ocorrencias:
+        ocorrencias = (etapas.groupby(['companhia', 'voo'], sort=False).cumcount() + 1).astype(str).str.zfill(2).tolist()
+    else:
+        ocorrencias = ["01"] * len(etapas)
+
+    companhias = _formatados(etapas['companhia'], lambda valor: f"{valor:<2}")
+    voos = etapas['voo'].astype(str)
+    voos_campo = voos.str.zfill(4).tolist()
+    voos_exibicao = voos.str.rjust(5).tolist()
+    inicios = _formatados(etapas['data_inicio'], lambda data: data_min_str if pd.isna(data) else formatar_data(data))
+    fins = _formatados(etapas['data_fim'], lambda data: data_max_str if pd.isna(data) else formatar_data(data))
+    frequencias = [FREQUENCIAS[mascara] for mascara in etapas['dias'].tolist()]
+    origens = _formatados(etapas['origem'], lambda valor: f"{valor:<3}")
+    destinos = _formatados(etapas['destino'], lambda valor: f"{valor:<3}")
+    partidas = [f"{hora:04d}" * 2 for hora in etapas['partida'].tolist()]
+    chegadas = [f"{hora:04d}" * 2 for hora in etapas['chegada'].tolist()]
+    origens_tz = _formatados(etapas['origem_tz'], lambda offset: format_timezone_offset(str(offset)))
+    destinos_tz = _formatados(etapas['destino_tz'], lambda offset: format_timezone_offset(str(offset)))
+    equipamentos = _formatados(etapas['equipamento'], lambda valor: f"{valor:<3}")
+    status = etapas['status'].tolist()
+    if continuacao:
+        caudas = [f"{' ':21}{c}  {proximo:>3}{' ':11}" for c, proximo in zip(companhias, etapas['proximo_voo'].tolist())]
+    else:
+        caudas = [' ' * 48] * len(etapas)
+
+    registros = []
+    for inicio in range(0, len(etapas), PASSO_LINHAS):
+        if progresso is not None and inicio:
+            notificar(progresso, 'linhas', companhia=companhia, processadas=processadas + inicio, total=total)
+        fim = inicio + PASSO_LINHAS
+        registros.extend(
+            f"3 {c} {v}{o}01{s}{di}{df}{fr} {org}{p}{otz}  {dst}{ch}{dtz}  {eq}{' ':53}{c}{' ':7}{c}{ve}{cauda}"
+            for c, v, o, s, di, df, fr, org, p, otz, dst, ch, dtz, eq, ve, cauda in zip(
+                companhias[inicio:fim], voos_campo[inicio:fim], ocorrencias[inicio:fim], status[inicio:fim],
+                inicios[inicio:fim], fins[inicio:fim], frequencias[inicio:fim], origens[inicio:fim],
+                partidas[inicio:fim], origens_tz[inicio:fim], destinos[inicio:fim], chegadas[inicio:fim],
+                destinos_tz[inicio:fim], equipamentos[inicio:fim], voos_exibicao[inicio:fim], caudas[inicio:fim],
+            )
+        )
+    return registros
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Exportação tabular dos registros SSIM - Dnata Brasil
+Grava os registros tipo 3 finais (com serial) em CSV, Parquet ou JSON Lines na mesma passada
+que escreve o SSIM: escrever_ssim entrega cada registro ao callback de exportacao_registros, que
+acumula lotes e recorta as colunas de uma vez pelas posições de CAMPOS_TIPO3 (sem reler o arquivo)
+"""
+
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+
+from extrato_parquet import PARQUET_DISPONIVEL
+from ssim_layout import CAMPOS_TIPO3
+
+FORMATOS_EXPORTACAO = {'.csv': 'csv', '.parquet': 'parquet', '.jsonl': 'jsonl'}
+LOTE_EXPORTACAO = 50000
+
+def formato_exportacao(destino):
+    """'csv', 'parquet' ou 'jsonl' pela extensão do arquivo de destino"""
+    extensao = os.path.splitext(destino)[1].lower()
+    if extensao not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação não suportado: {extensao or destino} (use .csv, .parquet ou .jsonl)")
+    if FORMATOS_EXPORTACAO[extensao] == 'parquet' and not PARQUET_DISPONIVEL:
+        raise ValueError("Exportação Parquet requer o pyarrow (pip install pyarrow)")
+    return FORMATOS_EXPORTACAO[extensao]
+
+def tabela_registros(registros):
+    """Colunas tipadas de uma lista de registros tipo 3 completos (200 colunas)"""
+    linhas = pd.Series(registros, dtype=str)
+    # O serial é sempre o fim do registro (no TS.09 ele vem logo após o bloco de continuação, antes da coluna 193)
+    preenchidas = linhas.str.rstrip()
+    seriais = preenchidas.str[-8:]
+    caudas = preenchidas.str[:-8].str[CAMPOS_TIPO3['proximo_voo']]
+
+    def campo(nome):
+        return linhas.str[CAMPOS_TIPO3[nome]]
+
+    def data(nome):
+        return pd.to_datetime(campo(nome).str.title(), format="%d%b%y")
+
+    return pd.DataFrame({
+        'serial': seriais.astype('int64'),
+        'companhia': campo('companhia').str.strip(),
+        'voo': campo('voo').astype('int64'),
+        'variacao': campo('variacao').astype('int64'),
+        'etapa': campo('etapa').astype('int64'),
+        'status': campo('status'),
+        'data_inicio': data('data_inicio'),
+        'data_fim': data('data_fim'),
+        'frequencia': campo('frequencia'),
+        'origem': campo('origem').str.strip(),
+        'partida': campo('partida').str[:4],
+        'origem_tz': campo('origem_tz'),
+        'destino': campo('destino').str.strip(),
+        'chegada': campo('chegada').str[:4],
+        'destino_tz': campo('destino_tz'),
+        'equipamento': campo('equipamento').str.strip(),
+        # Bloco de continuação do TS.09 ("TS  101"): só o número do voo seguinte
+        'proximo_voo': caudas.str.split().str[1].fillna('').astype(str),
+    })
+
+def _gravar_lote(estado, registros):
+    tabela = tabela_registros(registros)
+    formato = estado['formato']
+    if formato == 'csv':
+        tabela.to_csv(estado['arquivo'], header=estado['linhas'] == 0, index=False)
+    elif formato == 'jsonl':
+        for coluna in ('data_inicio', 'data_fim'):
+            tabela[coluna] = tabela[coluna].dt.strftime("%Y-%m-%d")
+        if len(tabela):
+            tabela.to_json(estado['arquivo'], orient='records', lines=True)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        lote = pa.Table.from_pandas(tabela, preserve_index=False)
+        if estado['arquivo'] is None:
+            estado['arquivo'] = pq.ParquetWriter(estado['destino'], lote.schema)
+        estado['arquivo'].write_table(lote)
+    estado['linhas'] += len(tabela)
+
+@contextmanager
+def exportacao_registros(destino):
+    """
+    Contexto que entrega o callback exportar de escrever_ssim (None sem destino)
+    O formato vem da extensão do destino (.csv, .parquet, .jsonl); os registros são gravados em lotes
+    de LOTE_EXPORTACAO linhas. Se a conversão falhar, o arquivo parcial é removido.
+    """
+    if destino is None:
+        yield None
+        return
+
+    formato = formato_exportacao(destino)
+    estado = {'formato': formato, 'destino': destino, 'linhas': 0, 'pendentes': [],
+              'arquivo': None if formato == 'parquet' else open(destino, 'w', newline='')}
+
+    def exportar(registro):
+        estado['pendentes'].append(registro)
+        if len(estado['pendentes']) >= LOTE_EXPORTACAO:
+            _gravar_lote(estado, estado['pendentes'])
+            estado['pendentes'] = []
+
+    concluida = False
+    try:
+        yield exportar
+        if estado['pendentes'] or estado['linhas'] == 0:
+            _gravar_lote(estado, estado['pendentes'])
+        concluida = True
+    finally:
+        if estado['arquivo'] is not None:
+            estado['arquivo'].close()
+        if concluida:
+            print(f"📤 Exportação {formato}: {destino} ({estado['linhas']} registros)")
+        elif os.path.exists(destino):
+            os.remove(destino)
+
+def exportar_ssim(ssim_path, destino):
+    """Exporta os registros tipo 3 de um arquivo SSIM já gerado (ex.: conversão reaproveitada do cache)"""
+    with exportacao_registros(destino) as exportar, open(ssim_path, 'r') as file:
+        for linha in file:
+            if linha.startswith('3'):
+                exportar(linha.rstrip('\n'))
+    return destino
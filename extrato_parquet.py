@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cópia Parquet das planilhas de malha - Dnata Brasil
+A primeira leitura de um extrato grava a tabela lida (com os tipos já inferidos pelo pandas) em
+<cache_dir>/<hash do arquivo>_<linha do cabeçalho>_v<formato>.parquet; as leituras seguintes do mesmo arquivo
+(conversões, prévias, scripts de análise) carregam o Parquet em vez de reprocessar o Excel.
+A validação continua rodando sobre a tabela lida, então relatórios de rejeitadas e o cache de
+blocos por companhia não mudam.
+ler_planilha também lê as exportações CSV e Parquet do mesmo extrato (cabeçalho na primeira linha),
+que seguem pelo mesmo caminho de limpeza e geração do SSIM.
+"""
+
+import os
+import tempfile
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+from cache_conversao import hash_arquivo
+from deteccao_formato import tipo_arquivo
+
+try:
+    import pyarrow  # noqa: F401 (engine do pd.read_parquet / DataFrame.to_parquet)
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+EXTRATOS_DIR_PADRAO = os.path.join('.ssim_cache', 'extratos')
+
+# Versão do layout do arquivo Parquet (mudanças na codificação invalidam as cópias antigas)
+FORMATO_EXTRATO = 1
+
+# Colunas com tipos misturados (ex.: Flight com os números e os textos do rodapé) não cabem numa coluna
+# Parquet: são gravadas como texto mais uma coluna com o tipo de cada valor, para voltarem idênticas
+TIPOS_MISTOS = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': lambda texto: texto == 'True',
+    'int64': np.int64,
+    'float64': np.float64,
+    'datetime': datetime.fromisoformat,
+    'Timestamp': pd.Timestamp,
+    'time': time.fromisoformat,
+    'NaTType': lambda texto: pd.NaT,
+    'NoneType': lambda texto: None,
+}
+PREFIXO_TIPO = '__tipo__:'
+
+# Colunas lidas como texto nos CSV, como o Excel entrega (ex.: Op Days '1234567' não vira número)
+COLUNAS_TEXTO_CSV = {
+    coluna: str for coluna in (
+        'Mkt Al', 'Op Al', 'Orig', 'Dest', 'Equip', 'Eff Date', 'Disc Date', 'Op Days',                  # CIRIUM/SFO
+        'Flight-Carrier', 'Route', 'Date-LT', 'Std-LT', 'Sta-LT', 'Aircraft-Type', 'Onward Flight',     # TS.09
+    )
+}
+
+def caminho_extrato(cache_dir, hash_entrada, header):
+    return os.path.join(cache_dir, f"{hash_entrada}_{header}_v{FORMATO_EXTRATO}.parquet")
+
+def _codificar(df):
+    """Tabela gravável em Parquet: colunas object viram texto + coluna com o tipo de cada valor"""
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype != object or pd.api.types.infer_dtype(serie, skipna=False) == 'string':
+            colunas[coluna] = serie
+            continue
+        tipos = [type(valor).__name__ for valor in serie.tolist()]
+        tipos = [tipo if tipo in TIPOS_MISTOS else 'str' for tipo in tipos]
+        colunas[coluna] = pd.Series([None if valor is None else str(valor) for valor in serie.tolist()],
+                                    index=df.index, dtype=object)
+        colunas[PREFIXO_TIPO + coluna] = pd.Series(tipos, index=df.index, dtype='category')
+    return pd.DataFrame(colunas, index=df.index)
+
+def _decodificar(tabela):
+    """Desfaz _codificar (cada par texto/tipo distinto é convertido uma única vez)"""
+    for coluna_tipo in [coluna for coluna in tabela.columns if coluna.startswith(PREFIXO_TIPO)]:
+        coluna = coluna_tipo[len(PREFIXO_TIPO):]
+        convertidos = {}
+        valores = []
+        for texto, tipo in zip(tabela[coluna].tolist(), tabela[coluna_tipo].astype(str).tolist()):
+            chave = (texto, tipo)
+            if chave not in convertidos:
+                convertidos[chave] = TIPOS_MISTOS[tipo](texto)
+            valores.append(convertidos[chave])
+        tabela[coluna] = pd.Series(valores, index=tabela.index, dtype=object)
+        del tabela[coluna_tipo]
+    return tabela
+
+def salvar_extrato(df, destino):
+    """Grava a cópia Parquet de forma atômica (arquivo temporário + rename); retorna True se gravou"""
+    if not all(isinstance(coluna, str) for coluna in df.columns):
+        # Parquet só aceita nomes de coluna em texto
+        return False
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(destino) or '.', suffix='.tmp')
+    os.close(descritor)
+    try:
+        _codificar(df).to_parquet(temporario)
+        os.replace(temporario, destino)
+        return True
+    except Exception as e:
+        print(f"⚠️ Cópia Parquet não gravada: {e}")
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False
+
+def carregar_extrato(origem):
+    return _decodificar(pd.read_parquet(origem))
+
+def _ler(fonte, tipo, header):
+    if tipo == 'csv':
+        return pd.read_csv(fonte, dtype=COLUNAS_TEXTO_CSV)
+    if tipo == 'parquet':
+        return pd.read_parquet(fonte)
+    return pd.read_excel(fonte, header=header)
+
+def ler_planilha(fonte, header=0, cache_dir=None, nome=None):
+    """
+    Tabela do extrato: pd.read_excel(fonte, header=header), ou a exportação CSV/Parquet com as mesmas
+    colunas (o cabeçalho fica na primeira linha e header é ignorado)
+    nome: nome do arquivo enviado, para reconhecer CSV em memória pela extensão
+    Com cache_dir, a tabela lida de um caminho de arquivo Excel/CSV ganha uma cópia Parquet
+    (pd.ExcelFile e arquivos em memória são lidos direto; exige o pyarrow); None desliga a cópia
+    """
+    if isinstance(fonte, pd.ExcelFile):
+        return pd.read_excel(fonte, header=header)
+    tipo, _ = tipo_arquivo(fonte, nome)
+    if cache_dir is None or not PARQUET_DISPONIVEL or tipo == 'parquet' or not isinstance(fonte, (str, os.PathLike)):
+        return _ler(fonte, tipo, header)
+
+    destino = caminho_extrato(cache_dir, hash_arquivo(fonte), header)
+    if os.path.exists(destino):
+        try:
+            df = carregar_extrato(destino)
+            print(f"♻️  Planilha lida da cópia Parquet: {destino}")
+            return df
+        except Exception as e:
+            print(f"⚠️ Cópia Parquet ilegível, relendo a planilha: {e}")
+
+    df = _ler(fonte, tipo, header)
+    salvar_extrato(df, destino)
+    return df
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Gerador de malhas sintéticas - Dnata Brasil
+Cria planilhas CIRIUM (cabeçalho na linha 5), SFO e TS.09 com o mesmo layout dos extratos reais,
+em tamanhos e quantidades de companhias configuráveis, para benchmarks dos conversores
+"""
+
+import argparse
+import os
+from datetime import date, timedelta
+
+import numpy as np
+from openpyxl import Workbook
+
+COLUNAS_CIRIUM = [
+    'Mkt Al', 'Alliance', 'Op Al', 'Orig', 'Dest', 'Miles', 'Flight', 'Sequence', 'Routing', 'Stops', 'Equip',
+    'Seats', 'First', 'Business', 'Prem Econ', 'Econ', 'Other', 'Dep Term', 'Arr Term', 'Dep Time', 'Arr Time',
+    'Block Mins', 'Arr Flag', 'Orig WAC', 'Dest WAC', 'Eff Date', 'Disc Date', 'Op Days', 'Ops/Week', 'Seats/Week',
+]
+
+COLUNAS_TS09 = [
+    'Aircraft-Type', 'ACV', 'Date-LT', 'Week-Day-LT', 'Type', 'Flight-Carrier', 'Flight-Number', 'Std-UTC',
+    'Std-LT', 'Route', 'Sta-UTC', 'Sta-LT', 'Duration', 'Onward Flight',
+]
+
+COMPANHIAS_REAIS = ['EK', 'SQ', 'MU', 'CZ', 'QF', 'NZ', 'CX', 'QR', 'EY', 'LA', 'JL', 'NH', 'KE', 'TK', 'BA', 'AF']
+AEROPORTOS = ['SYD', 'CAN', 'SZX', 'DXB', 'SIN', 'PVG', 'AKL', 'HKG', 'NRT', 'MEL', 'BNE', 'PER', 'DOH', 'GRU',
+              'LHR', 'JFK', 'LAX', 'ICN', 'BKK', 'KUL']
+EQUIPAMENTOS = ['350', '359', '333', '77W', '77X', '388', '332', '321', '320', '789', '738']
+EQUIPAMENTOS_TS09 = [('332', 'J12Y333'), ('321', 'Y198'), ('32Q', 'J12Y187')]
+AEROPORTOS_TS09 = ['LGW', 'PUJ', 'LIS', 'OPO', 'FAO', 'CUN', 'MBJ', 'YVR', 'YUL', 'MAN']
+
+RODAPE_CIRIUM = [
+    ('Use Data Loaded', 'This Week'),
+    ('Service Type', 'Pax and Cargo (All)'),
+    ('Show overlapping markets in both directions?', 'No (Half Alpha)'),
+]
+
+def codigos_companhias(quantidade):
+    """Códigos IATA: primeiro companhias reais do extrato, depois códigos sintéticos de duas letras"""
+    codigos = COMPANHIAS_REAIS[:quantidade]
+    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    for primeira in letras:
+        for segunda in letras + '0123456789':
+            if len(codigos) >= quantidade:
+                return codigos
+            codigo = primeira + segunda
+            if codigo not in codigos:
+                codigos.append(codigo)
+    return codigos
+
+def _hhmm(minutos):
+    """Minutos do dia -> HHMM inteiro (formato Dep Time/Arr Time do CIRIUM)"""
+    minutos = minutos % 1440
+    return (minutos // 60) * 100 + minutos % 60
+
+def _dias_operacao(rng, linhas):
+    """Op Days no formato '1.3..67' a partir de uma máscara aleatória (pelo menos um dia)"""
+    mascara = rng.random((linhas, 7)) < 0.6
+    mascara[np.arange(linhas), rng.integers(0, 7, linhas)] = True
+    dias = np.where(mascara, np.array(list('1234567')), '.')
+    return [''.join(linha) for linha in dias], mascara.sum(axis=1)
+
+def gerar_cirium(path, linhas, companhias=4, origem=None, seed=0, inicio=date(2025, 10, 1)):
+    """
+    Grava um extrato CIRIUM sintético (título, cabeçalho na linha 5, voos e rodapé do relatório)
+    origem: fixa o aeroporto de origem (ex.: 'SFO' para extratos SFO)
+    Retorna o caminho do arquivo
+    """
+    rng = np.random.default_rng(seed)
+    codigos = codigos_companhias(companhias)
+    companhia = np.array(codigos)[rng.integers(0, len(codigos), linhas)]
+    origens = np.full(linhas, origem) if origem else np.array(AEROPORTOS)[rng.integers(0, len(AEROPORTOS), linhas)]
+    destinos = np.array(AEROPORTOS)[rng.integers(0, len(AEROPORTOS), linhas)]
+    destinos = np.where(destinos == origens, 'DXB', destinos)
+    destinos = np.where(destinos == origens, 'SIN', destinos)
+    voos = rng.integers(1, 10000, linhas)
+    partida = rng.integers(0, 288, linhas) * 5
+    bloco = rng.integers(60, 900, linhas)
+    chegada = partida + bloco
+    assentos = rng.integers(150, 500, linhas)
+    eff = rng.integers(0, 20, linhas)
+    disc = eff + rng.integers(0, 30, linhas)
+    op_days, ops_semana = _dias_operacao(rng, linhas)
+    equipamentos = np.array(EQUIPAMENTOS)[rng.integers(0, len(EQUIPAMENTOS), linhas)]
+    datas = [(inicio + timedelta(days=int(d))).isoformat() for d in range(int(disc.max()) + 1)]
+
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet()
+    planilha.append([f"Schedule Weekly Extract Report for  flights operated by {', '.join(codigos)} (synthetic)"])
+    for _ in range(3):
+        planilha.append([])
+    planilha.append(COLUNAS_CIRIUM)
+
+    for i in range(linhas):
+        planilha.append([
+            companhia[i], None, companhia[i], origens[i], destinos[i], int(bloco[i]) * 8, int(voos[i]), 1,
+            f"{origens[i]}-{destinos[i]}", 0, equipamentos[i], int(assentos[i]), 0, int(assentos[i]) // 10, 0,
+            int(assentos[i]) - int(assentos[i]) // 10, 0, 1, None, _hhmm(int(partida[i])), _hhmm(int(chegada[i])),
+            int(bloco[i]), int(chegada[i] // 1440), 800, 700, datas[eff[i]], datas[disc[i]], op_days[i],
+            int(ops_semana[i]), int(ops_semana[i]) * int(assentos[i]),
+        ])
+
+    planilha.append([])
+    for rotulo, valor in RODAPE_CIRIUM:
+        planilha.append([None, rotulo, None, None, None, None, valor])
+
+    workbook.save(path)
+    return path
+
+def gerar_sfo(path, linhas, companhias=4, seed=0):
+    """Extrato no layout CIRIUM com todas as partidas de SFO"""
+    return gerar_cirium(path, linhas, companhias, origem='SFO', seed=seed)
+
+def gerar_ts09(path, linhas, companhia='TS', seed=0, inicio=date(2025, 9, 1)):
+    """
+    Grava uma malha TS.09 sintética: voos diários de ida e volta a partir de YYZ
+    Retorna o caminho do arquivo
+    """
+    rng = np.random.default_rng(seed)
+    pares = max(linhas // 60, 1)
+    destinos = np.array(AEROPORTOS_TS09)[rng.integers(0, len(AEROPORTOS_TS09), pares)]
+    partidas = rng.integers(0, 288, pares) * 5
+    duracoes = rng.integers(60, 600, pares) // 5 * 5
+    equipamentos = rng.integers(0, len(EQUIPAMENTOS_TS09), pares)
+
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet()
+    planilha.append(COLUNAS_TS09)
+
+    def hora(minutos):
+        minutos = int(minutos) % 1440
+        return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+    escritas = 0
+    dia = 0
+    while escritas < linhas:
+        data = inicio + timedelta(days=dia)
+        data_lt = data.strftime("%d%b%y").upper()
+        for par in range(pares):
+            for volta in (0, 1):
+                if escritas >= linhas:
+                    break
+                numero = 100 + par * 2 + volta
+                rota = f"{destinos[par]} / YYZ" if volta else f"YYZ / {destinos[par]}"
+                saida = partidas[par] + (duracoes[par] + 90 if volta else 0)
+                aeronave, acv = EQUIPAMENTOS_TS09[equipamentos[par]]
+                planilha.append([
+                    aeronave, acv, data_lt, data.isoweekday(), 'J', companhia, numero, hora(saida + 240),
+                    hora(saida), rota, hora(saida + duracoes[par] + 240), hora(saida + duracoes[par]),
+                    hora(duracoes[par]), f"{companhia}{numero - 1 if volta else numero + 1}",
+                ])
+                escritas += 1
+        dia += 1
+
+    workbook.save(path)
+    return path
+
+GERADORES = {
+    'CIRIUM': gerar_cirium,
+    'SFO': gerar_sfo,
+    'TS09': lambda path, linhas, companhias=1, seed=0: gerar_ts09(path, linhas, seed=seed),  # uma companhia (TS)
+}
+
+def arquivo_sintetico(formato, linhas, companhias, pasta, seed=0):
+    """Planilha sintética em cache na pasta (gerada só na primeira vez)"""
+    os.makedirs(pasta, exist_ok=True)
+    path = os.path.join(pasta, f"{formato.lower()}_{linhas}_{companhias}_{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"🧪 Gerando {formato} sintético: {linhas:,} linhas, {companhias} companhia(s)")
+        GERADORES[formato](path + '.tmp.xlsx', linhas, companhias, seed=seed)
+        os.replace(path + '.tmp.xlsx', path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas CIRIUM/SFO/TS.09")
+    parser.add_argument('formato', choices=sorted(GERADORES))
+    parser.add_argument('linhas', type=int)
+    parser.add_argument('-c', '--companhias', type=int, default=4)
+    parser.add_argument('-o', '--saida', required=True, help="Arquivo .xlsx de saída")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    GERADORES[args.formato](args.saida, args.linhas, args.companhias, seed=args.seed)
+    print(f"✅ {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Conversão por estação - Dnata Brasil
+indexar_estacoes monta uma vez por extrato o índice aeroporto → posições das linhas (por Orig e por Dest);
+filtrar_estacoes usa o índice para recortar o extrato lido às linhas que tocam as estações escolhidas
+antes da limpeza e da codificação, sem varrer as colunas de novo a cada seleção
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from progresso_conversao import notificar
+
+# Sentido do filtro: partidas e chegadas, só partidas (Orig) ou só chegadas (Dest)
+SENTIDOS = ('ambos', 'origem', 'destino')
+COLUNAS_ESTACOES = {'origem': 'Orig', 'destino': 'Dest'}
+
+def normalizar_estacoes(estacoes):
+    """Códigos IATA em maiúsculas, sem repetição e ordenados ('gru, GIG' ou lista); None/vazio → []"""
+    if estacoes is None:
+        return []
+    if isinstance(estacoes, str):
+        estacoes = estacoes.split(',')
+    return sorted({str(estacao).strip().upper() for estacao in estacoes if str(estacao).strip()})
+
+def _posicoes_por_codigo(serie):
+    codigos = serie.astype(str).str.strip().str.upper().where(serie.notna())
+    return {codigo: posicoes for codigo, posicoes in codigos.groupby(codigos, sort=False).indices.items()}
+
+def impressao_estacoes(df):
+    """Impressão digital das colunas Orig/Dest (hash do conteúdo, na ordem das linhas)"""
+    colunas = [coluna for coluna in COLUNAS_ESTACOES.values() if coluna in df.columns]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(",".join(colunas).encode())
+    if colunas:
+        h.update(pd.util.hash_pandas_object(df[colunas], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def indexar_estacoes(df):
+    """
+    Índice das estações do extrato: {'linhas': n, 'impressao': hash de Orig/Dest,
+    'origem': {codigo: posições}, 'destino': {codigo: posições}}
+    As posições (np.ndarray ordenado) valem para o DataFrame com a mesma impressão (df.iloc)
+    """
+    indice = {'linhas': len(df), 'impressao': impressao_estacoes(df), 'origem': {}, 'destino': {}}
+    for sentido, coluna in COLUNAS_ESTACOES.items():
+        if coluna in df.columns:
+            indice[sentido] = _posicoes_por_codigo(df[coluna])
+    return indice
+
+def estacoes_disponiveis(indice):
+    """{codigo: linhas} dos aeroportos do índice (códigos de 3 letras), ordenado pelo código"""
+    contagem = {}
+    for sentido in ('origem', 'destino'):
+        for codigo, posicoes in indice[sentido].items():
+            if len(codigo) == 3 and codigo.isalpha():
+                contagem[codigo] = contagem.get(codigo, 0) + len(posicoes)
+    return dict(sorted(contagem.items()))
+
+def posicoes_estacoes(indice, estacoes, sentido='ambos'):
+    """Posições (ordenadas, sem repetição) das linhas com Orig e/ou Dest numa das estações"""
+    if sentido not in SENTIDOS:
+        raise ValueError(f"Sentido inválido: {sentido} (use {', '.join(SENTIDOS)})")
+    sentidos = ('origem', 'destino') if sentido == 'ambos' else (sentido,)
+    partes = [indice[s][codigo] for s in sentidos for codigo in normalizar_estacoes(estacoes) if codigo in indice[s]]
+    if not partes:
+        return np.array([], dtype=np.intp)
+    return np.unique(np.concatenate(partes))
+
+def filtrar_estacoes(df, estacoes, sentido='ambos', indice=None, progresso=None):
+    """
+    Linhas do extrato que tocam as estações (df.iloc, índice original preservado para os relatórios)
+    indice: índice já montado para este extrato (ex.: o do upload no app); ausente ou montado de
+    outro conteúdo (impressão de Orig/Dest diferente), é montado aqui. Imprime a redução e envia o evento 'estacoes'
+    """
+    estacoes = normalizar_estacoes(estacoes)
+    if not estacoes:
+        return df
+    if indice is None or indice['linhas'] != len(df) or indice.get('impressao') != impressao_estacoes(df):
+        indice = indexar_estacoes(df)
+
+    df_estacoes = df.iloc[posicoes_estacoes(indice, estacoes, sentido)]
+    print(f"📍 Estações {', '.join(estacoes)} ({sentido}): {len(df)} → {len(df_estacoes)} linhas")
+    notificar(progresso, 'estacoes', estacoes=estacoes, sentido=sentido, linhas_entrada=len(df),
+              linhas_saida=len(df_estacoes))
+    return df_estacoes
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Monitor de pasta para conversão automática - Dnata Brasil
+Observa uma pasta de entrada, espera os arquivos estabilizarem e converte os novos em um pool limitado
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from cache_conversao import hash_arquivo
+from conversao_lote import converter_arquivo, listar_arquivos
+
+ARQUIVO_ESTADO = '.convertidos.json'
+PASTA_TEMPORARIA = '.tmp'
+
+def assinatura(path):
+    """Tamanho + mtime: muda enquanto o arquivo ainda está sendo copiado"""
+    info = os.stat(path)
+    return info.st_size, info.st_mtime_ns
+
+def carregar_estado(path):
+    """Hashes dos arquivos já convertidos → nome do SSIM gerado"""
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_estado(path, estado):
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with open(temporario, 'w') as file:
+        json.dump(estado, file, indent=2, ensure_ascii=False)
+    os.replace(temporario, path)
+
+def monitorar_pasta(entrada, saida, opcoes=None, workers=2, intervalo=2.0, espera=5.0, ciclos=None):
+    """
+    Converte continuamente os arquivos que chegam em `entrada`, gravando os SSIM em `saida`.
+    - espera: segundos sem mudança de tamanho/mtime antes de converter (arquivos em cópia)
+    - workers: processos de conversão; no máximo `workers` arquivos em andamento ao mesmo tempo
+    - arquivos já convertidos (mesmo conteúdo) são ignorados pelo hash, mesmo com outro nome
+    - ciclos: número de varreduras (None = até Ctrl+C)
+    Retorna a lista de resultados das conversões feitas.
+    """
+    opcoes = dict(opcoes or {})
+    opcoes.setdefault('modo', "ALL_COMPANIES")
+    os.makedirs(saida, exist_ok=True)
+    temporaria = os.path.join(saida, PASTA_TEMPORARIA)
+    estado_path = os.path.join(saida, ARQUIVO_ESTADO)
+    estado = carregar_estado(estado_path)
+
+    vistos = {}        # path → (assinatura, instante em que ficou estável)
+    conhecidos = {}    # path → assinatura já tratada (convertida, ignorada ou com falha)
+    em_andamento = {}  # futuro → (path, hash, assinatura)
+    falhas = set()     # hashes que falharam (só tenta de novo se o conteúdo mudar)
+    resultados = []
+
+    def recolher(futuros):
+        """Publica a saída das conversões terminadas (os.replace da pasta temporária)"""
+        for futuro in futuros:
+            path, chave, sig = em_andamento.pop(futuro)
+            conhecidos[path] = sig
+            pasta_job = os.path.join(temporaria, chave[:16])
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                resultado = {'arquivo': path, 'saida': None, 'registros': 0, 'erro': str(e)}
+
+            if resultado['erro']:
+                falhas.add(chave)
+                print(f"❌ {path}: {resultado['erro']}")
+            else:
+                try:
+                    destino = os.path.join(saida, os.path.basename(resultado['saida']))
+                    os.replace(resultado['saida'], destino)
+                    resultado['saida'] = destino
+                    if resultado.get('exportacao'):
+                        exportacao = os.path.join(saida, os.path.basename(resultado['exportacao']))
+                        os.replace(resultado['exportacao'], exportacao)
+                        resultado['exportacao'] = exportacao
+                    estado[chave] = {'arquivo': os.path.basename(path), 'saida': os.path.basename(destino),
+                                     'registros': resultado['registros']}
+                    salvar_estado(estado_path, estado)
+                    print(f"✅ {path} → {destino} ({resultado['registros']} voos)")
+                except OSError as e:
+                    # Falha ao publicar não derruba o monitor: o arquivo fica registrado como erro
+                    resultado['erro'] = f"Erro ao publicar a saída: {e}"
+                    print(f"❌ {path}: {resultado['erro']}")
+            shutil.rmtree(pasta_job, ignore_errors=True)
+            resultados.append(resultado)
+
+    print(f"👀 Monitorando {entrada} → {saida} ({workers} worker(s))")
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    ciclo = 0
+    try:
+        while ciclos is None or ciclo < ciclos:
+            ciclo += 1
+
+            # 1. Recolher conversões terminadas
+            recolher([f for f in em_andamento if f.done()])
+
+            # 2. Procurar arquivos novos e estáveis
+            agora = time.monotonic()
+            ocupados = {path for path, _, _ in em_andamento.values()}
+            chaves_ocupadas = {chave for _, chave, _ in em_andamento.values()}
+            for path in listar_arquivos([entrada]):
+                if path in ocupados:
+                    continue
+                try:
+                    sig = assinatura(path)
+                except OSError:
+                    continue
+                if conhecidos.get(path) == sig:
+                    continue
+                if path not in vistos or vistos[path][0] != sig:
+                    vistos[path] = (sig, agora)
+                    continue
+                if agora - vistos[path][1] < espera or len(em_andamento) >= workers:
+                    continue
+
+                chave = hash_arquivo(path)
+                # Mesmo conteúdo já convertido, com falha ou em conversão agora (cópia com outro nome
+                # na mesma varredura): usaria a mesma pasta temporária, então só o primeiro é convertido
+                if chave in estado or chave in falhas or chave in chaves_ocupadas:
+                    conhecidos[path] = sig
+                    continue
+
+                pasta_job = os.path.join(temporaria, chave[:16])
+                os.makedirs(pasta_job, exist_ok=True)
+                futuro = pool.submit(converter_arquivo, path, pasta_job, opcoes)
+                em_andamento[futuro] = (path, chave, sig)
+                ocupados.add(path)
+                chaves_ocupadas.add(chave)
+                del vistos[path]
+                print(f"🔄 Convertendo {path}")
+
+            if ciclos is None or ciclo < ciclos:
+                time.sleep(intervalo)
+
+        # Fim das varreduras: terminar o que já está em andamento
+        wait(list(em_andamento))
+        recolher(list(em_andamento))
+    except KeyboardInterrupt:
+        print("⏹️  Monitor interrompido")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return resultados
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Relatório de desempenho das conversões SSIM - Dnata Brasil
+Executa qualquer conversor (gerar_ssim_*) e devolve o arquivo junto com o relatório:
+tempo de relógio e de CPU por etapa, linhas de entrada/saída, rejeitadas e pico de memória,
+com captura opcional do cProfile em disco
+"""
+
+import cProfile
+import json
+import sys
+import time
+
+from progresso_conversao import coletor_eventos
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False  # Windows
+
+def memoria_pico_mb():
+    """Pico de memória residente do processo (MB) ou None se indisponível"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def converter_com_perfil(conversor, *args, cprofile_path=None, progresso=None, **kwargs):
+    """
+    Executa conversor(*args, progresso=..., **kwargs) e retorna (arquivo, relatorio)
+    cprofile_path: grava as estatísticas do cProfile (.prof, abrir com pstats/snakeviz)
+    progresso: callback adicional que também recebe os eventos
+    """
+    coletar, estatisticas = coletor_eventos()
+
+    def progresso_combinado(evento):
+        coletar(evento)
+        if progresso is not None:
+            progresso(evento)
+
+    profiler = cProfile.Profile() if cprofile_path else None
+    inicio_relogio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        arquivo = conversor(*args, progresso=progresso_combinado, **kwargs)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+
+    relatorio = {
+        'conversor': getattr(conversor, '__name__', str(conversor)),
+        'arquivo': arquivo,
+        'duracao': round(time.perf_counter() - inicio_relogio, 4),
+        'cpu': round(time.process_time() - inicio_cpu, 4),
+        'etapas': estatisticas['etapas'],
+        'linhas_entrada': estatisticas['linhas_entrada'],
+        'linhas_saida': estatisticas['linhas_saida'],
+        'rejeitadas': estatisticas['rejeitadas'],
+        'motivos': estatisticas['motivos'],
+        'codeshare_removidas': estatisticas['codeshare_removidas'],
+        'bytes': estatisticas['bytes'],
+        'linhas_por_segundo': estatisticas['linhas_por_segundo'],
+        'memoria_pico_mb': memoria_pico_mb(),
+        'cprofile': cprofile_path,
+    }
+    return arquivo, relatorio
+
+def formatar_relatorio(relatorio):
+    """Texto do relatório para log/console"""
+    linhas = [f"⏱️  {relatorio['conversor']}: {relatorio['duracao']:.3f}s (CPU {relatorio['cpu']:.3f}s)"]
+    for etapa, dados in relatorio['etapas'].items():
+        contagem = f", {dados['linhas']} linhas" if dados.get('linhas') is not None else ""
+        linhas.append(f"   {etapa:<12} {dados['duracao']:8.3f}s  CPU {dados['cpu']:8.3f}s{contagem}")
+    linhas.append(f"   Linhas: {relatorio['linhas_entrada']} lidas → {relatorio['linhas_saida']} registros, "
+                  f"{relatorio['rejeitadas']} rejeitadas")
+    if relatorio['motivos']:
+        linhas.append("   Rejeitadas: " + ", ".join(f"{m}: {n}" for m, n in relatorio['motivos'].items()))
+    if relatorio['codeshare_removidas']:
+        linhas.append(f"   Codeshare: {relatorio['codeshare_removidas']} duplicatas removidas (só operadora)")
+    if relatorio['memoria_pico_mb'] is not None:
+        linhas.append(f"   Pico de memória: {relatorio['memoria_pico_mb']} MB")
+    if relatorio['cprofile']:
+        linhas.append(f"   cProfile: {relatorio['cprofile']}")
+    return "\n".join(linhas)
+
+def salvar_relatorio(relatorio, path):
+    with open(path, 'w') as file:
+        json.dump(relatorio, file, indent=2, ensure_ascii=False)
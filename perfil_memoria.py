@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Perfil de memória das conversões SSIM - Dnata Brasil
+Executa um conversor (gerar_ssim_*) com tracemalloc e amostragem de RSS e registra, por etapa
+(leitura, limpeza, referencias, codificacao, escrita), o pico de alocação e as linhas do projeto
+que mais alocaram. A ordenação dos voos acontece por companhia dentro da codificação e aparece
+nas linhas de ordenar_etapas. O tracemalloc deixa a conversão ~3x mais lenta com 1 quadro de pilha
+(e dezenas de vezes com pilhas profundas): use só para diagnóstico.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from perfil_conversao import memoria_pico_mb
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+# Quadros de pilha por alocação: 1 atribui à linha que alocou (às vezes dentro do pandas);
+# mais quadros permitem subir até a linha do projeto, ao custo de muito mais tempo
+QUADROS_TRACEMALLOC = 1
+MB = 1024 * 1024
+
+def rss_atual_mb():
+    """Memória residente atual do processo (MB), via /proc; None fora do Linux"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _AmostradorRSS(threading.Thread):
+    """Lê o RSS a cada `intervalo` segundos e guarda o maior valor desde o último reinicio()"""
+
+    def __init__(self, intervalo):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.pico = rss_atual_mb()
+        self.parar = threading.Event()
+
+    def reiniciar(self):
+        self.pico = rss_atual_mb()
+
+    def run(self):
+        while not self.parar.wait(self.intervalo):
+            atual = rss_atual_mb()
+            if atual is not None and (self.pico is None or atual > self.pico):
+                self.pico = atual
+
+# Arquivos da instrumentação: alocações feitas neles são atribuídas a quem chamou
+ARQUIVOS_INSTRUMENTACAO = ('perfil_memoria.py', 'progresso_conversao.py')
+
+PASTAS_BIBLIOTECAS = sorted({os.path.join(pasta, '') for pasta in sys.path if pasta}, key=len, reverse=True)
+
+def _linha_do_projeto(quadros):
+    """Quadro mais interno dentro do projeto (a linha nossa que disparou a alocação) ou o quadro mais interno"""
+    for arquivo, linha in quadros:
+        if arquivo.startswith(PASTA_PROJETO) and os.path.basename(arquivo) not in ARQUIVOS_INSTRUMENTACAO:
+            return f"{os.path.basename(arquivo)}:{linha}"
+    arquivo, linha = quadros[0]
+    if os.path.basename(arquivo) in ARQUIVOS_INSTRUMENTACAO or arquivo == tracemalloc.__file__:
+        return None
+    # Bibliotecas: caminho relativo ao sys.path (ex.: pandas/io/excel/_openpyxl.py)
+    for pasta in PASTAS_BIBLIOTECAS:
+        if arquivo.startswith(pasta):
+            return f"{arquivo[len(pasta):]}:{linha}"
+    return f"{arquivo}:{linha}"
+
+def memoria_por_linha():
+    """
+    Memória viva por linha: {'arquivo.py:linha': bytes}
+    Uma passada sobre os traces crus (quadros do mais recente ao mais antigo); cada traceback
+    distinto é resolvido uma única vez. Snapshot.compare_to('traceback') é lento demais com 100k+ linhas.
+    """
+    por_traceback = {}
+    por_linha = {}
+    for _, tamanho, quadros, *_ in tracemalloc.take_snapshot().traces._traces:
+        chave = id(quadros)
+        if chave not in por_traceback:
+            por_traceback[chave] = _linha_do_projeto(quadros)
+        linha = por_traceback[chave]
+        if linha is not None:
+            por_linha[linha] = por_linha.get(linha, 0) + tamanho
+    return por_linha
+
+def maiores_alocacoes(antes, depois, top=10):
+    """Linhas com maior crescimento de memória entre duas medições de memoria_por_linha(): [{'linha', 'mb'}]"""
+    crescimento = {linha: tamanho - antes.get(linha, 0) for linha, tamanho in depois.items()}
+    ordenadas = sorted((item for item in crescimento.items() if item[1] > 0), key=lambda item: -item[1])[:top]
+    return [{'linha': linha, 'mb': round(tamanho / MB, 2)} for linha, tamanho in ordenadas]
+
+def converter_com_memoria(conversor, *args, top=10, quadros=QUADROS_TRACEMALLOC, intervalo_rss=0.05, progresso=None,
+                          **kwargs):
+    """
+    Executa conversor(*args, progresso=..., **kwargs) com tracemalloc e retorna (arquivo, relatorio)
+    top: linhas de maior alocação por etapa (memória retida ao fim da etapa; 0 desliga)
+    quadros: profundidade de pilha do tracemalloc (ver QUADROS_TRACEMALLOC)
+    intervalo_rss: segundos entre leituras do RSS
+    """
+    etapas = {}
+    abertas = {}
+    ultima_medicao = {'por_linha': {}}
+    amostrador = _AmostradorRSS(intervalo_rss)
+
+    def progresso_memoria(evento):
+        if evento['evento'] == 'etapa_inicio':
+            tracemalloc.reset_peak()
+            amostrador.reiniciar()
+            abertas[evento['etapa']] = tracemalloc.get_traced_memory()[0]
+        elif evento['evento'] == 'etapa_fim' and evento['etapa'] in abertas:
+            atual, pico = tracemalloc.get_traced_memory()
+            memoria_inicio = abertas.pop(evento['etapa'])
+            por_linha = memoria_por_linha() if top else {}
+            etapas[evento['etapa']] = {
+                'pico_mb': round(pico / MB, 2),
+                'acrescimo_mb': round((pico - memoria_inicio) / MB, 2),
+                'retido_mb': round((atual - memoria_inicio) / MB, 2),
+                'rss_pico_mb': round(max(amostrador.pico or 0, rss_atual_mb() or 0), 1) or None,
+                'top': maiores_alocacoes(ultima_medicao['por_linha'], por_linha, top),
+            }
+            ultima_medicao['por_linha'] = por_linha
+        if progresso is not None:
+            progresso(evento)
+
+    ja_ativo = tracemalloc.is_tracing()
+    if not ja_ativo:
+        tracemalloc.start(quadros)
+    amostrador.start()
+    inicio = time.perf_counter()
+    try:
+        arquivo = conversor(*args, progresso=progresso_memoria, **kwargs)
+        pico_total = tracemalloc.get_traced_memory()[1]
+    finally:
+        amostrador.parar.set()
+        amostrador.join()
+        if not ja_ativo:
+            tracemalloc.stop()
+
+    pico_total = max([pico_total] + [int(dados['pico_mb'] * MB) for dados in etapas.values()])
+    relatorio = {
+        'conversor': getattr(conversor, '__name__', str(conversor)),
+        'arquivo': arquivo,
+        'duracao': round(time.perf_counter() - inicio, 4),
+        'pico_mb': round(pico_total / MB, 2),
+        'etapa_pico': max(etapas, key=lambda etapa: etapas[etapa]['pico_mb']) if etapas else None,
+        'rss_pico_mb': memoria_pico_mb(),
+        'etapas': etapas,
+    }
+    return arquivo, relatorio
+
+def formatar_relatorio_memoria(relatorio):
+    """Texto do relatório de memória para log/console"""
+    linhas = [f"🧠 {relatorio['conversor']}: pico Python {relatorio['pico_mb']:.1f} MB"
+              + (f", RSS {relatorio['rss_pico_mb']} MB" if relatorio['rss_pico_mb'] is not None else "")
+              + (f" (maior etapa: {relatorio['etapa_pico']})" if relatorio['etapa_pico'] else "")]
+    for etapa, dados in relatorio['etapas'].items():
+        rss = f"  RSS {dados['rss_pico_mb']:8.1f} MB" if dados['rss_pico_mb'] else ""
+        linhas.append(f"   {etapa:<12} pico {dados['pico_mb']:8.1f} MB  +{dados['acrescimo_mb']:.1f} MB{rss}")
+        for alocacao in dados['top']:
+            linhas.append(f"      {alocacao['mb']:8.2f} MB  {alocacao['linha']}")
+    return "\n".join(linhas)
+
+def salvar_relatorio_memoria(relatorio, path):
+    with open(path, 'w') as file:
+        json.dump(relatorio, file, indent=2, ensure_ascii=False)
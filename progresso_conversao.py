@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Progresso das conversões SSIM - Dnata Brasil
+Os conversores recebem um callback `progresso(evento)` opcional e chamam com dicionários:
+  {'evento': 'etapa_inicio', 'etapa': 'leitura'}
+  {'evento': 'etapa_fim', 'etapa': 'leitura', 'duracao': 0.84, 'cpu': 0.81, 'linhas': 52000}
+  {'evento': 'linhas', 'companhia': 'EK', 'processadas': 1000, 'total': 52000}
+  {'evento': 'companhia', 'companhia': 'EK', 'voos': 830, 'processadas': 1830, 'total': 52000}
+  {'evento': 'saida', 'arquivo': 'ALL.ssim', 'bytes': 10452210, 'linhas': 52010}
+  {'evento': 'rejeitadas', 'etapa': 'limpeza', 'total': 23, 'motivos': {'SEM_ROTA': 23}, 'tabela': DataFrame}
+  {'evento': 'codeshare', 'linhas_entrada': 9000, 'linhas_saida': 3100, 'removidas': 5900, 'sem_operadora': 40,
+   'reducao': 0.6556, 'tabela': DataFrame de parceiros}  (só no modo só operadora)
+  {'evento': 'estacoes', 'estacoes': ['GRU'], 'sentido': 'ambos', 'linhas_entrada': 52000, 'linhas_saida': 1400}
+   (só com filtro de estações)
+Etapas: leitura, limpeza, referencias, codificacao, escrita.
+O callback pode levantar ConversaoCancelada para interromper a conversão.
+"""
+
+import os
+import time
+
+# Intervalo (em linhas) entre eventos 'linhas'
+PASSO_LINHAS = 1000
+
+class ConversaoCancelada(BaseException):
+    """
+    Levantada pelo callback de progresso para cancelar a conversão.
+    Herda de BaseException para atravessar os `except Exception` dos conversores (que tratam erros por linha).
+    """
+
+def notificar(progresso, evento, **dados):
+    """Envia um evento ao callback (se houver)"""
+    if progresso is not None:
+        dados['evento'] = evento
+        progresso(dados)
+
+def iniciar_etapa(progresso, etapa):
+    """Evento 'etapa_inicio'; retorna os instantes de início (relógio e CPU) para concluir_etapa"""
+    notificar(progresso, 'etapa_inicio', etapa=etapa)
+    return time.perf_counter(), time.process_time()
+
+def concluir_etapa(progresso, etapa, inicio, **dados):
+    """Evento 'etapa_fim' com a duração (relógio) e o tempo de CPU da etapa"""
+    if progresso is not None:
+        notificar(progresso, 'etapa_fim', etapa=etapa, duracao=time.perf_counter() - inicio[0],
+                  cpu=time.process_time() - inicio[1], **dados)
+
+def notificar_saida(progresso, output_file, linhas):
+    """Evento 'saida' com o tamanho do arquivo SSIM gravado"""
+    if progresso is not None:
+        notificar(progresso, 'saida', arquivo=output_file, bytes=os.path.getsize(output_file), linhas=linhas)
+
+def coletor_eventos():
+    """
+    Callback que acumula as estatísticas da conversão (para logs de vazão na CLI e no serviço)
+    Retorna (progresso, estatisticas)
+    """
+    estatisticas = {'etapas': {}, 'linhas': 0, 'companhias': 0, 'bytes': 0, 'linhas_por_segundo': 0.0,
+                    'linhas_entrada': 0, 'linhas_saida': 0, 'rejeitadas': 0, 'motivos': {}, 'codeshare_removidas': 0}
+
+    def progresso(evento):
+        tipo = evento['evento']
+        if tipo == 'etapa_fim':
+            etapa = evento['etapa']
+            estatisticas['etapas'][etapa] = {'duracao': round(evento['duracao'], 4), 'cpu': round(evento['cpu'], 4),
+                                             'linhas': evento.get('linhas')}
+            if etapa == 'leitura':
+                estatisticas['linhas_entrada'] = evento.get('linhas', 0)
+            elif etapa == 'codificacao':
+                estatisticas['linhas_saida'] = evento.get('linhas', 0)
+                if evento.get('linhas') and evento['duracao'] > 0:
+                    estatisticas['linhas_por_segundo'] = round(evento['linhas'] / evento['duracao'], 1)
+        elif tipo in ('linhas', 'companhia'):
+            estatisticas['linhas'] = max(estatisticas['linhas'], evento['processadas'])
+            if tipo == 'companhia':
+                estatisticas['companhias'] += 1
+        elif tipo == 'saida':
+            estatisticas['bytes'] = evento['bytes']
+        elif tipo == 'codeshare':
+            estatisticas['codeshare_removidas'] += evento['removidas']
+        elif tipo == 'rejeitadas':
+            estatisticas['rejeitadas'] += evento['total']
+            for motivo, quantidade in evento['motivos'].items():
+                estatisticas['motivos'][motivo] = estatisticas['motivos'].get(motivo, 0) + quantidade
+
+    return progresso, estatisticas
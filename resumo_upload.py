@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Resumo do extrato enviado ao app - Dnata Brasil
+Calculado uma vez por upload (o app guarda em st.cache_data): contagem de voos por companhia,
+voos únicos, rotas e período, para as métricas e os cartões de companhia não varrerem
+o DataFrame a cada interação
+"""
+
+import pandas as pd
+
+from companhias import coluna_companhia, codigos_companhia, descobrir_companhias
+
+def resumir_upload(df):
+    """
+    Resumo do extrato: dicionário com
+      linhas, coluna_companhia, companhias (ordenadas), voos_por_companhia {codigo: n}, nomes_companhias {codigo: nome},
+      voos_unicos, rotas, data_inicio, data_fim e as tabelas pequenas de pares distintos
+      (companhia, voo) e (companhia, Orig, Dest) usadas nas métricas de uma seleção
+    """
+    airline_col = coluna_companhia(df)
+    resumo = {
+        'linhas': len(df),
+        'coluna_companhia': airline_col,
+        'companhias': [],
+        'voos_por_companhia': {},
+        'nomes_companhias': {},
+        'voos_unicos': int(df['Flight'].nunique()) if 'Flight' in df.columns else None,
+        'rotas': len(df[['Orig', 'Dest']].drop_duplicates()) if {'Orig', 'Dest'} <= set(df.columns) else None,
+        'data_inicio': None,
+        'data_fim': None,
+        'pares_voo': None,
+        'pares_rota': None,
+    }
+
+    if {'Eff Date', 'Disc Date'} <= set(df.columns):
+        inicio = pd.to_datetime(df['Eff Date'], errors='coerce').min()
+        fim = pd.to_datetime(df['Disc Date'], errors='coerce').max()
+        resumo['data_inicio'] = None if pd.isna(inicio) else inicio.date()
+        resumo['data_fim'] = None if pd.isna(fim) else fim.date()
+
+    if airline_col is None:
+        return resumo
+
+    codigos = codigos_companhia(df[airline_col])
+    companhias = descobrir_companhias(df[airline_col], codigos)
+    resumo['companhias'] = companhias['codigo'].tolist()
+    resumo['voos_por_companhia'] = dict(zip(companhias['codigo'], companhias['linhas'].tolist()))
+    resumo['nomes_companhias'] = dict(zip(companhias['codigo'], companhias['nome']))
+
+    tabela = pd.DataFrame({'companhia': codigos}, index=df.index)
+    if 'Flight' in df.columns:
+        resumo['pares_voo'] = tabela.assign(voo=df['Flight']).dropna().drop_duplicates()
+    if {'Orig', 'Dest'} <= set(df.columns):
+        resumo['pares_rota'] = tabela.assign(orig=df['Orig'], dest=df['Dest']).dropna(subset=['companhia']).drop_duplicates()
+    return resumo
+
+def metricas_selecao(resumo, companhias=None):
+    """
+    (voos, voos_unicos, rotas) das companhias selecionadas, sem tocar no DataFrame do extrato
+    companhias=None: extrato inteiro
+    """
+    if companhias is None:
+        return resumo['linhas'], resumo['voos_unicos'], resumo['rotas']
+
+    voos = sum(resumo['voos_por_companhia'].get(codigo, 0) for codigo in companhias)
+    voos_unicos = rotas = None
+    if resumo['pares_voo'] is not None:
+        voos_unicos = int(resumo['pares_voo'].loc[resumo['pares_voo']['companhia'].isin(companhias), 'voo'].nunique())
+    if resumo['pares_rota'] is not None:
+        pares = resumo['pares_rota'][resumo['pares_rota']['companhia'].isin(companhias)]
+        rotas = len(pares[['orig', 'dest']].drop_duplicates())
+    return voos, voos_unicos, rotas
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Serviço HTTP de conversão SSIM - Dnata Brasil
+Servidor asyncio (somente biblioteca padrão) com fila de jobs executados em um pool de processos
+
+Endpoints:
+  POST /jobs?modo=ALL_COMPANIES|MULTIPLE|SINGLE&companhias=EK,CZ&nome=extrato.xlsx
+       corpo = arquivo Excel CIRIUM → 202 {"id": ..., "status": "na_fila"} (503 com a fila cheia)
+  GET  /jobs/<id>           → status do job
+  GET  /jobs/<id>/download  → arquivo SSIM (streaming)
+  GET  /health              → estado da fila
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from cache_conversao import MODOS
+from progresso_conversao import coletor_eventos
+
+TAMANHO_MAXIMO_UPLOAD = 500 * 1024 * 1024   # 500 MB
+BLOCO_STREAMING = 64 * 1024
+RETENCAO_JOBS = 3600            # segundos que um job concluído (e sua pasta) fica disponível para download
+MAXIMO_JOBS_CONCLUIDOS = 100    # jobs concluídos mantidos; os mais antigos saem antes do prazo
+
+STATUS_HTTP = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+def pastas_cache(pasta_cache):
+    """Caches do serviço (conversões, blocos por companhia e extratos em Parquet) dentro de pasta_cache"""
+    return {
+        'conversoes': os.path.join(pasta_cache, 'conversoes'),
+        'blocos': os.path.join(pasta_cache, 'companhias'),
+        'extratos': os.path.join(pasta_cache, 'extratos'),
+    }
+
+def executar_conversao(entrada, modo, companhias, output_file, caches):
+    """Executado no pool de processos: converte com cache e devolve (arquivo, registros, estatisticas, erro)"""
+    from cache_conversao import converter_com_cache
+    from conversao_lote import contar_registros
+
+    log = io.StringIO()
+    progresso, estatisticas = coletor_eventos()
+    try:
+        with contextlib.redirect_stdout(log):
+            saida = converter_com_cache(entrada, modo, companhias, output_file,
+                                        cache_dir=caches['conversoes'], cache_blocos=caches['blocos'],
+                                        progresso=progresso, cache_extrato=caches['extratos'])
+    except Exception as e:
+        return None, 0, estatisticas, str(e)
+    if not saida:
+        erros = [linha for linha in log.getvalue().splitlines() if '❌' in linha]
+        return None, 0, estatisticas, erros[-1] if erros else "Falha na conversão"
+    return saida, contar_registros(saida), estatisticas, None
+
+def criar_servico(workers=2, fila_maxima=20, pasta_trabalho=None, pasta_cache=None,
+                  retencao=RETENCAO_JOBS, maximo_concluidos=MAXIMO_JOBS_CONCLUIDOS):
+    """
+    Estado do serviço: jobs, fila limitada, pool de processos e caches
+    Sem pasta_cache os caches ficam em <pasta_trabalho>/cache (e não no .ssim_cache do diretório atual)
+    Jobs concluídos são removidos (com a pasta) após retencao segundos ou além de maximo_concluidos
+    """
+    pasta = pasta_trabalho or tempfile.mkdtemp(prefix="ssim_servico_")
+    return {
+        'jobs': {},
+        'fila': asyncio.Queue(maxsize=fila_maxima),
+        'pool': ProcessPoolExecutor(max_workers=workers),
+        'workers': workers,
+        'pasta': pasta,
+        'caches': pastas_cache(pasta_cache or os.path.join(pasta, 'cache')),
+        'retencao': retencao,
+        'maximo_concluidos': maximo_concluidos,
+    }
+
+def limpar_jobs(servico, agora=None):
+    """
+    Remove os jobs concluídos (ou com erro) vencidos e os que passam do limite, do mais antigo ao mais novo,
+    apagando a pasta de cada um. Retorna os ids removidos
+    """
+    agora = time.time() if agora is None else agora
+    concluidos = sorted((job for job in servico['jobs'].values() if job['fim'] is not None), key=lambda job: job['fim'])
+    excedentes = max(len(concluidos) - servico['maximo_concluidos'], 0)
+    removidos = []
+    for posicao, job in enumerate(concluidos):
+        if posicao < excedentes or agora - job['fim'] > servico['retencao']:
+            del servico['jobs'][job['id']]
+            shutil.rmtree(job['pasta'], ignore_errors=True)
+            removidos.append(job['id'])
+    return removidos
+
+def resumo_job(job):
+    return {chave: job[chave] for chave in
+            ('id', 'status', 'modo', 'companhias', 'arquivo', 'registros', 'estatisticas', 'erro', 'criado', 'inicio', 'fim')}
+
+async def executar_jobs(servico):
+    """Consumidor da fila: um por worker do pool"""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await servico['fila'].get()
+        job['status'] = 'processando'
+        job['inicio'] = time.time()
+        try:
+            saida, registros, estatisticas, erro = await loop.run_in_executor(
+                servico['pool'], executar_conversao, job['entrada'], job['modo'], job['companhias'], job['saida'],
+                servico['caches'])
+            job['registros'] = registros
+            job['estatisticas'] = estatisticas
+            job['erro'] = erro
+            job['status'] = 'erro' if erro else 'concluido'
+        except Exception as e:
+            job['erro'] = str(e)
+            job['status'] = 'erro'
+        finally:
+            job['fim'] = time.time()
+            servico['fila'].task_done()
+            limpar_jobs(servico)
+
+async def ler_requisicao(reader):
+    """Linha de requisição + cabeçalhos (o corpo fica no reader)"""
+    linha = (await reader.readline()).decode('latin-1').strip()
+    if not linha:
+        return None
+    metodo, alvo, _ = linha.split(' ', 2)
+    cabecalhos = {}
+    while True:
+        linha = (await reader.readline()).decode('latin-1').strip()
+        if not linha:
+            break
+        nome, _, valor = linha.partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    url = urlsplit(alvo)
+    parametros = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+    return metodo.upper(), url.path.rstrip('/') or '/', parametros, cabecalhos
+
+async def responder(writer, status, corpo=b"", tipo="application/json", extras=None):
+    cabecalhos = [f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}",
+                  f"Content-Type: {tipo}", f"Content-Length: {len(corpo)}", "Connection: close"]
+    cabecalhos += [f"{nome}: {valor}" for nome, valor in (extras or {}).items()]
+    writer.write(("\r\n".join(cabecalhos) + "\r\n\r\n").encode('latin-1') + corpo)
+    await writer.drain()
+
+async def responder_json(writer, status, dados):
+    await responder(writer, status, json.dumps(dados, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8")
+
+async def enviar_arquivo(writer, path):
+    """Envia o SSIM em blocos, sem carregar o arquivo inteiro em memória"""
+    nome = os.path.basename(path)
+    cabecalhos = ["HTTP/1.1 200 OK", "Content-Type: text/plain", f"Content-Length: {os.path.getsize(path)}",
+                  f'Content-Disposition: attachment; filename="{nome}"', "Connection: close"]
+    writer.write(("\r\n".join(cabecalhos) + "\r\n\r\n").encode('latin-1'))
+    with open(path, 'rb') as file:
+        for bloco in iter(lambda: file.read(BLOCO_STREAMING), b''):
+            writer.write(bloco)
+            await writer.drain()
+
+async def receber_job(servico, reader, writer, parametros, cabecalhos):
+    """POST /jobs: grava o upload em disco (em blocos) e coloca o job na fila"""
+    modo = parametros.get('modo', "ALL_COMPANIES").upper()
+    companhias = [c.strip().upper() for c in parametros.get('companhias', '').split(',') if c.strip()]
+    if modo not in MODOS:
+        return await responder_json(writer, 400, {'erro': f"Modo inválido: {modo}"})
+    if modo != "ALL_COMPANIES" and not companhias:
+        return await responder_json(writer, 400, {'erro': "Informe companhias para os modos SINGLE e MULTIPLE"})
+    if 'content-length' not in cabecalhos:
+        return await responder_json(writer, 411, {'erro': "Content-Length obrigatório"})
+    tamanho = int(cabecalhos['content-length'])
+    if tamanho > TAMANHO_MAXIMO_UPLOAD:
+        return await responder_json(writer, 413, {'erro': "Arquivo muito grande"})
+    if servico['fila'].full():
+        return await responder_json(writer, 503, {'erro': "Fila de conversão cheia, tente novamente"})
+
+    job_id = uuid.uuid4().hex
+    pasta_job = os.path.join(servico['pasta'], job_id)
+    os.makedirs(pasta_job)
+    nome = os.path.basename(parametros.get('nome', 'extrato.xlsx'))
+    entrada = os.path.join(pasta_job, nome)
+    with open(entrada, 'wb') as file:
+        restante = tamanho
+        while restante:
+            bloco = await reader.read(min(BLOCO_STREAMING, restante))
+            if not bloco:
+                break
+            file.write(bloco)
+            restante -= len(bloco)
+    if restante:
+        shutil.rmtree(pasta_job, ignore_errors=True)
+        return await responder_json(writer, 400, {'erro': "Upload incompleto"})
+
+    job = {
+        'id': job_id, 'status': 'na_fila', 'modo': modo, 'companhias': companhias, 'arquivo': nome,
+        'pasta': pasta_job, 'entrada': entrada, 'saida': os.path.join(pasta_job, f"{os.path.splitext(nome)[0]}_{modo}.ssim"),
+        'registros': 0, 'estatisticas': None, 'erro': None, 'criado': time.time(), 'inicio': None, 'fim': None,
+    }
+    try:
+        servico['fila'].put_nowait(job)
+    except asyncio.QueueFull:
+        shutil.rmtree(pasta_job, ignore_errors=True)
+        return await responder_json(writer, 503, {'erro': "Fila de conversão cheia, tente novamente"})
+    servico['jobs'][job_id] = job
+    await responder_json(writer, 202, resumo_job(job))
+
+async def tratar_conexao(servico, reader, writer):
+    try:
+        limpar_jobs(servico)
+        requisicao = await ler_requisicao(reader)
+        if requisicao is None:
+            return
+        metodo, caminho, parametros, cabecalhos = requisicao
+        partes = caminho.strip('/').split('/')
+
+        if caminho == '/health' and metodo == 'GET':
+            await responder_json(writer, 200, {'status': 'ok', 'fila': servico['fila'].qsize(),
+                                               'fila_maxima': servico['fila'].maxsize, 'workers': servico['workers']})
+        elif caminho == '/jobs':
+            if metodo != 'POST':
+                await responder_json(writer, 405, {'erro': "Use POST para enviar um arquivo"})
+            else:
+                await receber_job(servico, reader, writer, parametros, cabecalhos)
+        elif partes[0] == 'jobs' and len(partes) in (2, 3) and metodo == 'GET':
+            job = servico['jobs'].get(partes[1])
+            if job is None:
+                await responder_json(writer, 404, {'erro': "Job não encontrado"})
+            elif len(partes) == 2:
+                await responder_json(writer, 200, resumo_job(job))
+            elif partes[2] != 'download':
+                await responder_json(writer, 404, {'erro': "Endpoint não encontrado"})
+            elif job['status'] != 'concluido':
+                await responder_json(writer, 409, resumo_job(job))
+            else:
+                await enviar_arquivo(writer, job['saida'])
+        else:
+            await responder_json(writer, 404, {'erro': "Endpoint não encontrado"})
+    except (ValueError, KeyError) as e:
+        await responder_json(writer, 400, {'erro': str(e)})
+    except ConnectionError:
+        pass
+    except Exception as e:
+        print(f"❌ Erro no serviço: {e}")
+        await responder_json(writer, 500, {'erro': str(e)})
+    finally:
+        writer.close()
+
+async def iniciar_servico(host="127.0.0.1", porta=8080, workers=2, fila_maxima=20, pasta_trabalho=None,
+                          pasta_cache=None, retencao=RETENCAO_JOBS):
+    """Sobe o servidor e os consumidores da fila. Retorna (server, servico, tarefas)"""
+    servico = criar_servico(workers, fila_maxima, pasta_trabalho, pasta_cache, retencao)
+    tarefas = [asyncio.create_task(executar_jobs(servico)) for _ in range(workers)]
+    server = await asyncio.start_server(lambda r, w: tratar_conexao(servico, r, w), host, porta)
+    return server, servico, tarefas
+
+async def parar_servico(server, servico, tarefas):
+    server.close()
+    await server.wait_closed()
+    for tarefa in tarefas:
+        tarefa.cancel()
+    servico['pool'].shutdown(wait=True, cancel_futures=True)
+
+async def servir(host="127.0.0.1", porta=8080, workers=2, fila_maxima=20, pasta_trabalho=None, pasta_cache=None,
+                 retencao=RETENCAO_JOBS):
+    """Executa o serviço até Ctrl+C"""
+    server, servico, tarefas = await iniciar_servico(host, porta, workers, fila_maxima, pasta_trabalho, pasta_cache,
+                                                     retencao)
+    print(f"🌐 Serviço SSIM em http://{host}:{porta} ({workers} worker(s), fila máxima {fila_maxima})")
+    print(f"📁 Pasta de trabalho: {servico['pasta']}")
+    print(f"🗄️ Cache: {os.path.dirname(servico['caches']['conversoes'])}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await parar_servico(server, servico, tarefas)
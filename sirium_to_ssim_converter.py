@@ -8,62 +8,22 @@ import pandas as pd
 from datetime import datetime, timedelta
 import os
 
+from ssim_layout import escrever_ssim
+from etapas_voo import (carregar_timezones, converter_datas, dias_de_texto, interpretar_janela, mapear_unicos, offsets,
+                        ordenar_etapas, periodo_na_janela, recortar_periodo, registros_tipo3, tabela_etapas)
+from progresso_conversao import concluir_etapa, iniciar_etapa, notificar, notificar_saida
+from validacao import reportar_rejeitadas, validar_cirium
+from cache_companhias import hash_companhia, carregar_bloco, salvar_bloco
+from codeshare import aplicar_somente_operadora
+from companhias import coluna_companhia, codigos_companhia, descobrir_companhias
+from indice_estacoes import filtrar_estacoes
+from exportacao import exportacao_registros
+from extrato_parquet import ler_planilha
+
 def ajustar_linha(line, comprimento=200):
     """Ajusta uma linha para ter exatamente o comprimento especificado"""
     return line.ljust(comprimento)[:comprimento]
 
-def determinar_dia_semana_sfo(op_days_str):
-    """
-    Converte string de dias operacionais SFO para formato SSIM
-    Exemplo SFO: '1234567' = todos os dias, '12..56.' = Seg, Ter, Sex, Sab
-    """
-    if pd.isna(op_days_str):
-        return "1234567"  # Default: todos os dias
-    
-    op_days = str(op_days_str).strip()
-    
-    # Se já está no formato correto (7 caracteres)
-    if len(op_days) == 7:
-        return op_days.replace('.', ' ')  # Converter pontos para espaços
-    
-    # Fallback: todos os dias
-    return "1234567"
-
-def determinar_status_sfo(seats=None, service_type=None):
-    """
-    Determina o status do voo baseado na coluna Seats:
-    - Seats = 0 → Cargo (F)
-    - Seats > 0 → Passageiro (J)
-    """
-    try:
-        # Verificar se temos informação de assentos
-        if pd.notna(seats):
-            seats_num = float(seats)
-            if seats_num == 0:
-                return "F"  # Scheduled cargo service
-            else:
-                return "J"  # Scheduled passenger service
-        else:
-            return "J"  # Default: passenger service
-    except (ValueError, TypeError):
-        return "J"  # Default: passenger service
-
-def format_timezone_offset(offset_str):
-    """Formata offset de timezone para padrão SSIM (igual ao old_project)"""
-    try:
-        offset = float(offset_str)
-        hours = int(offset)
-        minutes = int(abs(offset - hours) * 60)
-        if offset >= 0:
-            sign = '+'
-        else:
-            sign = '-'
-            hours = -hours  # tornar horas positivas
-        offset_formatted = f"{sign}{abs(hours):02}{minutes:02}"
-        return offset_formatted
-    except (ValueError, TypeError):
-        return '+0000'
-
 def parse_date_sfo(date_value):
     """Converte data SFO para formato SSIM (DDMMMYY) - baseado no old_project"""
     try:
@@ -201,95 +161,128 @@ def get_aircraft_type_sfo(equipment=None):
     else:
         return "320"
 
-def gerar_ssim_multiplas_companias(excel_path, companias_selecionadas, output_file=None):
+def limpar_dados_cirium(df):
+    """
+    Mantém apenas linhas com Orig/Dest preenchidos e Flight numérico (ver validacao.validar_cirium)
+    """
+    return validar_cirium(df)[0]
+
+def periodo_global(df):
+    """(data_min, data_max) pelas colunas Eff Date/Disc Date; sem datas válidas, hoje até hoje + 30 dias"""
+    if 'Eff Date' in df.columns and 'Disc Date' in df.columns:
+        try:
+            eff = converter_datas(df['Eff Date']).dropna()
+            disc = converter_datas(df['Disc Date']).dropna()
+            if len(eff) and len(disc):
+                print(f"✅ Período global: {eff.min().date()} a {disc.max().date()}")
+                return eff.min(), disc.max()
+        except Exception as e:
+            print(f"⚠️ Erro ao processar datas globais: {e}")
+    return datetime.now(), datetime.now() + timedelta(days=30)
+
+def adaptar_cirium(df, companhia, iata_to_timezone):
+    """
+    Adaptador CIRIUM: tabela canônica de etapas (ver etapas_voo) de um extrato já validado
+    companhia: código da companhia ou Series com o código de cada linha
+    """
+    def coluna(nome, padrao):
+        return df[nome] if nome in df.columns else pd.Series(padrao, index=df.index, dtype=object)
+
+    origem = coluna('Orig', 'SFO').astype(str).str.strip().str.upper()
+    destino = coluna('Dest', 'SFO').astype(str).str.strip().str.upper()
+    assentos = pd.to_numeric(coluna('Seats', None), errors='coerce')
+    equipamento = coluna('Equip', None) if 'Equip' in df.columns else coluna('Equipment', 'A320')
+
+    return tabela_etapas(
+        df.index,
+        companhia=companhia,
+        voo=pd.to_numeric(coluna('Flight', 1), errors='coerce').fillna(1).astype('int64'),
+        # Seats = 0 → Cargo (F), demais → Passageiro (J)
+        status=pd.Series('J', index=df.index).where(assentos != 0, 'F'),
+        data_inicio=converter_datas(coluna('Eff Date', None)),
+        data_fim=converter_datas(coluna('Disc Date', None)),
+        dias=mapear_unicos(coluna('Op Days', None), dias_de_texto),
+        origem=origem,
+        destino=destino,
+        partida=mapear_unicos(coluna('Dep Time', '12:00'), lambda valor: int(parse_time_sfo(valor))),
+        chegada=mapear_unicos(coluna('Arr Time', '14:00'), lambda valor: int(parse_time_sfo(valor))),
+        origem_tz=offsets(origem, iata_to_timezone),
+        destino_tz=offsets(destino, iata_to_timezone),
+        equipamento=mapear_unicos(equipamento, get_aircraft_type_sfo),
+    )
+
+def gerar_linhas_companhia(df_companhia, companhia, iata_to_timezone, data_min_str, data_max_str, exemplos=0,
+                           progresso=None, processadas=0, total=None, janela=None):
+    """
+    Gera o bloco de registros tipo 3 (sem serial) de uma companhia, ordenado por voo e data
+    progresso: callback de eventos ('linhas' a cada PASSO_LINHAS linhas); processadas/total: contagem da conversão toda
+    janela: (inicio, fim) de interpretar_janela; períodos fora dela não geram registro (ver recortar_periodo)
+    """
+    etapas = adaptar_cirium(df_companhia, companhia, iata_to_timezone)
+    if janela is not None:
+        etapas = recortar_periodo(etapas, janela)
+    etapas = ordenar_etapas(etapas)
+    linhas = registros_tipo3(etapas, data_min_str, data_max_str, progresso=progresso, companhia=companhia,
+                             processadas=processadas, total=total)
+    
+    # Mostrar alguns exemplos
+    for linha in linhas[:exemplos]:
+        print(f"  Voo {linha[5:9].lstrip('0')}: {linha[36:39]} → {linha[54:57]} ({linha[39:43]}-{linha[57:61]})")
+    
+    return linhas
+
+def gerar_ssim_multiplas_companias(excel_path, companias_selecionadas, output_file=None, progresso=None,
+                                   cache_extrato=None, exportar_para=None, somente_operadora=False, estacoes=None,
+                                   sentido_estacoes='ambos', indice_estacoes=None, janela=None):
     """
     Gera arquivo SSIM com companhias específicas selecionadas
+    progresso: callback opcional de eventos (ver progresso_conversao)
+    cache_extrato: pasta da cópia Parquet da planilha (ver extrato_parquet); None lê sempre o Excel
+    exportar_para: arquivo .csv/.parquet/.jsonl com os registros tipo 3, gravado junto com o SSIM (ver exportacao)
+    somente_operadora: companhia = operadora (Op Al), sem as duplicatas de codeshare (ver codeshare)
+    estacoes: só as linhas com Orig/Dest nesses aeroportos (sentido_estacoes 'ambos', 'origem' ou 'destino');
+    indice_estacoes: índice já montado para o extrato (ver indice_estacoes)
+    janela: só os períodos dentro de (inicio, fim), 'AAAA-MM-DD:AAAA-MM-DD' ou N próximos dias, recortados a ela
     """
     try:
+        janela = interpretar_janela(janela)
         print(f"🔄 GERANDO SSIM PARA COMPANHIAS SELECIONADAS: {', '.join(companias_selecionadas)}")
         print("=" * 60)
         
         # Ler o arquivo Excel CIRIUM (header na linha 5)
-        df = pd.read_excel(excel_path, header=4)
+        inicio = iniciar_etapa(progresso, 'leitura')
+        df = ler_planilha(excel_path, header=4, cache_dir=cache_extrato)
+        concluir_etapa(progresso, 'leitura', inicio, linhas=len(df))
         print(f"✅ Arquivo lido: {len(df)} linhas")
+        if estacoes:
+            df = filtrar_estacoes(df, estacoes, sentido_estacoes, indice_estacoes, progresso)
         
         # Filtrar apenas linhas válidas
-        df_clean = df.dropna(subset=['Orig', 'Dest'])
-        df_clean = df_clean[
-            (df_clean['Orig'].astype(str).str.strip() != '') & 
-            (df_clean['Dest'].astype(str).str.strip() != '') &
-            (df_clean['Orig'].astype(str).str.strip() != 'nan') & 
-            (df_clean['Dest'].astype(str).str.strip() != 'nan')
-        ]
-        
-        if 'Flight' in df_clean.columns:
-            df_clean = df_clean[pd.to_numeric(df_clean['Flight'], errors='coerce').notna()]
+        inicio = iniciar_etapa(progresso, 'limpeza')
+        df_clean, rejeitadas = validar_cirium(df, somente_operadora=somente_operadora)
+        concluir_etapa(progresso, 'limpeza', inicio, linhas=len(df_clean))
+        reportar_rejeitadas(progresso, rejeitadas, 'limpeza')
         
         print(f"🧹 Limpeza concluída: {len(df_clean)} linhas válidas")
         df = df_clean
+        if somente_operadora:
+            df = aplicar_somente_operadora(df, progresso)
         
         # Filtrar apenas companhias selecionadas
-        airline_col = None
-        for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
-            if col in df.columns:
-                airline_col = col
-                break
+        airline_col = coluna_companhia(df, somente_operadora)
         
         if not airline_col:
             print("❌ Coluna de companhia aérea não encontrada")
             return None
             
-        # Filtrar dados para as companhias selecionadas
-        df = df[df[airline_col].isin(companias_selecionadas)]
+        # Filtrar dados para as companhias selecionadas (códigos normalizados, ver companhias)
+        codigos = codigos_companhia(df[airline_col])
+        selecionadas = codigos.isin(companias_selecionadas).to_numpy()
+        df, codigos = df[selecionadas], codigos[selecionadas]
         print(f"✅ Dados filtrados para {len(companias_selecionadas)} companhias: {len(df)} voos")
         
         # Determinar período global
-        data_min = datetime.now()
-        data_max = datetime.now() + timedelta(days=30)
-        
-        if 'Eff Date' in df.columns and 'Disc Date' in df.columns:
-            try:
-                eff_dates_str = df['Eff Date'].astype(str)
-                disc_dates_str = df['Disc Date'].astype(str)
-                
-                eff_dates_valid = eff_dates_str[
-                    (eff_dates_str != 'nan') & 
-                    (eff_dates_str != '') & 
-                    (eff_dates_str.notna())
-                ]
-                
-                disc_dates_valid = disc_dates_str[
-                    (disc_dates_str != 'nan') & 
-                    (disc_dates_str != '') & 
-                    (disc_dates_str.notna())
-                ]
-                
-                if len(eff_dates_valid) > 0 and len(disc_dates_valid) > 0:
-                    eff_dt_list = []
-                    for date_str in eff_dates_valid:
-                        try:
-                            dt = pd.to_datetime(date_str, errors='coerce')
-                            if pd.notna(dt):
-                                eff_dt_list.append(dt)
-                        except:
-                            continue
-                    
-                    disc_dt_list = []
-                    for date_str in disc_dates_valid:
-                        try:
-                            dt = pd.to_datetime(date_str, errors='coerce')
-                            if pd.notna(dt):
-                                disc_dt_list.append(dt)
-                        except:
-                            continue
-                    
-                    if eff_dt_list and disc_dt_list:
-                        data_min = min(eff_dt_list)
-                        data_max = max(disc_dt_list)
-                        print(f"✅ Período global: {data_min.date()} a {data_max.date()}")
-            except Exception as e:
-                print(f"⚠️ Erro ao processar datas globais: {e}")
-        
+        data_min, data_max = periodo_na_janela(*periodo_global(df), janela)
         data_min_str = parse_date_sfo(data_min)
         data_max_str = parse_date_sfo(data_max)
         data_emissao = datetime.now().strftime("%d%b%y").upper()
@@ -303,207 +296,38 @@ def gerar_ssim_multiplas_companias(excel_path, companias_selecionadas, output_fi
         print(f"📝 Gerando arquivo: {output_file}")
         
         # Carregar arquivos de apoio
-        try:
-            airport_df = pd.read_csv('airport.csv')
-            airport_df['ICAO'] = airport_df['ICAO'].str.strip().str.upper()
-            airport_df['IATA'] = airport_df['IATA'].str.strip().str.upper()
-            airport_df['Timezone'] = airport_df['Timezone'].replace('\\N', '0')
-            airport_df['Timezone'] = airport_df['Timezone'].astype(float)
-            
-            iata_to_timezone = dict(zip(airport_df['IATA'], airport_df['Timezone']))
-            print(f"✅ Aeroportos carregados: {len(airport_df)}")
-        except Exception as e:
-            print(f"⚠️ Erro ao carregar aeroportos: {e}")
-            iata_to_timezone = {}
-        
-        # Gerar arquivo SSIM ÚNICO com companhias selecionadas
-        with open(output_file, 'w') as file:
-            numero_linha = 1
-            
-            # UM ÚNICO HEADER
-            numero_linha_str = f"{numero_linha:08}"
-            linha_1_conteudo = "1AIRLINE STANDARD SCHEDULE DATA SET"
-            espacos_necessarios = 200 - len(linha_1_conteudo) - len(numero_linha_str)
-            linha_1 = linha_1_conteudo + (' ' * espacos_necessarios) + numero_linha_str
-            file.write(linha_1 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # UM ÚNICO CARRIER RECORD para múltiplas companhias
-            airlines_code = "MIX" if len(companias_selecionadas) > 1 else companias_selecionadas[0]
-            linha_2_conteudo = f"2U{airlines_code}  0008    {data_min_str}{data_max_str}{data_emissao}Created by Capacity Dnata Brasil"
-            posicao_p = 72
-            espacos_antes_p = posicao_p - len(linha_2_conteudo) - 1
-            linha_2 = linha_2_conteudo + (' ' * espacos_antes_p) + 'P'
-            
-            numero_linha_str = f" EN08{numero_linha:08}"
-            espacos_restantes = 200 - len(linha_2) - len(numero_linha_str)
-            linha_2 += (' ' * espacos_restantes) + numero_linha_str
-            file.write(linha_2 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # TODAS as linhas de voo das companhias selecionadas
-            flight_date_counter = {}
-            
-            # Processar cada companhia selecionada
-            for companhia in companias_selecionadas:
-                print(f"🔄 Processando companhia: {companhia}")
-                
-                df_companhia = df[df[airline_col] == companhia]
-                if len(df_companhia) == 0:
-                    continue
-                
-                # Processar voos desta companhia
-                try:
-                    if 'Flight' in df_companhia.columns:
-                        df_companhia['Flight_num'] = pd.to_numeric(df_companhia['Flight'], errors='coerce')
-                        
-                        if 'Eff Date' in df_companhia.columns:
-                            df_companhia['Eff Date_dt'] = pd.to_datetime(df_companhia['Eff Date'], errors='coerce')
-                            df_sorted = df_companhia.sort_values(by=['Flight_num', 'Eff Date_dt'])
-                        else:
-                            df_sorted = df_companhia.sort_values(by=['Flight_num'])
-                    else:
-                        df_sorted = df_companhia
-                except Exception as e:
-                    print(f"⚠️ Erro ao ordenar dados para {companhia}: {e}")
-                    df_sorted = df_companhia
-                
-                # Linhas 3 - voos desta companhia
-                for idx, row in df_sorted.iterrows():
-                    try:
-                        # Extrair dados básicos
-                        if 'Flight' in row and pd.notna(row['Flight']):
-                            try:
-                                numero_voo = str(int(float(row['Flight']))).strip()
-                            except (ValueError, TypeError):
-                                numero_voo = "001"
-                        else:
-                            numero_voo = "001"
-                        
-                        origem = str(row.get('Orig', 'SFO')).strip().upper()
-                        destino = str(row.get('Dest', 'SFO')).strip().upper()
-                        
-                        # Frequência
-                        if 'Op Days' in row:
-                            frequencia = determinar_dia_semana_sfo(row['Op Days'])
-                        else:
-                            frequencia = "1234567"
-                        
-                        # Status do voo baseado em Seats (cargo vs passageiro)
-                        seats = row.get('Seats', None)
-                        status = determinar_status_sfo(seats)
-                        
-                        # Datas (usar Eff Date e Disc Date para período completo)
-                        if 'Eff Date' in row and pd.notna(row['Eff Date']):
-                            data_partida = parse_date_sfo(row['Eff Date'])
-                        else:
-                            data_partida = data_min_str
-                        
-                        if 'Disc Date' in row and pd.notna(row['Disc Date']):
-                            data_chegada = parse_date_sfo(row['Disc Date'])
-                        else:
-                            data_chegada = data_max_str
-                        
-                        # Horários
-                        dep_time = row.get('Dep Time', '12:00')
-                        arr_time = row.get('Arr Time', '14:00')
-                        partida = parse_time_sfo(dep_time)
-                        chegada = parse_time_sfo(arr_time)
-                        
-                        # Equipamento (usar coluna Equip se disponível)
-                        equipment = row.get('Equip', row.get('Equipment', 'A320'))
-                        equipamento = get_aircraft_type_sfo(equipment)
-                        
-                        # Timezone offsets
-                        origem_timezone_offset = iata_to_timezone.get(origem, 0.0)
-                        destino_timezone_offset = iata_to_timezone.get(destino, 0.0)
-                        origem_timezone_formatted = format_timezone_offset(str(origem_timezone_offset))
-                        destino_timezone_formatted = format_timezone_offset(str(destino_timezone_offset))
-                        
-                        # Lógica de date_counter (global para todas as companhias)
-                        voo_key = f"{companhia}_{numero_voo}"
-                        if voo_key not in flight_date_counter:
-                            flight_date_counter[voo_key] = 0
-                        flight_date_counter[voo_key] += 1
-                        date_counter = flight_date_counter[voo_key]
-                        
-                        # Construir linha 3
-                        numero_voo_padded = numero_voo.zfill(4)
-                        etapa = "01"
-                        eight_char_field = f"{numero_voo_padded}{str(date_counter).zfill(2)}{etapa}"
-                        numero_voo_display = numero_voo.rjust(5)
-                        numero_linha_str = f"{numero_linha:08}"
-                        
-                        linha_3 = (
-                            f"3 "
-                            f"{companhia:<2} "
-                            f"{eight_char_field}"
-                            f"{status}"
-                            f"{data_partida}"
-                            f"{data_chegada}"
-                            f"{frequencia}"
-                            f" "
-                            f"{origem:<3}"
-                            f"{partida}"
-                            f"{partida}"
-                            f"{origem_timezone_formatted}"
-                            f"  "
-                            f"{destino:<3}"
-                            f"{chegada}"
-                            f"{chegada}"
-                            f"{destino_timezone_formatted}"
-                            f"  "
-                            f"{equipamento:<3}"
-                            f"{' ':53}"
-                            f"{companhia:<2}"
-                            f"{' ':7}"
-                            f"{companhia:<2}"
-                            f"{numero_voo_display}"
-                            f"{' ':28}"
-                            f"{' ':6}"
-                            f"{' ':5}"
-                            f"{' ':9}"
-                            f"{numero_linha_str}"
-                        )
-                        
-                        linha_3 = linha_3.ljust(200)
-                        file.write(linha_3 + "\n")
-                        numero_linha += 1
-                        
-                    except Exception as e:
-                        print(f"⚠️ Erro ao processar linha {idx} da companhia {companhia}: {e}")
-                        continue
-                
-                print(f"✅ Companhia {companhia} processada: {len(df_companhia)} voos")
-            
-            # UM ÚNICO FOOTER no final
-            # 4 linhas de zeros finais
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # Footer para múltiplas companhias
-            airlines_code = "MIX" if len(companias_selecionadas) > 1 else companias_selecionadas[0]
-            numero_linha_str = f"{numero_linha + 1:06}"
-            linha_5_conteudo = f"5 {airlines_code} {data_emissao}"
-            numero_linha_str2 = f"{numero_linha:06}E"
-            espacos_necessarios = 200 - len(linha_5_conteudo) - len(numero_linha_str) - len(numero_linha_str2)
-            linha_5 = linha_5_conteudo + (' ' * espacos_necessarios) + numero_linha_str2 + numero_linha_str
-            file.write(linha_5 + "\n")
-            numero_linha += 1
+        inicio = iniciar_etapa(progresso, 'referencias')
+        iata_to_timezone = carregar_timezones()
+        concluir_etapa(progresso, 'referencias', inicio)
+        
+        # TODAS as linhas de voo das companhias selecionadas
+        inicio = iniciar_etapa(progresso, 'codificacao')
+        blocos = []
+        processadas = 0
+        for companhia in companias_selecionadas:
+            print(f"🔄 Processando companhia: {companhia}")
+            
+            df_companhia = df[(codigos == companhia).to_numpy()]
+            if len(df_companhia) == 0:
+                continue
+            
+            linhas = gerar_linhas_companhia(df_companhia, companhia, iata_to_timezone, data_min_str, data_max_str,
+                                            progresso=progresso, processadas=processadas, total=len(df), janela=janela)
+            blocos.extend(linhas)
+            processadas += len(df_companhia)
+            notificar(progresso, 'companhia', companhia=companhia, voos=len(linhas), processadas=processadas, total=len(df))
+            print(f"✅ Companhia {companhia} processada: {len(df_companhia)} voos")
+        
+        concluir_etapa(progresso, 'codificacao', inicio, linhas=len(blocos))
+        
+        # Gerar arquivo SSIM ÚNICO com companhias selecionadas (UM header/carrier/footer)
+        airlines_code = "MIX" if len(companias_selecionadas) > 1 else companias_selecionadas[0]
+        inicio = iniciar_etapa(progresso, 'escrita')
+        with open(output_file, 'w') as file, exportacao_registros(exportar_para) as exportar:
+            numero_linha = escrever_ssim(file, airlines_code, data_min_str, data_max_str, data_emissao, blocos,
+                                         exportar=exportar)
+        concluir_etapa(progresso, 'escrita', inicio, linhas=numero_linha)
+        notificar_saida(progresso, output_file, numero_linha)
         
         print(f"✅ Arquivo SSIM MÚLTIPLAS COMPANHIAS gerado: {output_file}")
         print(f"📊 Total de linhas: {numero_linha}")
@@ -517,113 +341,59 @@ def gerar_ssim_multiplas_companias(excel_path, companias_selecionadas, output_fi
         traceback.print_exc()
         return None
 
-def gerar_ssim_todas_companias(excel_path, output_file=None):
+def gerar_ssim_todas_companias(excel_path, output_file=None, cache_dir=None, progresso=None, cache_extrato=None,
+                               exportar_para=None, somente_operadora=False, estacoes=None, sentido_estacoes='ambos',
+                               indice_estacoes=None, janela=None):
     """
     Gera arquivo SSIM com TODAS as companhias em um único arquivo
+    Com cache_dir, só as companhias cujos dados mudaram desde a última execução são recodificadas
+    progresso: callback opcional de eventos (ver progresso_conversao)
+    cache_extrato: pasta da cópia Parquet da planilha (ver extrato_parquet); None lê sempre o Excel
+    exportar_para: arquivo .csv/.parquet/.jsonl com os registros tipo 3, gravado junto com o SSIM (ver exportacao)
+    somente_operadora: companhia = operadora (Op Al), sem as duplicatas de codeshare (ver codeshare)
+    estacoes: só as linhas com Orig/Dest nesses aeroportos (sentido_estacoes 'ambos', 'origem' ou 'destino');
+    indice_estacoes: índice já montado para o extrato (ver indice_estacoes)
+    janela: só os períodos dentro de (inicio, fim), 'AAAA-MM-DD:AAAA-MM-DD' ou N próximos dias, recortados a ela
     """
     try:
+        janela = interpretar_janela(janela)
         print(f"🔄 GERANDO SSIM PARA TODAS AS COMPANHIAS")
         print("=" * 60)
         
         # Ler o arquivo Excel SIRIUM (header na linha 5)
-        df = pd.read_excel(excel_path, header=4)
+        inicio = iniciar_etapa(progresso, 'leitura')
+        df = ler_planilha(excel_path, header=4, cache_dir=cache_extrato)
+        concluir_etapa(progresso, 'leitura', inicio, linhas=len(df))
         print(f"✅ Arquivo lido: {len(df)} linhas")
+        if estacoes:
+            df = filtrar_estacoes(df, estacoes, sentido_estacoes, indice_estacoes, progresso)
         
         # Filtrar apenas linhas válidas
-        df_clean = df.dropna(subset=['Orig', 'Dest'])
-        df_clean = df_clean[
-            (df_clean['Orig'].astype(str).str.strip() != '') & 
-            (df_clean['Dest'].astype(str).str.strip() != '') &
-            (df_clean['Orig'].astype(str).str.strip() != 'nan') & 
-            (df_clean['Dest'].astype(str).str.strip() != 'nan')
-        ]
-        
-        if 'Flight' in df_clean.columns:
-            df_clean = df_clean[pd.to_numeric(df_clean['Flight'], errors='coerce').notna()]
+        inicio = iniciar_etapa(progresso, 'limpeza')
+        df_clean, rejeitadas = validar_cirium(df, somente_operadora=somente_operadora)
+        concluir_etapa(progresso, 'limpeza', inicio, linhas=len(df_clean))
+        reportar_rejeitadas(progresso, rejeitadas, 'limpeza')
         
         print(f"🧹 Limpeza concluída: {len(df_clean)} linhas válidas")
         df = df_clean
+        if somente_operadora:
+            df = aplicar_somente_operadora(df, progresso)
         
         # Obter todas as companhias (filtrar textos inválidos)
-        airline_col = None
-        for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
-            if col in df.columns:
-                airline_col = col
-                break
+        airline_col = coluna_companhia(df, somente_operadora)
         
         if not airline_col:
             print("❌ Coluna de companhia aérea não encontrada")
             return None
             
-        unique_values = df[airline_col].astype(str)
-        unique_values = unique_values[
-            (unique_values != 'nan') & 
-            (unique_values != '') & 
-            (unique_values.notna())
-        ].unique()
-        
-        # Filtrar apenas códigos IATA válidos (2 caracteres, letras)
-        todas_companias = []
-        for x in unique_values:
-            x_str = str(x).strip().upper()
-            if (len(x_str) == 2 and 
-                x_str.isalpha() and 
-                x_str not in ['nan', '', 'None', 'NA'] and
-                'Schedule' not in x_str and
-                'Extract' not in x_str and
-                'Report' not in x_str):
-                todas_companias.append(x_str)
-        
-        todas_companias = sorted(todas_companias)
+        # Companhias válidas (códigos IATA normalizados, ver companhias) e as linhas de cada uma
+        codigos = codigos_companhia(df[airline_col])
+        todas_companias = descobrir_companhias(df[airline_col], codigos)['codigo'].tolist()
+        linhas_por_companhia = codigos.groupby(codigos, sort=False).indices
         print(f"🏢 Processando companhias válidas: {todas_companias}")
         
         # Determinar período global
-        data_min = datetime.now()
-        data_max = datetime.now() + timedelta(days=30)
-        
-        if 'Eff Date' in df.columns and 'Disc Date' in df.columns:
-            try:
-                eff_dates_str = df['Eff Date'].astype(str)
-                disc_dates_str = df['Disc Date'].astype(str)
-                
-                eff_dates_valid = eff_dates_str[
-                    (eff_dates_str != 'nan') & 
-                    (eff_dates_str != '') & 
-                    (eff_dates_str.notna())
-                ]
-                
-                disc_dates_valid = disc_dates_str[
-                    (disc_dates_str != 'nan') & 
-                    (disc_dates_str != '') & 
-                    (disc_dates_str.notna())
-                ]
-                
-                if len(eff_dates_valid) > 0 and len(disc_dates_valid) > 0:
-                    eff_dt_list = []
-                    for date_str in eff_dates_valid:
-                        try:
-                            dt = pd.to_datetime(date_str, errors='coerce')
-                            if pd.notna(dt):
-                                eff_dt_list.append(dt)
-                        except:
-                            continue
-                    
-                    disc_dt_list = []
-                    for date_str in disc_dates_valid:
-                        try:
-                            dt = pd.to_datetime(date_str, errors='coerce')
-                            if pd.notna(dt):
-                                disc_dt_list.append(dt)
-                        except:
-                            continue
-                    
-                    if eff_dt_list and disc_dt_list:
-                        data_min = min(eff_dt_list)
-                        data_max = max(disc_dt_list)
-                        print(f"✅ Período global: {data_min.date()} a {data_max.date()}")
-            except Exception as e:
-                print(f"⚠️ Erro ao processar datas globais: {e}")
-        
+        data_min, data_max = periodo_na_janela(*periodo_global(df), janela)
         data_min_str = parse_date_sfo(data_min)
         data_max_str = parse_date_sfo(data_max)
         data_emissao = datetime.now().strftime("%d%b%y").upper()
@@ -636,205 +406,50 @@ def gerar_ssim_todas_companias(excel_path, output_file=None):
         print(f"📝 Gerando arquivo: {output_file}")
         
         # Carregar arquivos de apoio
-        try:
-            airport_df = pd.read_csv('airport.csv')
-            airport_df['ICAO'] = airport_df['ICAO'].str.strip().str.upper()
-            airport_df['IATA'] = airport_df['IATA'].str.strip().str.upper()
-            airport_df['Timezone'] = airport_df['Timezone'].replace('\\N', '0')
-            airport_df['Timezone'] = airport_df['Timezone'].astype(float)
-            
-            iata_to_timezone = dict(zip(airport_df['IATA'], airport_df['Timezone']))
-            print(f"✅ Aeroportos carregados: {len(airport_df)}")
-        except Exception as e:
-            print(f"⚠️ Erro ao carregar aeroportos: {e}")
-            iata_to_timezone = {}
-        
-        # Gerar arquivo SSIM ÚNICO com TODAS as companhias
-        with open(output_file, 'w') as file:
-            numero_linha = 1
-            
-            # UM ÚNICO HEADER para todas as companhias
-            numero_linha_str = f"{numero_linha:08}"
-            linha_1_conteudo = "1AIRLINE STANDARD SCHEDULE DATA SET"
-            espacos_necessarios = 200 - len(linha_1_conteudo) - len(numero_linha_str)
-            linha_1 = linha_1_conteudo + (' ' * espacos_necessarios) + numero_linha_str
-            file.write(linha_1 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # UM ÚNICO CARRIER RECORD para "ALL" 
-            linha_2_conteudo = f"2UALL 0008    {data_min_str}{data_max_str}{data_emissao}Created by Capacity Dnata Brasil"
-            posicao_p = 72
-            espacos_antes_p = posicao_p - len(linha_2_conteudo) - 1
-            linha_2 = linha_2_conteudo + (' ' * espacos_antes_p) + 'P'
-            
-            numero_linha_str = f" EN08{numero_linha:08}"
-            espacos_restantes = 200 - len(linha_2) - len(numero_linha_str)
-            linha_2 += (' ' * espacos_restantes) + numero_linha_str
-            file.write(linha_2 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # TODAS as linhas de voo de TODAS as companhias juntas
-            flight_date_counter = {}
-            
-            # Processar cada companhia
-            for companhia in todas_companias:
-                print(f"🔄 Processando companhia: {companhia}")
-                
-                df_companhia = df[df[airline_col] == companhia]
-                if len(df_companhia) == 0:
+        inicio = iniciar_etapa(progresso, 'referencias')
+        iata_to_timezone = carregar_timezones()
+        concluir_etapa(progresso, 'referencias', inicio)
+        
+        # Blocos de voos por companhia (reaproveitados do cache quando os dados não mudaram)
+        inicio = iniciar_etapa(progresso, 'codificacao')
+        blocos = []
+        processadas = 0
+        total = int(codigos.notna().sum())
+        for companhia in todas_companias:
+            print(f"🔄 Processando companhia: {companhia}")
+            
+            df_companhia = df.iloc[linhas_por_companhia[companhia]]
+            if len(df_companhia) == 0:
+                continue
+            
+            if cache_dir:
+                chave = hash_companhia(df_companhia, data_min_str, data_max_str, janela)
+                linhas = carregar_bloco(cache_dir, companhia, chave)
+                if linhas is not None:
+                    blocos.extend(linhas)
+                    processadas += len(df_companhia)
+                    notificar(progresso, 'companhia', companhia=companhia, voos=len(linhas), processadas=processadas, total=total, cache=True)
+                    print(f"♻️  Companhia {companhia} reutilizada do cache: {len(linhas)} voos")
                     continue
-                
-                # Processar voos desta companhia
-                try:
-                    if 'Flight' in df_companhia.columns:
-                        df_companhia['Flight_num'] = pd.to_numeric(df_companhia['Flight'], errors='coerce')
-                        
-                        if 'Eff Date' in df_companhia.columns:
-                            df_companhia['Eff Date_dt'] = pd.to_datetime(df_companhia['Eff Date'], errors='coerce')
-                            df_sorted = df_companhia.sort_values(by=['Flight_num', 'Eff Date_dt'])
-                        else:
-                            df_sorted = df_companhia.sort_values(by=['Flight_num'])
-                    else:
-                        df_sorted = df_companhia
-                except Exception as e:
-                    print(f"⚠️ Erro ao ordenar dados para {companhia}: {e}")
-                    df_sorted = df_companhia
-                
-                # Linhas 3 - voos desta companhia (SEM headers/footers separados)
-                for idx, row in df_sorted.iterrows():
-                    try:
-                        # Extrair dados básicos
-                        if 'Flight' in row and pd.notna(row['Flight']):
-                            try:
-                                numero_voo = str(int(float(row['Flight']))).strip()
-                            except (ValueError, TypeError):
-                                numero_voo = "001"
-                        else:
-                            numero_voo = "001"
-                        
-                        origem = str(row.get('Orig', 'SFO')).strip().upper()
-                        destino = str(row.get('Dest', 'SFO')).strip().upper()
-                        
-                        # Frequência
-                        if 'Op Days' in row:
-                            frequencia = determinar_dia_semana_sfo(row['Op Days'])
-                        else:
-                            frequencia = "1234567"
-                        
-                        # Status do voo baseado em Seats (cargo vs passageiro)
-                        seats = row.get('Seats', None)
-                        status = determinar_status_sfo(seats)
-                        
-                        # Datas (usar Eff Date e Disc Date para período completo)
-                        if 'Eff Date' in row and pd.notna(row['Eff Date']):
-                            data_partida = parse_date_sfo(row['Eff Date'])
-                        else:
-                            data_partida = data_min_str
-                        
-                        if 'Disc Date' in row and pd.notna(row['Disc Date']):
-                            data_chegada = parse_date_sfo(row['Disc Date'])
-                        else:
-                            data_chegada = data_max_str
-                        
-                        # Horários
-                        dep_time = row.get('Dep Time', '12:00')
-                        arr_time = row.get('Arr Time', '14:00')
-                        partida = parse_time_sfo(dep_time)
-                        chegada = parse_time_sfo(arr_time)
-                        
-                        # Equipamento (usar coluna Equip se disponível)
-                        equipment = row.get('Equip', row.get('Equipment', 'A320'))
-                        equipamento = get_aircraft_type_sfo(equipment)
-                        
-                        # Timezone offsets
-                        origem_timezone_offset = iata_to_timezone.get(origem, 0.0)
-                        destino_timezone_offset = iata_to_timezone.get(destino, 0.0)
-                        origem_timezone_formatted = format_timezone_offset(str(origem_timezone_offset))
-                        destino_timezone_formatted = format_timezone_offset(str(destino_timezone_offset))
-                        
-                        # Lógica de date_counter (global para todas as companhias)
-                        voo_key = f"{companhia}_{numero_voo}"
-                        if voo_key not in flight_date_counter:
-                            flight_date_counter[voo_key] = 0
-                        flight_date_counter[voo_key] += 1
-                        date_counter = flight_date_counter[voo_key]
-                        
-                        # Construir linha 3
-                        numero_voo_padded = numero_voo.zfill(4)
-                        etapa = "01"
-                        eight_char_field = f"{numero_voo_padded}{str(date_counter).zfill(2)}{etapa}"
-                        numero_voo_display = numero_voo.rjust(5)
-                        numero_linha_str = f"{numero_linha:08}"
-                        
-                        linha_3 = (
-                            f"3 "
-                            f"{companhia:<2} "
-                            f"{eight_char_field}"
-                            f"{status}"
-                            f"{data_partida}"
-                            f"{data_chegada}"
-                            f"{frequencia}"
-                            f" "
-                            f"{origem:<3}"
-                            f"{partida}"
-                            f"{partida}"
-                            f"{origem_timezone_formatted}"
-                            f"  "
-                            f"{destino:<3}"
-                            f"{chegada}"
-                            f"{chegada}"
-                            f"{destino_timezone_formatted}"
-                            f"  "
-                            f"{equipamento:<3}"
-                            f"{' ':53}"
-                            f"{companhia:<2}"
-                            f"{' ':7}"
-                            f"{companhia:<2}"
-                            f"{numero_voo_display}"
-                            f"{' ':28}"
-                            f"{' ':6}"
-                            f"{' ':5}"
-                            f"{' ':9}"
-                            f"{numero_linha_str}"
-                        )
-                        
-                        linha_3 = linha_3.ljust(200)
-                        file.write(linha_3 + "\n")
-                        numero_linha += 1
-                        
-                    except Exception as e:
-                        print(f"⚠️ Erro ao processar linha {idx} da companhia {companhia}: {e}")
-                        continue
-                
-                print(f"✅ Companhia {companhia} processada: {len(df_companhia)} voos")
-            
-            # UM ÚNICO FOOTER no final para todas as companhias
-            # 4 linhas de zeros finais
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
             
-            # Footer único para ALL
-            numero_linha_str = f"{numero_linha + 1:06}"
-            linha_5_conteudo = f"5 ALL {data_emissao}"
-            numero_linha_str2 = f"{numero_linha:06}E"
-            espacos_necessarios = 200 - len(linha_5_conteudo) - len(numero_linha_str) - len(numero_linha_str2)
-            linha_5 = linha_5_conteudo + (' ' * espacos_necessarios) + numero_linha_str2 + numero_linha_str
-            file.write(linha_5 + "\n")
-            numero_linha += 1
+            linhas = gerar_linhas_companhia(df_companhia, companhia, iata_to_timezone, data_min_str, data_max_str,
+                                            progresso=progresso, processadas=processadas, total=total, janela=janela)
+            if cache_dir:
+                salvar_bloco(cache_dir, companhia, chave, linhas)
+            blocos.extend(linhas)
+            processadas += len(df_companhia)
+            notificar(progresso, 'companhia', companhia=companhia, voos=len(linhas), processadas=processadas, total=total)
+            print(f"✅ Companhia {companhia} processada: {len(df_companhia)} voos")
+        
+        concluir_etapa(progresso, 'codificacao', inicio, linhas=len(blocos))
+        
+        # Gerar arquivo SSIM ÚNICO com TODAS as companhias (renumerando as linhas)
+        inicio = iniciar_etapa(progresso, 'escrita')
+        with open(output_file, 'w') as file, exportacao_registros(exportar_para) as exportar:
+            numero_linha = escrever_ssim(file, "ALL", data_min_str, data_max_str, data_emissao, blocos, separador=" ",
+                                         exportar=exportar)
+        concluir_etapa(progresso, 'escrita', inicio, linhas=numero_linha)
+        notificar_saida(progresso, output_file, numero_linha)
         
         print(f"✅ Arquivo SSIM TODAS COMPANHIAS gerado: {output_file}")
         print(f"📊 Total de linhas: {numero_linha}")
@@ -848,81 +463,55 @@ def gerar_ssim_todas_companias(excel_path, output_file=None):
         traceback.print_exc()
         return None
 
-def gerar_ssim_sirium(excel_path, codigo_iata_selecionado, output_file=None):
+def gerar_ssim_sirium(excel_path, codigo_iata_selecionado, output_file=None, progresso=None, cache_extrato=None,
+                      exportar_para=None, somente_operadora=False, estacoes=None, sentido_estacoes='ambos',
+                      indice_estacoes=None, janela=None):
     """
     Gera arquivo SSIM a partir da malha SIRIUM (SFO) em Excel
     Baseado no padrão do old_project
+    progresso: callback opcional de eventos (ver progresso_conversao)
+    cache_extrato: pasta da cópia Parquet da planilha (ver extrato_parquet); None lê sempre o Excel
+    exportar_para: arquivo .csv/.parquet/.jsonl com os registros tipo 3, gravado junto com o SSIM (ver exportacao)
+    somente_operadora: companhia = operadora (Op Al), sem as duplicatas de codeshare (ver codeshare)
+    estacoes: só as linhas com Orig/Dest nesses aeroportos (sentido_estacoes 'ambos', 'origem' ou 'destino');
+    indice_estacoes: índice já montado para o extrato (ver indice_estacoes)
+    janela: só os períodos dentro de (inicio, fim), 'AAAA-MM-DD:AAAA-MM-DD' ou N próximos dias, recortados a ela
     """
     try:
+        janela = interpretar_janela(janela)
         print(f"🔄 GERANDO SSIM SIRIUM PARA {codigo_iata_selecionado}")
         print("=" * 60)
         
         # Ler o arquivo Excel SIRIUM (header na linha 5)
-        df = pd.read_excel(excel_path, header=4)
+        inicio = iniciar_etapa(progresso, 'leitura')
+        df = ler_planilha(excel_path, header=4, cache_dir=cache_extrato)
+        concluir_etapa(progresso, 'leitura', inicio, linhas=len(df))
         print(f"✅ Arquivo lido: {len(df)} linhas")
+        if estacoes:
+            df = filtrar_estacoes(df, estacoes, sentido_estacoes, indice_estacoes, progresso)
         print(f"📋 Colunas: {df.columns.tolist()}")
         
         # Filtrar apenas linhas válidas (que têm dados de voo)
         print("🧹 Iniciando limpeza de dados...")
-        
-        # Remove linhas onde Orig ou Dest são NaN/vazios
-        df_clean = df.dropna(subset=['Orig', 'Dest'])
-        print(f"   Após remover NaN: {len(df_clean)} linhas")
-        
-        # Remove linhas onde Orig ou Dest são strings vazias
-        df_clean = df_clean[
-            (df_clean['Orig'].astype(str).str.strip() != '') & 
-            (df_clean['Dest'].astype(str).str.strip() != '') &
-            (df_clean['Orig'].astype(str).str.strip() != 'nan') & 
-            (df_clean['Dest'].astype(str).str.strip() != 'nan')
-        ]
-        print(f"   Após remover strings vazias: {len(df_clean)} linhas")
-        
-        # Filtro adicional: remover linhas onde Flight não é válido
-        if 'Flight' in df_clean.columns:
-            df_clean = df_clean[pd.to_numeric(df_clean['Flight'], errors='coerce').notna()]
-            print(f"   Após filtrar Flight inválidos: {len(df_clean)} linhas")
-        
+        inicio = iniciar_etapa(progresso, 'limpeza')
+        df_clean, rejeitadas = validar_cirium(df, somente_operadora=somente_operadora)
+        concluir_etapa(progresso, 'limpeza', inicio, linhas=len(df_clean))
+        reportar_rejeitadas(progresso, rejeitadas, 'limpeza')
         print(f"🧹 Limpeza concluída: {len(df_clean)} linhas válidas (removidas {len(df) - len(df_clean)} linhas inválidas)")
         df = df_clean
+        if somente_operadora:
+            df = aplicar_somente_operadora(df, progresso)
         
         # Filtrar pela companhia aérea selecionada
-        airline_col = None
-        for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
-            if col in df.columns:
-                airline_col = col
-                break
+        airline_col = coluna_companhia(df, somente_operadora)
         
         if airline_col:
-            # Filtrar apenas códigos IATA válidos
-            try:
-                unique_values = df[airline_col].astype(str)
-                unique_values = unique_values[
-                    (unique_values != 'nan') & 
-                    (unique_values != '') & 
-                    (unique_values.notna())
-                ].unique()
-                
-                # Filtrar apenas códigos IATA válidos (2 caracteres, letras)
-                companhias_disponiveis = []
-                for x in unique_values:
-                    x_str = str(x).strip().upper()
-                    if (len(x_str) == 2 and 
-                        x_str.isalpha() and 
-                        x_str not in ['nan', '', 'None', 'NA'] and
-                        'Schedule' not in x_str and
-                        'Extract' not in x_str and
-                        'Report' not in x_str):
-                        companhias_disponiveis.append(x_str)
-                
-                companhias_disponiveis = sorted(companhias_disponiveis)
-                print(f"🏢 Companhias válidas disponíveis: {companhias_disponiveis}")
-            except Exception as e:
-                print(f"⚠️  Erro ao listar companhias, usando valores brutos: {e}")
-                companhias_disponiveis = df[airline_col].unique()
-                print(f"🏢 Companhias disponíveis (bruto): {companhias_disponiveis}")
+            # Companhias válidas (códigos IATA normalizados, ver companhias)
+            codigos = codigos_companhia(df[airline_col])
+            companhias_disponiveis = descobrir_companhias(df[airline_col], codigos)['codigo'].tolist()
+            print(f"🏢 Companhias válidas disponíveis: {companhias_disponiveis}")
             
-            df_filtered = df[df[airline_col] == codigo_iata_selecionado]
+            df_filtered = df[(codigos == codigo_iata_selecionado).to_numpy()]
             
             if len(df_filtered) == 0:
                 print(f"⚠️  Nenhum voo encontrado para {codigo_iata_selecionado}")
@@ -934,101 +523,15 @@ def gerar_ssim_sirium(excel_path, codigo_iata_selecionado, output_file=None):
             df_filtered = df
         
         # Carregar arquivos de apoio (igual ao old_project)
-        try:
-            airport_df = pd.read_csv('airport.csv')
-            airport_df['ICAO'] = airport_df['ICAO'].str.strip().str.upper()
-            airport_df['IATA'] = airport_df['IATA'].str.strip().str.upper()
-            airport_df['Timezone'] = airport_df['Timezone'].replace('\\N', '0')
-            airport_df['Timezone'] = airport_df['Timezone'].astype(float)
-            
-            icao_to_iata_airport = dict(zip(airport_df['ICAO'], airport_df['IATA']))
-            icao_to_timezone = dict(zip(airport_df['ICAO'], airport_df['Timezone']))
-            iata_to_timezone = dict(zip(airport_df['IATA'], airport_df['Timezone']))
-            print(f"✅ Aeroportos carregados: {len(airport_df)}")
-        except Exception as e:
-            print(f"⚠️  Erro ao carregar aeroportos: {e}")
-            icao_to_iata_airport = {}
-            icao_to_timezone = {}
-            iata_to_timezone = {}
+        inicio = iniciar_etapa(progresso, 'referencias')
+        iata_to_timezone = carregar_timezones()
+        concluir_etapa(progresso, 'referencias', inicio)
         
-        try:
-            aircraft_df = pd.read_excel('ACT TYPE.xlsx')
-            aircraft_df['ICAO'] = aircraft_df['ICAO'].str.strip().str.upper()
-            aircraft_df['IATA'] = aircraft_df['IATA'].str.strip()
-            icao_to_iata_aircraft = dict(zip(aircraft_df['ICAO'], aircraft_df['IATA']))
-            print(f"✅ Aeronaves carregadas: {len(aircraft_df)}")
-        except Exception as e:
-            print(f"⚠️  Erro ao carregar aeronaves: {e}")
-            icao_to_iata_aircraft = {}
-        
-        # Determinar período de dados - versão ultra robusta
-        try:
-            print("📅 Determinando período de dados...")
-            
-            # Usar datas fixas como fallback seguro
-            data_min = datetime.now()
-            data_max = datetime.now() + timedelta(days=30)
-            
-            if 'Eff Date' in df_filtered.columns and 'Disc Date' in df_filtered.columns:
-                try:
-                    # Converter todas as datas para string primeiro, depois datetime
-                    eff_dates_str = df_filtered['Eff Date'].astype(str)
-                    disc_dates_str = df_filtered['Disc Date'].astype(str)
-                    
-                    # Filtrar strings válidas
-                    eff_dates_valid = eff_dates_str[
-                        (eff_dates_str != 'nan') & 
-                        (eff_dates_str != '') & 
-                        (eff_dates_str.notna())
-                    ]
-                    
-                    disc_dates_valid = disc_dates_str[
-                        (disc_dates_str != 'nan') & 
-                        (disc_dates_str != '') & 
-                        (disc_dates_str.notna())
-                    ]
-                    
-                    if len(eff_dates_valid) > 0 and len(disc_dates_valid) > 0:
-                        # Converter para datetime sem comparações diretas
-                        eff_dt_list = []
-                        for date_str in eff_dates_valid:
-                            try:
-                                dt = pd.to_datetime(date_str, errors='coerce')
-                                if pd.notna(dt):
-                                    eff_dt_list.append(dt)
-                            except:
-                                continue
-                        
-                        disc_dt_list = []
-                        for date_str in disc_dates_valid:
-                            try:
-                                dt = pd.to_datetime(date_str, errors='coerce')
-                                if pd.notna(dt):
-                                    disc_dt_list.append(dt)
-                            except:
-                                continue
-                        
-                        if eff_dt_list and disc_dt_list:
-                            data_min = min(eff_dt_list)
-                            data_max = max(disc_dt_list)
-                            print(f"   ✅ Período extraído: {data_min.date()} a {data_max.date()}")
-                        else:
-                            print(f"   ⚠️  Usando datas padrão (não foi possível converter)")
-                    else:
-                        print(f"   ⚠️  Usando datas padrão (dados inválidos)")
-                        
-                except Exception as e:
-                    print(f"   ⚠️  Erro ao processar datas, usando padrão: {e}")
-            else:
-                print(f"   ⚠️  Colunas de data não encontradas, usando padrão")
-            
-            data_min_str = parse_date_sfo(data_min)
-            data_max_str = parse_date_sfo(data_max)
-            
-        except Exception as e:
-            print(f"⚠️  Erro geral ao determinar período: {e}")
-            data_min_str = datetime.now().strftime("%d%b%y").upper()
-            data_max_str = (datetime.now() + timedelta(days=30)).strftime("%d%b%y").upper()
+        # Determinar período de dados
+        print("📅 Determinando período de dados...")
+        data_min, data_max = periodo_na_janela(*periodo_global(df_filtered), janela)
+        data_min_str = parse_date_sfo(data_min)
+        data_max_str = parse_date_sfo(data_max)
         
         # Data de emissão (igual ao old_project)
         data_emissao = datetime.now().strftime("%d%b%y").upper()
@@ -1040,204 +543,28 @@ def gerar_ssim_sirium(excel_path, codigo_iata_selecionado, output_file=None):
         
         print(f"📝 Gerando arquivo: {output_file}")
         
+        # Gerar registros de voo (ordenados por voo e data, IGUAL AO OLD_PROJECT)
+        print("🔄 Escrevendo linhas de voos...")
+        inicio = iniciar_etapa(progresso, 'codificacao')
+        linhas_voo = gerar_linhas_companhia(df_filtered, codigo_iata_selecionado, iata_to_timezone, data_min_str, data_max_str, exemplos=5,
+                                            progresso=progresso, total=len(df_filtered), janela=janela)
+        notificar(progresso, 'companhia', companhia=codigo_iata_selecionado, voos=len(linhas_voo),
+                  processadas=len(df_filtered), total=len(df_filtered))
+        
+        concluir_etapa(progresso, 'codificacao', inicio, linhas=len(linhas_voo))
+        
         # Gerar arquivo SSIM (FORMATO EXATO DO OLD_PROJECT)
-        with open(output_file, 'w') as file:
-            numero_linha = 1
-            
-            # Linha 1 (EXATAMENTE IGUAL AO OLD_PROJECT)
-            numero_linha_str = f"{numero_linha:08}"
-            linha_1_conteudo = "1AIRLINE STANDARD SCHEDULE DATA SET"
-            espacos_necessarios = 200 - len(linha_1_conteudo) - len(numero_linha_str)
-            linha_1 = linha_1_conteudo + (' ' * espacos_necessarios) + numero_linha_str
-            file.write(linha_1 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros (IGUAL AO OLD_PROJECT)
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # Linha 2 (EXATAMENTE IGUAL AO OLD_PROJECT)
-            linha_2_conteudo = f"2U{codigo_iata_selecionado}  0008    {data_min_str}{data_max_str}{data_emissao}Created by Capacity Dnata Brasil"
-            posicao_p = 72
-            espacos_antes_p = posicao_p - len(linha_2_conteudo) - 1
-            linha_2 = linha_2_conteudo + (' ' * espacos_antes_p) + 'P'
-            
-            numero_linha_str = f" EN08{numero_linha:08}"
-            espacos_restantes = 200 - len(linha_2) - len(numero_linha_str)
-            linha_2 += (' ' * espacos_restantes) + numero_linha_str
-            file.write(linha_2 + "\n")
-            numero_linha += 1
-            
-            # 4 linhas de zeros (IGUAL AO OLD_PROJECT)
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # Inicializar contador de datas por voo (IGUAL AO OLD_PROJECT)
-            flight_date_counter = {}
-            
-            # Ordenar o DataFrame (similar ao old_project) - com proteção para tipos mistos
-            try:
-                if 'Flight' in df_filtered.columns:
-                    # Converter Flight para numérico antes de ordenar
-                    df_filtered['Flight_num'] = pd.to_numeric(df_filtered['Flight'], errors='coerce')
-                    
-                    if 'Eff Date' in df_filtered.columns:
-                        # Converter datas para datetime antes de ordenar
-                        df_filtered['Eff Date_dt'] = pd.to_datetime(df_filtered['Eff Date'], errors='coerce')
-                        df_sorted = df_filtered.sort_values(by=['Flight_num', 'Eff Date_dt'])
-                    else:
-                        df_sorted = df_filtered.sort_values(by=['Flight_num'])
-                else:
-                    df_sorted = df_filtered
-            except Exception as e:
-                print(f"⚠️  Erro ao ordenar dados: {e}")
-                df_sorted = df_filtered  # Usar sem ordenação se falhar
-            
-            print("🔄 Escrevendo linhas de voos...")
-            
-            # Linhas 3 - Dados dos voos (FORMATO EXATO DO OLD_PROJECT)
-            for idx, row in df_sorted.iterrows():
-                try:
-                    # Extrair dados básicos
-                    if 'Flight' in row and pd.notna(row['Flight']):
-                        try:
-                            numero_voo = str(int(float(row['Flight']))).strip()
-                        except (ValueError, TypeError):
-                            numero_voo = "001"
-                    else:
-                        numero_voo = "001"
-                    
-                    origem = str(row.get('Orig', 'SFO')).strip().upper()
-                    destino = str(row.get('Dest', 'SFO')).strip().upper()
-                    
-                    # Determinar frequência
-                    if 'Op Days' in row:
-                        frequencia = determinar_dia_semana_sfo(row['Op Days'])
-                    else:
-                        frequencia = "1234567"
-                    
-                    # Status do voo baseado em Seats (cargo vs passageiro)
-                    seats = row.get('Seats', None)
-                    status = determinar_status_sfo(seats)
-                    
-                    # Datas (usar Eff Date e Disc Date para período completo)
-                    if 'Eff Date' in row and pd.notna(row['Eff Date']):
-                        data_partida = parse_date_sfo(row['Eff Date'])
-                    else:
-                        data_partida = data_min_str
-                    
-                    if 'Disc Date' in row and pd.notna(row['Disc Date']):
-                        data_chegada = parse_date_sfo(row['Disc Date'])
-                    else:
-                        data_chegada = data_max_str
-                    
-                    # Horários (assumir padrão se não disponível)
-                    dep_time = row.get('Dep Time', '12:00')
-                    arr_time = row.get('Arr Time', '14:00')
-                    partida = parse_time_sfo(dep_time)
-                    chegada = parse_time_sfo(arr_time)
-                    
-                    # Equipamento (usar coluna Equip se disponível)
-                    equipment = row.get('Equip', row.get('Equipment', 'A320'))
-                    equipamento = get_aircraft_type_sfo(equipment)
-                    
-                    # Timezone offsets (usar mapeamento se disponível)
-                    origem_timezone_offset = iata_to_timezone.get(origem, 0.0)
-                    destino_timezone_offset = iata_to_timezone.get(destino, 0.0)
-                    origem_timezone_formatted = format_timezone_offset(str(origem_timezone_offset))
-                    destino_timezone_formatted = format_timezone_offset(str(destino_timezone_offset))
-                    
-                    # Lógica de date_counter (IGUAL AO OLD_PROJECT)
-                    if numero_voo not in flight_date_counter:
-                        flight_date_counter[numero_voo] = 0
-                    flight_date_counter[numero_voo] += 1
-                    date_counter = flight_date_counter[numero_voo]
-                    
-                    # Número do voo preenchido com zeros (IGUAL AO OLD_PROJECT)
-                    numero_voo_padded = numero_voo.zfill(4)
-                    
-                    # Etapa sempre "01" (simplificado)
-                    etapa = "01"
-                    
-                    # Campo de 8 caracteres (IGUAL AO OLD_PROJECT)
-                    eight_char_field = f"{numero_voo_padded}{str(date_counter).zfill(2)}{etapa}"
-                    
-                    # Número do voo para exibição (IGUAL AO OLD_PROJECT)
-                    numero_voo_display = numero_voo.rjust(5)
-                    
-                    # Número da linha (IGUAL AO OLD_PROJECT)
-                    numero_linha_str = f"{numero_linha:08}"
-                    
-                    # Construção da linha 3 (FORMATO EXATO DO OLD_PROJECT)
-                    linha_3 = (
-                        f"3 "
-                        f"{codigo_iata_selecionado:<2} "
-                        f"{eight_char_field}"
-                        f"{status}"
-                        f"{data_partida}"
-                        f"{data_chegada}"
-                        f"{frequencia}"
-                        f" "
-                        f"{origem:<3}"
-                        f"{partida}"
-                        f"{partida}"
-                        f"{origem_timezone_formatted}"
-                        f"  "
-                        f"{destino:<3}"
-                        f"{chegada}"
-                        f"{chegada}"
-                        f"{destino_timezone_formatted}"
-                        f"  "
-                        f"{equipamento:<3}"
-                        f"{' ':53}"
-                        f"{codigo_iata_selecionado:<2}"
-                        f"{' ':7}"
-                        f"{codigo_iata_selecionado:<2}"
-                        f"{numero_voo_display}"
-                        f"{' ':28}"
-                        f"{' ':6}"
-                        f"{' ':5}"
-                        f"{' ':9}"
-                        f"{numero_linha_str}"
-                    )
-                    
-                    # Garantir que a linha tenha exatamente 200 caracteres (IGUAL AO OLD_PROJECT)
-                    linha_3 = linha_3.ljust(200)
-                    
-                    file.write(linha_3 + "\n")
-                    numero_linha += 1
-                    
-                    # Mostrar alguns exemplos
-                    if idx < 5:
-                        print(f"  Voo {numero_voo}: {origem} → {destino} ({partida}-{chegada})")
-                
-                except Exception as e:
-                    print(f"⚠️  Erro ao processar linha {idx}: {e}")
-                    continue
-            
-            # 4 linhas de zeros finais (IGUAL AO OLD_PROJECT)
-            for _ in range(4):
-                zeros_line = "0" * 200
-                file.write(zeros_line + "\n")
-                numero_linha += 1
-            
-            # Linha 5 - Footer (EXATAMENTE IGUAL AO OLD_PROJECT)
-            numero_linha_str = f"{numero_linha + 1:06}"
-            linha_5_conteudo = f"5 {codigo_iata_selecionado} {data_emissao}"
-            numero_linha_str2 = f"{numero_linha:06}E"
-            espacos_necessarios = 200 - len(linha_5_conteudo) - len(numero_linha_str) - len(numero_linha_str2)
-            linha_5 = linha_5_conteudo + (' ' * espacos_necessarios) + numero_linha_str2 + numero_linha_str
-            file.write(linha_5 + "\n")
-            numero_linha += 1
+        inicio = iniciar_etapa(progresso, 'escrita')
+        with open(output_file, 'w') as file, exportacao_registros(exportar_para) as exportar:
+            numero_linha = escrever_ssim(file, codigo_iata_selecionado, data_min_str, data_max_str, data_emissao, linhas_voo,
+                                         exportar=exportar)
+        concluir_etapa(progresso, 'escrita', inicio, linhas=numero_linha)
+        notificar_saida(progresso, output_file, numero_linha)
         
         print(f"✅ Arquivo SSIM SIRIUM gerado: {output_file}")
         print(f"📊 Total de linhas: {numero_linha}")
         print(f"📁 Tamanho: {os.path.getsize(output_file)} bytes")
-        print(f"✈️  Voos processados: {len(df_sorted)}")
+        print(f"✈️  Voos processados: {len(linhas_voo)}")
         
         return output_file
         
@@ -1262,14 +589,10 @@ def main():
     # Mostrar companhias disponíveis
     try:
         df_preview = pd.read_excel(excel_path, header=4)
-        airline_col = None
-        for col in ['Mkt Al', 'Op Al', 'Airline', 'Carrier']:
-            if col in df_preview.columns:
-                airline_col = col
-                break
+        airline_col = coluna_companhia(df_preview)
         
         if airline_col:
-            companhias = df_preview[airline_col].unique()
+            companhias = descobrir_companhias(df_preview[airline_col])['codigo'].tolist()
             print(f"🏢 Companhias disponíveis: {companhias}")
             
             # Para teste, usar AI
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Linha de comando do conversor SSIM - Dnata Brasil
+Uso: python -m siriumtossim convert <arquivos/diretórios/globs> [-o saida] [--workers N]
+     python -m siriumtossim watch <pasta> [-o saida] [--workers N]
+     python -m siriumtossim serve [--porta 8080] [--workers N] [--fila N]
+     python -m siriumtossim memoria <arquivo> [--modo ...] [--top 10] [--json relatorio.json]
+     python -m siriumtossim benchmark [--tamanhos 1000,10000] [--baseline bench.json] [--salvar bench.json]
+     python -m siriumtossim benchmark --importacao
+     python -m siriumtossim validar <arquivo.ssim>
+     python -m siriumtossim renumerar <arquivo.ssim> [-o saida.ssim]
+     python -m siriumtossim dividir <arquivo.ssim> [-o pasta] [--companhias EK,AI]
+Os comandos sobre arquivos SSIM prontos (validar, renumerar, dividir) não importam pandas
+"""
+
+import argparse
+import os
+import sys
+
+from cache_conversao import MODOS
+from version import VERSION
+
+def opcoes_conversao(args):
+    """Opções de conversão comuns aos comandos convert e watch"""
+    from cache_companhias import CACHE_DIR_PADRAO
+    from extrato_parquet import EXTRATOS_DIR_PADRAO
+
+    return {
+        'modo': args.modo,
+        'companhias': [c.strip().upper() for c in args.companhias.split(',')] if args.companhias else None,
+        'codigo_ts09': args.codigo_ts09.upper(),
+        'usar_cache': args.cache,
+        'cache_blocos': CACHE_DIR_PADRAO if args.cache else None,
+        'cache_extratos': EXTRATOS_DIR_PADRAO if args.cache else None,
+        'perfil': getattr(args, 'perfil', False),
+        'exportar': getattr(args, 'exportar', None),
+        'somente_operadora': getattr(args, 'operadora', False),
+        'janela': getattr(args, 'janela', None),
+    }
+
+def comando_convert(args):
+    """Conversão em lote com resumo JSON"""
+    from conversao_lote import converter_lote
+
+    if args.modo != "ALL_COMPANIES" and not args.companhias:
+        print("❌ Informe --companhias para os modos SINGLE e MULTIPLE")
+        return 2
+
+    opcoes = opcoes_conversao(args)
+    resumo_path = args.resumo or os.path.join(args.saida, 'resumo_conversao.json')
+    resumo = converter_lote(args.entradas, args.saida, opcoes, args.workers, resumo_path)
+    print(f"📁 Resumo: {resumo_path}")
+    return 1 if resumo['falhas'] else 0
+
+def comando_watch(args):
+    """Monitor de pasta: converte os arquivos que chegam na pasta de entrada"""
+    from monitor_pasta import monitorar_pasta
+
+    if args.modo != "ALL_COMPANIES" and not args.companhias:
+        print("❌ Informe --companhias para os modos SINGLE e MULTIPLE")
+        return 2
+
+    monitorar_pasta(args.entrada, args.saida, opcoes_conversao(args), args.workers, args.intervalo, args.espera)
+    return 0
+
+def comando_serve(args):
+    """Serviço HTTP de conversão com fila de jobs"""
+    import asyncio
+    from servico_http import servir
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.workers, args.fila, args.pasta, args.cache,
+                           args.retencao))
+    except KeyboardInterrupt:
+        print("⏹️  Serviço interrompido")
+    return 0
+
+def comando_memoria(args):
+    """Perfil de memória de uma conversão: pico por etapa e linhas que mais alocam"""
+    import contextlib
+    import io
+    from conversao_lote import conversor_do_formato
+    from deteccao_formato import detectar_formato
+    from perfil_memoria import converter_com_memoria, formatar_relatorio_memoria, salvar_relatorio_memoria
+
+    if args.modo != "ALL_COMPANIES" and not args.companhias:
+        print("❌ Informe --companhias para os modos SINGLE e MULTIPLE")
+        return 2
+
+    output_file = args.saida or os.path.splitext(os.path.basename(args.arquivo))[0] + '.ssim'
+    conversor, argumentos, extras = conversor_do_formato(args.arquivo, detectar_formato(args.arquivo),
+                                                         opcoes_conversao(args), output_file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        arquivo, relatorio = converter_com_memoria(conversor, *argumentos, top=args.top, quadros=args.quadros, **extras)
+    print(formatar_relatorio_memoria(relatorio))
+    if args.json:
+        salvar_relatorio_memoria(relatorio, args.json)
+        print(f"📁 Relatório: {args.json}")
+    return 0 if arquivo else 1
+
+def comando_benchmark(args):
+    """Benchmark dos conversores em planilhas sintéticas; sai com 1 se houver regressão frente ao baseline"""
+    from benchmark_conversores import (CASOS, carregar_resultados, comparar_com_baseline, executar_benchmark,
+                                       salvar_resultados)
+
+    if args.importacao:
+        return benchmark_importacao()
+
+    casos = [c.strip() for c in args.casos.split(',')] if args.casos else None
+    desconhecidos = [c for c in casos or [] if c not in CASOS]
+    if desconhecidos:
+        print(f"❌ Casos desconhecidos: {', '.join(desconhecidos)} (disponíveis: {', '.join(CASOS)})")
+        return 2
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',')]
+    resultados = executar_benchmark(tamanhos, casos, args.companhias, args.repeticoes, args.pasta, args.memoria)
+    if args.salvar:
+        salvar_resultados(resultados, args.salvar)
+        print(f"📁 Resultados: {args.salvar}")
+
+    if args.baseline:
+        regressoes = comparar_com_baseline(resultados, carregar_resultados(args.baseline), args.tolerancia)
+        for regressao in regressoes:
+            print(f"❌ Regressão: {regressao}")
+        if regressoes:
+            return 1
+        print("✅ Sem regressões frente ao baseline")
+    return 0
+
+def benchmark_importacao():
+    """Tempo de importação dos módulos leves; sai com 1 se algum carregar dependência pesada ou passar do limite"""
+    from benchmark_conversores import MODULOS_LEVES, medir_importacao, regressoes_importacao
+
+    medicoes = [medir_importacao(modulo) for modulo in MODULOS_LEVES]
+    for medicao in medicoes:
+        print(f"⏱️  {medicao['modulo']}: {medicao['segundos'] * 1000:.1f} ms")
+    regressoes = regressoes_importacao(medicoes)
+    for regressao in regressoes:
+        print(f"❌ Regressão: {regressao}")
+    if regressoes:
+        return 1
+    print("✅ Importações dentro do limite")
+    return 0
+
+def comando_validar(args):
+    """Validação da estrutura de um arquivo SSIM; sai com 1 se houver erros"""
+    from ssim_utils import validar_ssim
+
+    resultado = validar_ssim(args.arquivo)
+    print(f"📄 {args.arquivo}: {resultado['linhas']} linhas, {resultado['registros']} voos, "
+          f"{len(resultado['companhias'])} companhias")
+    for erro in resultado['erros']:
+        print(f"❌ {erro}")
+    if resultado['erros']:
+        return 1
+    print("✅ Arquivo SSIM válido")
+    return 0
+
+def comando_renumerar(args):
+    """Renumeração das linhas de um arquivo SSIM"""
+    from ssim_utils import renumerar_ssim
+
+    print(f"🔢 Arquivo renumerado: {renumerar_ssim(args.arquivo, args.saida)}")
+    return 0
+
+def comando_dividir(args):
+    """Divisão de um arquivo SSIM em um arquivo por companhia"""
+    from ssim_utils import dividir_ssim
+
+    companhias = [c.strip().upper() for c in args.companhias.split(',')] if args.companhias else None
+    arquivos = dividir_ssim(args.arquivo, args.saida, companhias)
+    if not arquivos:
+        print("❌ Nenhum voo das companhias selecionadas no arquivo")
+        return 1
+    for codigo, arquivo in arquivos.items():
+        print(f"✂️  {codigo}: {arquivo}")
+    return 0
+
+def adicionar_opcoes_conversao(subparser):
+    subparser.add_argument('--modo', choices=MODOS, default="ALL_COMPANIES", help="Modo para extratos CIRIUM")
+    subparser.add_argument('--companhias', help="Códigos IATA separados por vírgula (modos SINGLE/MULTIPLE)")
+    subparser.add_argument('--codigo-ts09', default="TS", help="Código IATA usado nos arquivos TS.09 (padrão: TS)")
+    subparser.add_argument('--cache', action='store_true', help="Reaproveitar conversões, blocos e planilhas lidas (Parquet) em cache (.ssim_cache)")
+    subparser.add_argument('--operadora', action='store_true',
+                           help="Extratos CIRIUM: só voos operados (companhia = Op Al), sem duplicatas de codeshare")
+    subparser.add_argument('--janela',
+                           help="Só os voos na janela de datas, recortados a ela: AAAA-MM-DD:AAAA-MM-DD ou N (próximos N dias)")
+    subparser.add_argument('--exportar', choices=('csv', 'parquet', 'jsonl'),
+                           help="Gravar também os registros tipo 3 em tabela (<arquivo>.csv/.parquet/.jsonl ao lado do SSIM)")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="siriumtossim", description="Conversor de malhas CIRIUM/SFO/TS.09 para SSIM")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {VERSION}")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    convert = subparsers.add_parser('convert', help="Converter arquivos em lote (formato detectado automaticamente)")
+    convert.add_argument('entradas', nargs='+', help="Arquivos, diretórios ou padrões glob")
+    convert.add_argument('-o', '--saida', default='ssim_output', help="Diretório de saída (padrão: ssim_output)")
+    convert.add_argument('-w', '--workers', type=int, default=None, help="Processos em paralelo (padrão: número de CPUs)")
+    adicionar_opcoes_conversao(convert)
+    convert.add_argument('--resumo', help="Arquivo do resumo JSON (padrão: <saida>/resumo_conversao.json)")
+    convert.add_argument('--perfil', action='store_true', help="Gravar o cProfile de cada conversão (<saida>/<arquivo>.prof)")
+    convert.set_defaults(func=comando_convert)
+
+    watch = subparsers.add_parser('watch', help="Monitorar uma pasta e converter os arquivos que chegarem")
+    watch.add_argument('entrada', help="Pasta monitorada")
+    watch.add_argument('-o', '--saida', default='ssim_output', help="Diretório de saída (padrão: ssim_output)")
+    watch.add_argument('-w', '--workers', type=int, default=2, help="Conversões simultâneas (padrão: 2)")
+    watch.add_argument('--intervalo', type=float, default=2.0, help="Segundos entre varreduras (padrão: 2)")
+    watch.add_argument('--espera', type=float, default=5.0,
+                       help="Segundos sem alteração antes de converter um arquivo (padrão: 5)")
+    adicionar_opcoes_conversao(watch)
+    watch.set_defaults(func=comando_watch)
+
+    serve = subparsers.add_parser('serve', help="Serviço HTTP de conversão (fila de jobs)")
+    serve.add_argument('--host', default="127.0.0.1", help="Endereço (padrão: 127.0.0.1)")
+    serve.add_argument('--porta', type=int, default=8080, help="Porta (padrão: 8080)")
+    serve.add_argument('-w', '--workers', type=int, default=2, help="Conversões simultâneas (padrão: 2)")
+    serve.add_argument('--fila', type=int, default=20, help="Jobs aguardando na fila antes de responder 503 (padrão: 20)")
+    serve.add_argument('--pasta', help="Pasta de trabalho dos jobs (padrão: temporária)")
+    serve.add_argument('--cache', help="Pasta dos caches de conversão (padrão: <pasta>/cache; use .ssim_cache para compartilhar com a CLI)")
+    serve.add_argument('--retencao', type=float, default=3600,
+                       help="Segundos que um job concluído fica disponível antes de ser apagado (padrão: 3600)")
+    serve.set_defaults(func=comando_serve)
+
+    memoria = subparsers.add_parser('memoria', help="Perfil de memória de uma conversão (tracemalloc por etapa + RSS)")
+    memoria.add_argument('arquivo', help="Extrato CIRIUM/SFO ou malha TS.09")
+    memoria.add_argument('-o', '--saida', help="Arquivo SSIM gerado (padrão: <arquivo>.ssim)")
+    adicionar_opcoes_conversao(memoria)
+    memoria.add_argument('--top', type=int, default=10, help="Linhas de maior alocação por etapa (padrão: 10)")
+    memoria.add_argument('--quadros', type=int, default=1,
+                         help="Quadros de pilha por alocação; >1 atribui às linhas do projeto, mas é bem mais lento (padrão: 1)")
+    memoria.add_argument('--json', help="Gravar o relatório em JSON")
+    memoria.set_defaults(func=comando_memoria)
+
+    benchmark = subparsers.add_parser('benchmark', help="Medir tempo e memória dos conversores em planilhas sintéticas")
+    benchmark.add_argument('--tamanhos', default="1000,10000,100000,500000",
+                           help="Linhas das planilhas sintéticas (padrão: 1000,10000,100000,500000)")
+    benchmark.add_argument('--casos', help="Conversores separados por vírgula (padrão: todos os gerar_ssim_*)")
+    benchmark.add_argument('--companhias', type=int, default=8, help="Companhias nas planilhas CIRIUM/SFO (padrão: 8)")
+    benchmark.add_argument('--repeticoes', type=int, default=3, help="Medições por caso (padrão: 3)")
+    benchmark.add_argument('--pasta', help="Pasta das planilhas sintéticas (padrão: temporária, reaproveitada)")
+    benchmark.add_argument('--baseline', help="JSON de um benchmark anterior para detectar regressões")
+    benchmark.add_argument('--salvar', help="Gravar os resultados em JSON")
+    benchmark.add_argument('--tolerancia', type=float, default=0.25,
+                           help="Aumento de tempo aceito frente ao baseline (padrão: 0.25 = 25%%)")
+    benchmark.add_argument('--memoria', action='store_true',
+                           help="Medir também o pico de memória por etapa (tracemalloc; deixa as medições mais lentas)")
+    benchmark.add_argument('--importacao', action='store_true',
+                           help="Medir só o tempo de importação dos módulos leves (SSIM e CLI, sem pandas/streamlit)")
+    benchmark.set_defaults(func=comando_benchmark)
+
+    validar = subparsers.add_parser('validar', help="Validar a estrutura de um arquivo SSIM (tamanho, numeração, registros)")
+    validar.add_argument('arquivo', help="Arquivo SSIM")
+    validar.set_defaults(func=comando_validar)
+
+    renumerar = subparsers.add_parser('renumerar', help="Refazer a numeração das linhas de um arquivo SSIM")
+    renumerar.add_argument('arquivo', help="Arquivo SSIM")
+    renumerar.add_argument('-o', '--saida', help="Arquivo renumerado (padrão: reescreve o arquivo)")
+    renumerar.set_defaults(func=comando_renumerar)
+
+    dividir = subparsers.add_parser('dividir', help="Dividir um arquivo SSIM em um arquivo por companhia")
+    dividir.add_argument('arquivo', help="Arquivo SSIM (ALL/MIX)")
+    dividir.add_argument('-o', '--saida', default='ssim_output', help="Pasta de saída (padrão: ssim_output)")
+    dividir.add_argument('--companhias', help="Códigos IATA separados por vírgula (padrão: todas)")
+    dividir.set_defaults(func=comando_dividir)
+
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
-import pandas as pd
-import streamlit as st
 from datetime import datetime, timedelta
 import os
 
+# pandas e streamlit são importados dentro das funções que os usam: os auxiliares de
+# formatação deste módulo ficam disponíveis sem carregar as dependências pesadas
+
 def ajustar_linha(line, comprimento=200):
     """Ajusta o comprimento da linha para exatamente 200 caracteres"""
     return line.ljust(comprimento)[:comprimento]
@@ -43,6 +44,8 @@ def format_timezone_offset(offset_str):
 
 def parse_datetime(date_str, time_str):
     """Converte data e hora do formato TS.09 para datetime"""
+    import pandas as pd
+
     try:
         # Formato esperado: '01SEP25' e '22:45'
         date_part = pd.to_datetime(date_str, format='%d%b%y')
@@ -65,6 +68,9 @@ def gerar_ssim_ts09(excel_path, codigo_iata, output_file=None):
     """
     Gera arquivo SSIM a partir do arquivo TS.09 com casamento correto de voos
     """
+    import pandas as pd
+    import streamlit as st
+
     try:
         # Ler o arquivo TS.09
         df = pd.read_excel(excel_path)
@@ -323,6 +329,9 @@ def gerar_ssim_ts09(excel_path, codigo_iata, output_file=None):
 
 # Interface Streamlit
 def main():
+    import pandas as pd
+    import streamlit as st
+
     st.set_page_config(
         page_title="Conversor SSIM TS.09", 
         page_icon="✈️",
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Comparação de arquivos SSIM - Dnata Brasil
+Identifica voos adicionados, removidos e alterados entre duas malhas (SSIM ou extratos CIRIUM)
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from ssim_layout import CAMPOS_TIPO3, escrever_ssim, prefixo_registro
+from ssim_utils import periodo_registros, registros_tipo3
+
+def chave_registro(linha):
+    """
+    Chave do registro tipo 3: companhia, voo, etapa e período
+    A variação de itinerário (contador de datas) fica fora, pois muda quando voos são inseridos
+    """
+    return (
+        linha[CAMPOS_TIPO3['companhia']].strip(),
+        linha[CAMPOS_TIPO3['voo']],
+        linha[CAMPOS_TIPO3['etapa']],
+        linha[CAMPOS_TIPO3['data_inicio']],
+        linha[CAMPOS_TIPO3['data_fim']],
+    )
+
+def hash_registro(linha):
+    """Hash dos demais campos do registro (sem chave, variação e número da linha, em qualquer layout)"""
+    conteudo = linha[CAMPOS_TIPO3['status']] + prefixo_registro(linha)[28:].rstrip()
+    return hashlib.blake2b(conteudo.encode('latin-1', 'replace'), digest_size=16).digest()
+
+def indexar_registros(ssim_path):
+    """
+    Lê os registros tipo 3 de um arquivo SSIM em uma tabela hash
+    Retorna dict: chave -> lista de (hash, linha)
+    """
+    indice = {}
+    for linha in registros_tipo3(ssim_path):
+        indice.setdefault(chave_registro(linha), []).append((hash_registro(linha), linha))
+    return indice
+
+def campos_alterados(linha_antiga, linha_nova):
+    """Lista os campos do registro tipo 3 que mudaram entre duas versões"""
+    linha_antiga = prefixo_registro(linha_antiga).ljust(200)
+    linha_nova = prefixo_registro(linha_nova).ljust(200)
+    return [
+        nome for nome, posicao in CAMPOS_TIPO3.items()
+        if nome not in ('variacao', 'serial') and linha_antiga[posicao] != linha_nova[posicao]
+    ]
+
+def comparar_ssim(ssim_antigo, ssim_novo):
+    """
+    Compara dois arquivos SSIM usando hash join (sem laços aninhados)
+    Retorna dict com 'adicionados', 'removidos', 'alterados' [(antiga, nova)] e 'inalterados'
+    """
+    antigos = indexar_registros(ssim_antigo)
+    novos = indexar_registros(ssim_novo)
+
+    adicionados = []
+    removidos = []
+    alterados = []
+    inalterados = 0
+
+    for chave, registros_novos in novos.items():
+        registros_antigos = antigos.pop(chave, None)
+        if not registros_antigos:
+            adicionados.extend(linha for _, linha in registros_novos)
+            continue
+
+        # Casar primeiro os registros idênticos (mesmo hash) dentro da mesma chave
+        pendentes_antigos = {}
+        for hash_antigo, linha in registros_antigos:
+            pendentes_antigos.setdefault(hash_antigo, []).append(linha)
+
+        sobras_novas = []
+        for hash_novo, linha in registros_novos:
+            iguais = pendentes_antigos.get(hash_novo)
+            if iguais:
+                iguais.pop()
+                inalterados += 1
+            else:
+                sobras_novas.append(linha)
+
+        sobras_antigas = [linha for linhas in pendentes_antigos.values() for linha in linhas]
+
+        # O que sobrou na mesma chave é alteração; o excedente é adição/remoção
+        pares = min(len(sobras_antigas), len(sobras_novas))
+        alterados.extend(zip(sobras_antigas[:pares], sobras_novas[:pares]))
+        removidos.extend(sobras_antigas[pares:])
+        adicionados.extend(sobras_novas[pares:])
+
+    # Chaves que só existem no arquivo antigo
+    for registros_antigos in antigos.values():
+        removidos.extend(linha for _, linha in registros_antigos)
+
+    return {
+        'adicionados': adicionados,
+        'removidos': removidos,
+        'alterados': alterados,
+        'inalterados': inalterados,
+    }
+
+def comparar_extracts(excel_antigo, excel_novo, companhias=None):
+    """
+    Compara dois extratos CIRIUM convertendo ambos para SSIM (todas ou algumas companhias)
+    """
+    from sirium_to_ssim_converter import gerar_ssim_todas_companias, gerar_ssim_multiplas_companias
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivos = []
+        for nome, excel_path in (('antigo', excel_antigo), ('novo', excel_novo)):
+            output_file = os.path.join(pasta, f"{nome}.ssim")
+            if companhias:
+                resultado = gerar_ssim_multiplas_companias(excel_path, companhias, output_file)
+            else:
+                resultado = gerar_ssim_todas_companias(excel_path, output_file)
+            if not resultado:
+                raise ValueError(f"Falha ao converter {excel_path} para SSIM")
+            arquivos.append(resultado)
+
+        return comparar_ssim(arquivos[0], arquivos[1])
+
+def gerar_ssim_delta(resultado, output_file):
+    """
+    Gera um SSIM apenas com os voos adicionados e alterados (versão nova)
+    Voos removidos não têm representação em SSIM e ficam apenas no relatório
+    """
+    linhas = resultado['adicionados'] + [nova for _, nova in resultado['alterados']]
+    linhas.sort(key=lambda linha: (chave_registro(linha), linha[CAMPOS_TIPO3['variacao']]))
+
+    companhias = sorted({linha[CAMPOS_TIPO3['companhia']].strip() for linha in linhas})
+    codigo = companhias[0] if len(companhias) == 1 else "ALL"
+
+    data_emissao = datetime.now().strftime("%d%b%y").upper()
+    data_min_str, data_max_str = periodo_registros(linhas) or (data_emissao, data_emissao)
+
+    separador = " " if codigo == "ALL" else "  "
+    with open(output_file, 'w') as file:
+        escrever_ssim(file, codigo, data_min_str, data_max_str, data_emissao,
+                      (prefixo_registro(linha) for linha in linhas), separador)
+
+    return output_file
+
+def resumo_diff(resultado):
+    """Imprime um resumo da comparação"""
+    print(f"➕ Adicionados: {len(resultado['adicionados'])}")
+    print(f"➖ Removidos: {len(resultado['removidos'])}")
+    print(f"✏️  Alterados: {len(resultado['alterados'])}")
+    print(f"✅ Inalterados: {resultado['inalterados']}")
+
+    for antiga, nova in resultado['alterados'][:20]:
+        companhia, voo = chave_registro(nova)[:2]
+        print(f"  {companhia}{voo.lstrip('0')}: {', '.join(campos_alterados(antiga, nova))}")
+
+def main():
+    """Uso: python ssim_diff.py <antigo> <novo> [delta.ssim]"""
+    if len(sys.argv) < 3:
+        print("Uso: python ssim_diff.py <antigo.ssim|xlsx> <novo.ssim|xlsx> [delta.ssim]")
+        return
+
+    antigo, novo = sys.argv[1], sys.argv[2]
+    if antigo.lower().endswith(('.xlsx', '.xls')):
+        resultado = comparar_extracts(antigo, novo)
+    else:
+        resultado = comparar_ssim(antigo, novo)
+
+    resumo_diff(resultado)
+
+    if len(sys.argv) > 3:
+        print(f"📝 SSIM delta: {gerar_ssim_delta(resultado, sys.argv[3])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Layout dos registros SSIM - Dnata Brasil
+Monta header (1), carrier (2U), zeros e footer (5) no mesmo formato dos conversores
+"""
+
+# Posições (0-based) dos campos do registro tipo 3
+CAMPOS_TIPO3 = {
+    'companhia': slice(2, 5),
+    'voo': slice(5, 9),
+    'variacao': slice(9, 11),
+    'etapa': slice(11, 13),
+    'status': slice(13, 14),
+    'data_inicio': slice(14, 21),
+    'data_fim': slice(21, 28),
+    'frequencia': slice(28, 35),
+    'origem': slice(36, 39),
+    'partida': slice(39, 47),
+    'origem_tz': slice(47, 52),
+    'destino': slice(54, 57),
+    'chegada': slice(57, 65),
+    'destino_tz': slice(65, 70),
+    'equipamento': slice(72, 75),
+    'operadora': slice(128, 130),
+    'marketing': slice(137, 144),
+    'proximo_voo': slice(144, 192),
+    'serial': slice(192, 200),
+}
+
+def linha_zeros():
+    """Linha de preenchimento com 200 zeros"""
+    return "0" * 200
+
+def linha_header(numero_linha=1):
+    """Linha 1 - header do arquivo SSIM"""
+    numero_linha_str = f"{numero_linha:08}"
+    linha_1_conteudo = "1AIRLINE STANDARD SCHEDULE DATA SET"
+    espacos_necessarios = 200 - len(linha_1_conteudo) - len(numero_linha_str)
+    return linha_1_conteudo + (' ' * espacos_necessarios) + numero_linha_str
+
+def linha_carrier(codigo, data_min_str, data_max_str, data_emissao, numero_linha, separador="  "):
+    """
+    Linha 2 - carrier record
+    O arquivo ALL usa um único espaço após o código ("2UALL 0008"), os demais usam dois
+    """
+    linha_2_conteudo = f"2U{codigo}{separador}0008    {data_min_str}{data_max_str}{data_emissao}Created by Capacity Dnata Brasil"
+    posicao_p = 72
+    espacos_antes_p = posicao_p - len(linha_2_conteudo) - 1
+    linha_2 = linha_2_conteudo + (' ' * espacos_antes_p) + 'P'
+
+    numero_linha_str = f" EN08{numero_linha:08}"
+    espacos_restantes = 200 - len(linha_2) - len(numero_linha_str)
+    return linha_2 + (' ' * espacos_restantes) + numero_linha_str
+
+def linha_footer(codigo, data_emissao, numero_linha):
+    """Linha 5 - footer com o número da última linha e do registro seguinte"""
+    numero_linha_str = f"{numero_linha + 1:06}"
+    linha_5_conteudo = f"5 {codigo} {data_emissao}"
+    numero_linha_str2 = f"{numero_linha:06}E"
+    espacos_necessarios = 200 - len(linha_5_conteudo) - len(numero_linha_str) - len(numero_linha_str2)
+    return linha_5_conteudo + (' ' * espacos_necessarios) + numero_linha_str2 + numero_linha_str
+
+def numerar_linha_voo(prefixo, numero_linha):
+    """Completa um registro tipo 3 (sem serial) com o número da linha"""
+    return (prefixo + f"{numero_linha:08}").ljust(200)
+
+def prefixo_registro(linha):
+    """
+    Registro tipo 3 sem o número da linha (inverso de numerar_linha_voo), no layout em que foi gravado:
+    o serial é o fim do registro (coluna 193 nos conversores CIRIUM/SFO, logo após a continuação no TS.09)
+    """
+    preenchida = linha.rstrip('\r\n ')
+    if preenchida[-8:].isdigit():
+        return preenchida[:-8]
+    return preenchida
+
+def escrever_ssim(file, codigo, data_min_str, data_max_str, data_emissao, linhas_voo, separador="  ", exportar=None):
+    """
+    Escreve um arquivo SSIM completo: header, carrier, registros tipo 3 e footer
+    linhas_voo: iterável de registros tipo 3 SEM o número da linha (serial)
+    exportar: callback opcional chamado com cada registro tipo 3 completo (ver exportacao)
+    Retorna o número de linhas escritas
+    """
+    numero_linha = 1
+    file.write(linha_header(numero_linha) + "\n")
+    numero_linha += 1
+
+    for _ in range(4):
+        file.write(linha_zeros() + "\n")
+        numero_linha += 1
+
+    file.write(linha_carrier(codigo, data_min_str, data_max_str, data_emissao, numero_linha, separador) + "\n")
+    numero_linha += 1
+
+    for _ in range(4):
+        file.write(linha_zeros() + "\n")
+        numero_linha += 1
+
+    for prefixo in linhas_voo:
+        registro = numerar_linha_voo(prefixo, numero_linha)
+        file.write(registro + "\n")
+        if exportar is not None:
+            exportar(registro)
+        numero_linha += 1
+
+    for _ in range(4):
+        file.write(linha_zeros() + "\n")
+        numero_linha += 1
+
+    file.write(linha_footer(codigo, data_emissao, numero_linha) + "\n")
+    return numero_linha
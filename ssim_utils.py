@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Operações sobre arquivos SSIM prontos - Dnata Brasil
+Leitura, validação, renumeração e divisão por companhia em Python puro (sem pandas/streamlit),
+para que os scripts e comandos que só tocam arquivos SSIM iniciem rápido
+"""
+
+import os
+from datetime import datetime
+
+from ssim_layout import CAMPOS_TIPO3, escrever_ssim, linha_zeros, numerar_linha_voo, prefixo_registro
+
+TAMANHO_REGISTRO = 200
+INICIO_HEADER = "1AIRLINE STANDARD SCHEDULE DATA SET"
+LIMITE_ERROS = 100
+
+# Posições do footer: número da última linha, 'E' e número do registro seguinte
+FOOTER_ULTIMA = slice(187, 193)
+FOOTER_SEGUINTE = slice(194, 200)
+
+def ler_linhas(ssim_path):
+    """Linhas do arquivo SSIM sem a quebra de linha, na ordem do arquivo"""
+    with open(ssim_path, 'r') as file:
+        for linha in file:
+            yield linha.rstrip('\r\n')
+
+def registros_tipo3(ssim_path):
+    """Registros tipo 3 (voos) completados para 200 caracteres"""
+    for linha in ler_linhas(ssim_path):
+        if linha.startswith('3'):
+            yield linha.ljust(TAMANHO_REGISTRO)
+
+def cabecalho_ssim(ssim_path):
+    """
+    Dados do carrier record (tipo 2): código, período e data de emissão
+    Retorna dict com 'codigo', 'data_min', 'data_max' e 'emissao' (None se o arquivo não tem registro tipo 2)
+    """
+    for linha in ler_linhas(ssim_path):
+        if linha.startswith('2U'):
+            inicio = linha.find('0008    ', 2)
+            if inicio < 0:
+                return None
+            datas = linha[inicio + 8:inicio + 29]
+            return {
+                'codigo': linha[2:inicio].strip(),
+                'data_min': datas[0:7],
+                'data_max': datas[7:14],
+                'emissao': datas[14:21],
+            }
+    return None
+
+def _data_ssim(texto):
+    return datetime.strptime(texto.title(), "%d%b%y")
+
+def periodo_registros(linhas):
+    """(menor data de início, maior data de fim) dos registros tipo 3 no formato SSIM; None sem registros"""
+    inicios = [_data_ssim(linha[CAMPOS_TIPO3['data_inicio']]) for linha in linhas]
+    fins = [_data_ssim(linha[CAMPOS_TIPO3['data_fim']]) for linha in linhas]
+    if not inicios:
+        return None
+    return min(inicios).strftime("%d%b%y").upper(), max(fins).strftime("%d%b%y").upper()
+
+def _erros_tipo3(linha):
+    """Campos inválidos de um registro tipo 3 (período e frequência)"""
+    erros = []
+    try:
+        inicio = _data_ssim(linha[CAMPOS_TIPO3['data_inicio']])
+        fim = _data_ssim(linha[CAMPOS_TIPO3['data_fim']])
+        if inicio > fim:
+            erros.append("período com início depois do fim")
+    except ValueError:
+        erros.append(f"período inválido '{linha[14:28]}'")
+
+    frequencia = linha[CAMPOS_TIPO3['frequencia']]
+    if frequencia.strip() == '' or any(dia not in (' ', str(i + 1)) for i, dia in enumerate(frequencia)):
+        erros.append(f"frequência inválida '{frequencia}'")
+    return erros
+
+def validar_ssim(ssim_path):
+    """
+    Confere a estrutura de um arquivo SSIM: tamanho das linhas, header, carrier, footer,
+    numeração sequencial e período/frequência dos registros tipo 3
+    Retorna dict com 'linhas', 'registros', 'companhias' {codigo: registros} e 'erros' (até LIMITE_ERROS)
+    """
+    resultado = {'linhas': 0, 'registros': 0, 'companhias': {}, 'erros': []}
+    erros = resultado['erros']
+    zeros = linha_zeros()
+    carriers = 0
+    ultima = ''
+
+    for numero_linha, linha in enumerate(ler_linhas(ssim_path), 1):
+        resultado['linhas'] = numero_linha
+        ultima = linha
+        problemas = []
+        if len(linha) != TAMANHO_REGISTRO:
+            problemas.append(f"{len(linha)} caracteres (esperado {TAMANHO_REGISTRO})")
+        tipo = linha[:1]
+
+        if numero_linha == 1 and not linha.startswith(INICIO_HEADER):
+            problemas.append("primeira linha não é o header (tipo 1)")
+        if tipo == '0':
+            if linha != zeros:
+                problemas.append("linha de preenchimento com caracteres diferentes de zero")
+        elif tipo in ('1', '2', '3'):
+            # No tipo 3 o serial é o fim do registro (antes da coluna 193 no layout TS.09)
+            serial = linha.rstrip()[-8:] if tipo == '3' else linha[CAMPOS_TIPO3['serial']]
+            if serial != f"{numero_linha:08}":
+                problemas.append(f"número da linha '{serial}' (esperado {numero_linha:08})")
+            if tipo == '2':
+                carriers += 1
+            if tipo == '3':
+                resultado['registros'] += 1
+                companhia = linha[CAMPOS_TIPO3['companhia']].strip()
+                resultado['companhias'][companhia] = resultado['companhias'].get(companhia, 0) + 1
+                problemas.extend(_erros_tipo3(linha.ljust(TAMANHO_REGISTRO)))
+        elif tipo == '5':
+            if linha[FOOTER_ULTIMA] != f"{numero_linha:06}" or linha[FOOTER_SEGUINTE] != f"{numero_linha + 1:06}":
+                problemas.append(f"footer com numeração '{linha[FOOTER_ULTIMA]}E{linha[FOOTER_SEGUINTE]}' "
+                                 f"(esperado {numero_linha:06}E{numero_linha + 1:06})")
+        else:
+            problemas.append(f"tipo de registro desconhecido '{tipo}'")
+
+        for problema in problemas:
+            if len(erros) < LIMITE_ERROS:
+                erros.append(f"linha {numero_linha}: {problema}")
+
+    if resultado['linhas'] == 0:
+        erros.append("arquivo vazio")
+    else:
+        if carriers != 1:
+            erros.append(f"{carriers} carrier records (tipo 2), esperado 1")
+        if not ultima.startswith('5'):
+            erros.append("última linha não é o footer (tipo 5)")
+    return resultado
+
+def renumerar_ssim(ssim_path, output_file=None):
+    """
+    Refaz a numeração das linhas (header, carrier, registros tipo 3 e footer), por exemplo depois de
+    editar ou juntar arquivos à mão, mantendo o layout dos registros (inclusive o do TS.09);
+    sem output_file o arquivo é reescrito no lugar
+    Retorna o caminho do arquivo renumerado
+    """
+    output_file = output_file or ssim_path
+    temporario = f"{output_file}.{os.getpid()}.tmp"
+    with open(temporario, 'w') as file:
+        for numero_linha, linha in enumerate(ler_linhas(ssim_path), 1):
+            linha = linha.ljust(TAMANHO_REGISTRO)[:TAMANHO_REGISTRO]
+            if linha[:1] == '3':
+                # Serial antigo trocado no lugar em que está (coluna 193, ou logo após a continuação no TS.09)
+                linha = numerar_linha_voo(prefixo_registro(linha), numero_linha)
+            elif linha[:1] in ('1', '2'):
+                linha = linha[:CAMPOS_TIPO3['serial'].start] + f"{numero_linha:08}"
+            elif linha[:1] == '5':
+                linha = linha[:FOOTER_ULTIMA.start] + f"{numero_linha:06}E{numero_linha + 1:06}"
+            file.write(linha + "\n")
+    os.replace(temporario, output_file)
+    return output_file
+
+def dividir_ssim(ssim_path, pasta, companhias=None):
+    """
+    Divide um arquivo SSIM (ALL/MIX) em um arquivo por companhia, com o período dos voos de cada uma
+    e a data de emissão do arquivo original; companhias limita a divisão a alguns códigos
+    Retorna dict {codigo: caminho}
+    """
+    cabecalho = cabecalho_ssim(ssim_path) or {}
+    data_emissao = cabecalho.get('emissao') or datetime.now().strftime("%d%b%y").upper()
+    data_emissao2 = datetime.now().strftime("%Y%m%d")
+    selecionadas = {c.strip().upper() for c in companhias} if companhias else None
+
+    por_companhia = {}
+    for linha in registros_tipo3(ssim_path):
+        codigo = linha[CAMPOS_TIPO3['companhia']].strip()
+        if selecionadas is None or codigo in selecionadas:
+            por_companhia.setdefault(codigo, []).append(linha)
+
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = {}
+    for codigo in sorted(por_companhia):
+        linhas = por_companhia[codigo]
+        data_min_str, data_max_str = periodo_registros(linhas)
+        output_file = os.path.join(pasta, f"{codigo} {data_emissao2} {data_min_str}-{data_max_str}.ssim")
+        with open(output_file, 'w') as file:
+            escrever_ssim(file, codigo, data_min_str, data_max_str, data_emissao,
+                          (prefixo_registro(linha) for linha in linhas))
+        arquivos[codigo] = output_file
+    return arquivos
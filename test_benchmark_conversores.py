@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Testes do gerador sintético e da comparação com o baseline do benchmark
+"""
+
+import pandas as pd
+
+from benchmark_conversores import comparar_com_baseline
+from deteccao_formato import detectar_formato
+from gerador_sintetico import gerar_cirium, gerar_sfo, gerar_ts09
+
+def test_planilhas_no_layout_real(tmp_path):
+    """Planilhas sintéticas são detectadas e lidas como os extratos reais"""
+    cirium = gerar_cirium(str(tmp_path / "cirium.xlsx"), 50, companhias=20)
+    sfo = gerar_sfo(str(tmp_path / "sfo.xlsx"), 50)
+    ts09 = gerar_ts09(str(tmp_path / "ts09.xlsx"), 50)
+
+    assert detectar_formato(cirium) == detectar_formato(sfo) == "CIRIUM"
+    assert detectar_formato(ts09) == "TS09"
+
+    df = pd.read_excel(cirium, header=4).dropna(subset=['Orig'])
+    assert len(df) == 50 and df['Mkt Al'].nunique() > 4
+    assert (pd.read_excel(sfo, header=4).dropna(subset=['Orig'])['Orig'] == 'SFO').all()
+    assert len(pd.read_excel(ts09)) == 50
+
+def test_regressoes_frente_ao_baseline():
+    def resultado(duracao, memoria, registros=100):
+        return {'resultados': {'gerar_ssim_ts09[1000]': {'duracao': duracao, 'memoria_pico_mb': memoria,
+                                                         'registros': registros}}}
+
+    baseline = resultado(1.0, 200.0)
+    assert comparar_com_baseline(resultado(1.1, 210.0), baseline) == []
+    assert len(comparar_com_baseline(resultado(1.5, 200.0), baseline)) == 1
+    assert len(comparar_com_baseline(resultado(1.0, 300.0, registros=99), baseline)) == 2
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Testes dos blocos pré-codificados do upload (montagem instantânea das seleções do app)
+"""
+
+import os
+
+import pandas as pd
+
+from blocos_upload import codificar_blocos, montar_ssim
+from cache_conversao import converter_modo
+from conversao_background import conversao_pre_codificada
+from extrato_parquet import ler_planilha
+from gerador_sintetico import gerar_cirium
+
+def extrato_sem_algumas_datas(tmp_path):
+    """Extrato sintético com linhas sem Eff Date/Disc Date (usam o período global de cada seleção)"""
+    df = pd.read_excel(gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 600, companhias=5), header=4)
+    df.loc[df.index[:60:4], 'Eff Date'] = None
+    df.loc[df.index[1:60:5], 'Disc Date'] = None
+    entrada = os.path.join(tmp_path, "c.csv")
+    df.to_csv(entrada, index=False)
+    return entrada
+
+def test_selecoes_iguais_ao_conversor(tmp_path):
+    entrada = extrato_sem_algumas_datas(tmp_path)
+    pre = codificar_blocos(ler_planilha(entrada))
+
+    for modo, companhias in [("ALL_COMPANIES", None), ("MULTIPLE", ['SQ', 'EK']), ("MULTIPLE", ['QF']), ("SINGLE", ['CZ'])]:
+        esperado = converter_modo(entrada, modo, companhias, os.path.join(tmp_path, "conversor.ssim"))
+        montado = montar_ssim(pre, modo, companhias, os.path.join(tmp_path, "blocos.ssim"))
+        with open(esperado) as a, open(montado) as b:
+            assert a.read() == b.read(), (modo, companhias)
+    assert montar_ssim(pre, "SINGLE", ['XX'], os.path.join(tmp_path, "vazio.ssim")) is None
+
+def test_job_pre_codificado(tmp_path):
+    """Job concluído com as linhas da seleção e as rejeitadas da limpeza"""
+    entrada = extrato_sem_algumas_datas(tmp_path)
+    pre = codificar_blocos(ler_planilha(entrada))
+    job = conversao_pre_codificada(pre, "MULTIPLE", ['SQ', 'EK'], os.path.join(tmp_path, "job.ssim"))
+
+    assert job['status'] == 'concluido' and os.path.exists(job['resultado'])
+    assert job['processadas'] == pre['linhas']['SQ'] + pre['linhas']['EK']
+    assert sum(job['motivos'].values()) == len(pre['rejeitadas']) > 0
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Testes da regeneração incremental por companhia (ALL_COMPANIES)
+"""
+
+import pandas as pd
+
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+
+def ler(path):
+    with open(path) as file:
+        return file.read()
+
+def test_regeneracao_incremental(tmp_path, extrato, capsys):
+    """Só a companhia alterada é recodificada e o arquivo final é idêntico ao gerado do zero"""
+    cache_dir = tmp_path / "cache"
+    gerar_ssim_todas_companias(extrato, str(tmp_path / "inicial.ssim"), cache_dir=str(cache_dir))
+    capsys.readouterr()
+
+    # Alterar o horário de um voo da EK (header na linha 5 → dados a partir da linha 6)
+    bruto = pd.read_excel(extrato, header=None)
+    cabecalho = list(bruto.iloc[4])
+    linha_ek = next(i for i in range(5, len(bruto)) if bruto.iat[i, cabecalho.index('Mkt Al')] == 'EK')
+    bruto.iat[linha_ek, cabecalho.index('Dep Time')] = '2359'
+    alterado = tmp_path / "alterado.xlsx"
+    bruto.to_excel(alterado, header=False, index=False)
+
+    incremental = gerar_ssim_todas_companias(str(alterado), str(tmp_path / "incremental.ssim"), cache_dir=str(cache_dir))
+    saida = capsys.readouterr().out
+    assert "Companhia EK processada" in saida
+    assert "Companhia CZ reutilizada do cache" in saida
+
+    completo = gerar_ssim_todas_companias(str(alterado), str(tmp_path / "completo.ssim"))
+    assert ler(incremental) == ler(completo)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Testes do cache persistente de conversões
+"""
+
+import os
+import shutil
+import time
+
+import cache_conversao
+from cache_conversao import converter_com_cache, limpar_cache
+from gerador_sintetico import gerar_cirium
+
+def ler(path):
+    with open(path) as file:
+        return file.read()
+
+def test_conversao_repetida_vem_do_cache(tmp_path, extrato, capsys):
+    """A segunda conversão com os mesmos parâmetros é servida do cache"""
+    cache_dir = str(tmp_path / "cache")
+    primeira = converter_com_cache(extrato, "MULTIPLE", ["EK", "CZ"], str(tmp_path / "a.ssim"), cache_dir=cache_dir)
+    capsys.readouterr()
+
+    segunda = converter_com_cache(extrato, "MULTIPLE", ["EK", "CZ"], str(tmp_path / "b.ssim"), cache_dir=cache_dir)
+    assert "reutilizada do cache" in capsys.readouterr().out
+    assert ler(primeira) == ler(segunda)
+
+    # Outra seleção de companhias é outra entrada
+    converter_com_cache(extrato, "SINGLE", ["EK"], str(tmp_path / "c.ssim"), cache_dir=cache_dir)
+    assert "reutilizada do cache" not in capsys.readouterr().out
+
+def test_airport_csv_alterado_invalida_o_cache(tmp_path, monkeypatch, capsys):
+    """Edição do airport.csv (fusos) com a mesma versão não reaproveita o SSIM antigo"""
+    entrada = gerar_cirium(str(tmp_path / "c.xlsx"), 50)
+    airports = tmp_path / "airport.csv"
+    shutil.copyfile(cache_conversao.ARQUIVO_AIRPORTS, airports)
+    monkeypatch.setattr(cache_conversao, 'ARQUIVO_AIRPORTS', str(airports))
+    cache_dir = str(tmp_path / "cache")
+
+    converter_com_cache(entrada, "ALL_COMPANIES", None, str(tmp_path / "a.ssim"), cache_dir=cache_dir)
+    converter_com_cache(entrada, "ALL_COMPANIES", None, str(tmp_path / "b.ssim"), cache_dir=cache_dir)
+    assert "reutilizada do cache" in capsys.readouterr().out
+
+    with open(airports, 'a') as file:
+        file.write("\n")
+    converter_com_cache(entrada, "ALL_COMPANIES", None, str(tmp_path / "c.ssim"), cache_dir=cache_dir)
+    assert "reutilizada do cache" not in capsys.readouterr().out
+
+def test_limpar_cache_lru(tmp_path):
+    """Entradas antigas saem por idade e as menos usadas saem por tamanho"""
+    agora = time.time()
+    for i, idade in enumerate((10, 20, 30, 10 * 24 * 3600)):
+        path = tmp_path / f"{i}.ssim"
+        path.write_text("x" * 100)
+        (tmp_path / f"{i}.json").write_text("{}")
+        os.utime(path, (agora - idade, agora - idade))
+
+    removidas = limpar_cache(str(tmp_path), tamanho_maximo=200, idade_maxima=7 * 24 * 3600)
+
+    assert removidas == 2
+    assert sorted(p.name for p in tmp_path.glob("*.ssim")) == ["0.ssim", "1.ssim"]
+    assert not (tmp_path / "3.json").exists()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Testes do modo só operadora (duplicatas de codeshare)
+"""
+
+import os
+
+import pandas as pd
+
+from codeshare import deduplicar_codeshare
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3
+
+def extrato_codeshare():
+    """QF 1 comercializado por EK e JL; EK 413 comercializado por JL; EK 412 sem codeshare"""
+    return pd.DataFrame({
+        'Mkt Al': ['EK', 'QF', 'JL', 'EK', 'JL', 'EK'],
+        'Op Al': ['QF', 'QF', 'QF', 'EK', 'EK', 'EK'],
+        'Orig': ['SYD', 'SYD', 'SYD', 'SYD', 'SYD', 'DXB'],
+        'Dest': ['MEL', 'MEL', 'MEL', 'DXB', 'DXB', 'SYD'],
+        'Flight': [5412, 1, 7001, 413, 7413, 412],
+        'Dep Time': [600, 600, 600, 2145, 2145, 930],
+        'Arr Time': [735, 735, 735, 515, 515, 610],
+        'Eff Date': ['2025-10-01'] * 6,
+        'Disc Date': ['2025-10-31'] * 6,
+        'Op Days': ['1234567'] * 6,
+    })
+
+def test_mantem_linha_da_operadora():
+    df_operado, parceiros, sem_operadora = deduplicar_codeshare(extrato_codeshare(), parceiros=True)
+    assert df_operado.index.tolist() == [1, 3, 5] and sem_operadora == 0
+    assert parceiros.set_index('voo')['parceiros'].to_dict() == {1: 'EK 5412, JL 7001', 413: 'JL 7413'}
+
+def test_descarta_etapa_sem_linha_da_operadora():
+    """Extrato filtrado por companhia comercial: sem a linha da QF, o voo não vira um 'QF 5412' inventado"""
+    extrato = extrato_codeshare()
+    df_operado, parceiros, sem_operadora = deduplicar_codeshare(extrato.iloc[[0]], parceiros=True)
+    assert len(df_operado) == 0 and len(parceiros) == 0 and sem_operadora == 1
+
+    df_operado, parceiros, sem_operadora = deduplicar_codeshare(extrato[extrato['Mkt Al'] != 'QF'], parceiros=True)
+    assert df_operado.index.tolist() == [3, 5] and sem_operadora == 2
+    assert parceiros.set_index('voo')['parceiros'].to_dict() == {413: 'JL 7413'}
+
+def test_conversao_so_operadora(tmp_path):
+    """ALL com companhia = operadora: 3 voos em vez de 6 e evento 'codeshare' com a redução"""
+    entrada = os.path.join(tmp_path, "codeshare.csv")
+    extrato_codeshare().to_csv(entrada, index=False)
+    eventos = []
+
+    normal = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"))
+    operado = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "op.ssim"), progresso=eventos.append,
+                                         somente_operadora=True)
+    with open(normal) as file:
+        assert sum(linha.startswith('3') for linha in file) == 6
+    with open(operado) as file:
+        voos = [linha for linha in file if linha.startswith('3')]
+    assert sorted(linha[CAMPOS_TIPO3['companhia']] + linha[CAMPOS_TIPO3['voo']] for linha in voos) == [
+        'EK 0412', 'EK 0413', 'QF 0001']
+
+    codeshare = next(evento for evento in eventos if evento['evento'] == 'codeshare')
+    assert (codeshare['linhas_entrada'], codeshare['linhas_saida'], codeshare['removidas']) == (6, 3, 3)
+    assert codeshare['reducao'] == 0.5 and len(codeshare['tabela']) == 2 and codeshare['sem_operadora'] == 0
+
+    # Só as linhas comercializadas pela EK: a etapa da QF sai e é reportada no evento
+    eventos.clear()
+    extrato_codeshare().query("`Mkt Al` == 'EK'").to_csv(entrada, index=False)
+    operado = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "op_ek.ssim"), progresso=eventos.append,
+                                         somente_operadora=True)
+    with open(operado) as file:
+        voos = [linha for linha in file if linha.startswith('3')]
+    assert sorted(linha[CAMPOS_TIPO3['companhia']] + linha[CAMPOS_TIPO3['voo']] for linha in voos) == [
+        'EK 0412', 'EK 0413']
+    codeshare = next(evento for evento in eventos if evento['evento'] == 'codeshare')
+    assert (codeshare['removidas'], codeshare['sem_operadora']) == (1, 1)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Testes da descoberta de companhias (códigos IATA e iata_airlines.csv)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from companhias import codigos_companhia, companhias_iata, descobrir_companhias
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3
+
+def test_codigos_e_nomes():
+    """Duas letras ou designador da lista; textos do rodapé, 'NA' e números ficam de fora"""
+    serie = pd.Series(['EK', 'cz ', 'G3', 'g3', 'Q9', 'NA', None, 413, np.nan, 'Use Data Loaded', 'ZZ', 'EK'])
+    assert codigos_companhia(serie).fillna('-').tolist() == [
+        'EK', 'CZ', 'G3', 'G3', '-', '-', '-', '-', '-', '-', 'ZZ', 'EK']
+
+    tabela = descobrir_companhias(serie)
+    assert tabela['codigo'].tolist() == ['CZ', 'EK', 'G3', 'ZZ']
+    assert tabela['linhas'].tolist() == [1, 2, 2, 1]
+    assert tabela.set_index('codigo')['nome'].to_dict() == {
+        'CZ': companhias_iata()['CZ'], 'EK': 'Emirates', 'G3': companhias_iata()['G3'], 'ZZ': ''}
+
+def test_all_inclui_designador_alfanumerico(tmp_path):
+    """Companhias com dígito no código (G3) e códigos com espaços entram no ALL"""
+    entrada = os.path.join(tmp_path, "c.csv")
+    pd.DataFrame({
+        'Mkt Al': ['EK', 'G3', ' g3', 'Schedule Weekly Extract Report'],
+        'Orig': ['DXB', 'GRU', 'GIG', None],
+        'Dest': ['GRU', 'GIG', 'GRU', None],
+        'Flight': [261, 1000, 1001, None],
+        'Eff Date': ['2025-10-01'] * 3 + [None],
+        'Disc Date': ['2025-10-31'] * 3 + [None],
+        'Op Days': ['1234567'] * 3 + [None],
+    }).to_csv(entrada, index=False)
+
+    saida = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"))
+    with open(saida) as file:
+        voos = [linha for linha in file if linha.startswith('3')]
+    assert [linha[CAMPOS_TIPO3['companhia']] + linha[CAMPOS_TIPO3['voo']] for linha in voos] == [
+        'EK 0261', 'G3 1000', 'G3 1001']
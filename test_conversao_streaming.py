@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Testes da conversão CIRIUM em streaming
+"""
+
+from conversao_streaming import gerar_ssim_streaming
+from sirium_to_ssim_converter import gerar_ssim_multiplas_companias, gerar_ssim_todas_companias
+
+def ler(path):
+    with open(path) as file:
+        return file.read()
+
+def test_streaming_igual_ao_conversor_completo(tmp_path, extrato):
+    """Blocos pequenos (vários runs em disco) geram o mesmo SSIM que a conversão em memória"""
+    todas = gerar_ssim_todas_companias(extrato, str(tmp_path / "all.ssim"))
+    streaming = gerar_ssim_streaming(extrato, output_file=str(tmp_path / "all_stream.ssim"), chunk_size=7)
+    assert ler(streaming) == ler(todas)
+
+    mix = gerar_ssim_multiplas_companias(extrato, ["EK", "CZ"], str(tmp_path / "mix.ssim"))
+    streaming = gerar_ssim_streaming(extrato, ["EK", "CZ"], str(tmp_path / "mix_stream.ssim"), chunk_size=5)
+    assert ler(streaming) == ler(mix)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Testes da detecção de formato pelos bytes iniciais e primeiras linhas
+"""
+
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+from deteccao_formato import detectar, tipo_arquivo
+from gerador_sintetico import gerar_cirium, gerar_ts09
+
+def test_detecta_e_reaproveita_planilha(tmp_path):
+    """Formato, linha do cabeçalho e planilha aberta reaproveitada pelo pandas"""
+    cirium = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 30)
+    ts09 = gerar_ts09(os.path.join(tmp_path, "t.xlsx"), 30)
+
+    with open(cirium, 'rb') as file:
+        deteccao = detectar(file.read())
+    assert (deteccao['formato'], deteccao['linha_cabecalho'], deteccao['tipo']) == ("CIRIUM", 4, 'xlsx')
+    assert deteccao['confianca'] == 1.0 and deteccao['candidatos']['TS09'] == 0.0
+    assert len(pd.read_excel(deteccao['excel'], header=deteccao['linha_cabecalho'])) >= 30
+
+    deteccao = detectar(ts09)
+    assert (deteccao['formato'], deteccao['linha_cabecalho']) == ("TS09", 0)
+    assert len(pd.read_excel(deteccao['excel'])) == 30
+
+def test_cabecalho_fora_do_lugar_e_nao_excel(tmp_path):
+    """Cabeçalho TS.09 deslocado perde confiança; arquivos que não são Excel nem são abertos"""
+    deslocado = os.path.join(tmp_path, "d.xlsx")
+    workbook = Workbook()
+    workbook.active.append(["Relatório"])
+    workbook.active.append(['Flight-Number', 'Onward Flight'])
+    workbook.save(deslocado)
+    deteccao = detectar(deslocado)
+    assert deteccao['formato'] == "UNKNOWN" and deteccao['candidatos']['TS09'] < 0.5
+
+    texto = os.path.join(tmp_path, "malha.xlsx")
+    with open(texto, 'w') as file:
+        file.write("Flight-Number,Onward Flight\n")
+    assert tipo_arquivo(texto) == (None, None)
+    assert detectar(texto)['excel'] is None
+
+def test_exportacoes_csv_e_parquet(tmp_path):
+    """CSV (pela extensão) e Parquet (pela assinatura) com o cabeçalho na primeira linha"""
+    df = pd.read_excel(gerar_ts09(os.path.join(tmp_path, "t.xlsx"), 30))
+    df.to_csv(os.path.join(tmp_path, "t.csv"), index=False)
+    df.to_parquet(os.path.join(tmp_path, "t.bin"))
+
+    deteccao = detectar(os.path.join(tmp_path, "t.csv"))
+    assert (deteccao['formato'], deteccao['linha_cabecalho'], deteccao['tipo']) == ("TS09", 0, 'csv')
+    assert deteccao['excel'] is None
+    with open(os.path.join(tmp_path, "t.csv"), 'rb') as file:
+        assert detectar(file.read(), nome="malha.csv")['formato'] == "TS09"
+    assert detectar(os.path.join(tmp_path, "t.bin"))['tipo'] == 'parquet'
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes da tabela canônica de etapas e do codificador único de registros tipo 3
+"""
+
+import os
+
+import pandas as pd
+
+from etapas_voo import FREQUENCIAS, interpretar_janela, recortar_periodo, registros_tipo3, tabela_etapas
+from gerador_sintetico import gerar_cirium
+from sfo_to_ssim_converter import gerar_ssim_sfo
+from sirium_to_ssim_converter import adaptar_cirium, gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3
+
+def campo(registro, nome):
+    return registro[CAMPOS_TIPO3[nome]]
+
+def test_adaptador_cirium_e_registros():
+    """Planilha CIRIUM → tabela tipada → registros nas posições do layout SSIM"""
+    df = pd.DataFrame({
+        'Mkt Al': ['EK', 'EK', 'EK'],
+        'Orig': ['syd ', 'SYD', 'DXB'],
+        'Dest': ['DXB', 'DXB', 'SYD'],
+        'Flight': [413.0, 413.0, 412.0],
+        'Seats': [354, 0, 354],
+        'Equip': ['388', 'B777', None],
+        'Dep Time': [600, '21:05', 45],
+        'Arr Time': [1430, 530, None],
+        'Eff Date': ['2025-10-01', '2025-10-08', None],
+        'Disc Date': ['2025-10-07', '2025-10-31', None],
+        'Op Days': ['1.3..67', '.2.....', None],
+    })
+    etapas = adaptar_cirium(df, 'EK', {'SYD': 10.0, 'DXB': 4.0})
+    assert etapas['dias'].tolist() == [0b1100101, 0b0000010, 0b1111111]
+    assert etapas['partida'].tolist() == [600, 2105, 45]
+    assert etapas['status'].tolist() == ['J', 'F', 'J']
+
+    registros = registros_tipo3(etapas, "01OCT25", "31OCT25")
+    assert [campo(r, 'voo') + campo(r, 'variacao') for r in registros] == ['041301', '041302', '041201']
+    assert campo(registros[0], 'frequencia') == '1 3  67'
+    assert campo(registros[0], 'origem') == 'SYD' and campo(registros[0], 'origem_tz') == '+1000'
+    assert campo(registros[1], 'equipamento') == '777' and campo(registros[1], 'status') == 'F'
+    # Sem data: período global
+    assert campo(registros[2], 'data_inicio') + campo(registros[2], 'data_fim') == '01OCT2531OCT25'
+    assert campo(registros[2], 'partida') == '00450045' and campo(registros[2], 'chegada') == '00000000'
+    assert {len(r) for r in registros} == {192}
+
+def test_continuacao_ts09():
+    """Bloco do voo seguinte (TS.09) mantém a posição dos arquivos TS.09"""
+    etapas = tabela_etapas(pd.RangeIndex(2), companhia='TS', voo=[100, 101], dias=[1, 2],
+                           origem=['YYZ', 'LGW'], destino=['LGW', 'YYZ'], proximo_voo=['101', ''],
+                           data_inicio=pd.to_datetime(['2025-09-01', '2025-09-02']),
+                           data_fim=pd.to_datetime(['2025-09-01', '2025-09-02']))
+    registros = registros_tipo3(etapas, "01SEP25", "02SEP25", continuacao=True)
+    assert registros[0][165:172] == 'TS  101' and registros[1][165:172] == 'TS     '
+    assert campo(registros[1], 'frequencia') == ' 2     '
+    assert {len(r) for r in registros} == {183}
+
+def test_sfo_gera_linhas_ssim(tmp_path, extrato):
+    """SFO usa o mesmo escritor: 200 colunas por linha e número da linha no fim do registro"""
+    saida = gerar_ssim_sfo(extrato, 'EK', str(tmp_path / "sfo.ssim"))
+    with open(saida) as file:
+        linhas = file.read().splitlines()
+    voos = [linha for linha in linhas if linha.startswith('3 ')]
+    assert voos and {len(linha) for linha in linhas} == {200}
+    assert all(campo(linha, 'serial').isdigit() for linha in voos)
+
+def test_recorte_pela_janela():
+    """Interseção com a janela: período recortado a dias de operação, dias que não ocorrem fora da máscara"""
+    etapas = tabela_etapas(pd.RangeIndex(5), voo=[1, 2, 3, 4, 5],
+                           data_inicio=pd.to_datetime(['2025-09-01', '2025-10-05', '2025-11-10', None, '2025-10-09']),
+                           data_fim=pd.to_datetime(['2025-12-31', '2025-10-20', '2025-11-30', None, '2025-10-09']),
+                           dias=[0b0000001, 0b1111111, 0b1111111, 0b1111111, 0b0001000])
+    # 08OCT25 é quarta: o voo 1 (só segundas) não opera na janela e o 3 está fora dela
+    recortadas = recortar_periodo(etapas, interpretar_janela('2025-10-08:2025-10-10'))
+    assert recortadas['voo'].tolist() == [2, 4, 5]
+    assert [FREQUENCIAS[dias] for dias in recortadas['dias']] == ['  345  ', '1234567', '   4   ']
+    assert recortadas['data_inicio'].dt.strftime('%d').fillna('').tolist() == ['08', '', '09']
+    assert recortadas['data_fim'].dt.strftime('%d').fillna('').tolist() == ['10', '', '09']
+
+    janela = recortar_periodo(etapas, interpretar_janela('2025-09-10:2025-09-20'))
+    assert janela['voo'].tolist() == [1, 4] and janela['data_inicio'].iloc[0] == pd.Timestamp('2025-09-15')
+    assert interpretar_janela(7, hoje='2025-10-01') == (pd.Timestamp('2025-10-01'), pd.Timestamp('2025-10-07'))
+
+def test_conversao_com_janela(tmp_path):
+    """Arquivo da janela menor, com cabeçalho e registros dentro dela"""
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 300)
+    completo = gerar_ssim_todas_companias(entrada, str(tmp_path / "all.ssim"))
+    curto = gerar_ssim_todas_companias(entrada, str(tmp_path / "curto.ssim"), janela=('2025-10-06', '2025-10-12'))
+    with open(curto) as file:
+        voos = [linha for linha in file if linha.startswith('3')]
+
+    inicios = pd.to_datetime([campo(linha, 'data_inicio').title() for linha in voos], format="%d%b%y")
+    fins = pd.to_datetime([campo(linha, 'data_fim').title() for linha in voos], format="%d%b%y")
+    assert voos and os.path.getsize(curto) < os.path.getsize(completo)
+    assert inicios.min() >= pd.Timestamp('2025-10-06') and fins.max() <= pd.Timestamp('2025-10-12')
+    assert all(inicio <= fim for inicio, fim in zip(inicios, fins))
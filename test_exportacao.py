@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Testes da exportação tabular dos registros tipo 3
+"""
+
+import os
+
+import pandas as pd
+
+from exportacao import tabela_registros
+from extrato_parquet import PARQUET_DISPONIVEL
+from gerador_sintetico import gerar_cirium, gerar_ts09
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3
+from ts09_to_ssim_converter import gerar_ssim_ts09
+
+def registros_ssim(path):
+    with open(path) as file:
+        return [linha.rstrip('\n') for linha in file if linha.startswith('3')]
+
+def test_exportacao_junto_com_ssim(tmp_path):
+    """CSV e JSON Lines na mesma passada do SSIM: uma linha por registro tipo 3, com o serial do arquivo"""
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 80)
+    saida = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"),
+                                       exportar_para=os.path.join(tmp_path, "all.csv"))
+    registros = registros_ssim(saida)
+    tabela = pd.read_csv(os.path.join(tmp_path, "all.csv"), dtype={'frequencia': str, 'partida': str})
+    assert len(tabela) == len(registros)
+    assert tabela['serial'].tolist() == [int(r[CAMPOS_TIPO3['serial']]) for r in registros]
+    assert tabela['frequencia'].tolist() == [r[CAMPOS_TIPO3['frequencia']] for r in registros]
+    assert tabela['partida'].tolist() == [r[CAMPOS_TIPO3['partida']][:4] for r in registros]
+
+    malha = gerar_ts09(os.path.join(tmp_path, "t.xlsx"), 40)
+    saida = gerar_ssim_ts09(malha, "TS", os.path.join(tmp_path, "ts.ssim"), exportar_para=os.path.join(tmp_path, "ts.jsonl"))
+    tabela = pd.read_json(os.path.join(tmp_path, "ts.jsonl"), lines=True, dtype=False)
+    esperada = tabela_registros(registros_ssim(saida))
+    for coluna in ('data_inicio', 'data_fim'):
+        esperada[coluna] = esperada[coluna].dt.strftime("%Y-%m-%d")
+    assert tabela.to_dict('records') == esperada.to_dict('records')
+    assert (tabela['proximo_voo'] != '').any()
+
+def test_colunas_tipadas_e_parquet(tmp_path):
+    """Registro CIRIUM e registro TS.09 (serial antes da coluna 193) viram colunas tipadas"""
+    cirium = ("3 EK 04130101J01OCT2531OCT251 3  67 SYD06000600+1000  DXB14301430+0400  388" + " " * 53
+              + "EK" + " " * 7 + "EK  413" + " " * 48 + "00000011")
+    ts09 = ("3 TS 01000101J01SEP2501SEP251       YYZ08000800-0500  LGW20002000+0100  332" + " " * 53
+            + "TS" + " " * 7 + "TS  100" + " " * 21 + "TS  101" + " " * 11 + "00000012").ljust(200)
+    tabela = tabela_registros([cirium, ts09])
+    assert tabela['serial'].tolist() == [11, 12] and tabela['voo'].tolist() == [413, 100]
+    assert tabela['proximo_voo'].tolist() == ['', '101']
+    assert tabela['data_inicio'].tolist() == [pd.Timestamp(2025, 10, 1), pd.Timestamp(2025, 9, 1)]
+    assert tabela['origem_tz'].tolist() == ['+1000', '-0500'] and tabela['equipamento'].tolist() == ['388', '332']
+
+    if PARQUET_DISPONIVEL:
+        entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 30)
+        saida = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"),
+                                           exportar_para=os.path.join(tmp_path, "all.parquet"))
+        pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(tmp_path, "all.parquet")),
+                                      tabela_registros(registros_ssim(saida)))
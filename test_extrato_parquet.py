@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Testes da cópia Parquet das planilhas lidas
+"""
+
+import os
+from datetime import datetime, time
+
+import pandas as pd
+import pytest
+
+from extrato_parquet import PARQUET_DISPONIVEL, carregar_extrato, ler_planilha, salvar_extrato
+from gerador_sintetico import gerar_cirium
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+
+pytestmark = pytest.mark.skipif(not PARQUET_DISPONIVEL, reason="pyarrow não instalado")
+
+def test_colunas_mistas_voltam_identicas(tmp_path):
+    """Números, textos do rodapé, datas, horas e vazios na mesma coluna voltam com o tipo original"""
+    df = pd.DataFrame({
+        'Flight': pd.Series([413, 'This Week', 7.5, None, float('nan'), datetime(2025, 10, 1), time(21, 5)], dtype=object),
+        'Orig': ['SYD', 'DXB', None, 'GRU', 'GIG', 'JFK', 'LHR'],
+        'Seats': [354.0, None, 0.0, 1.0, 2.0, 3.0, 4.0],
+    })
+    destino = os.path.join(tmp_path, "extrato.parquet")
+    assert salvar_extrato(df, destino)
+
+    lido = carregar_extrato(destino)
+    pd.testing.assert_frame_equal(lido, df)
+    assert [type(valor) for valor in lido['Flight']] == [type(valor) for valor in df['Flight']]
+
+def test_conversao_usa_copia_parquet(tmp_path, capsys):
+    """Segunda conversão do mesmo arquivo lê o Parquet e gera o mesmo SSIM"""
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 60)
+    cache = os.path.join(tmp_path, "extratos")
+
+    primeira = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "a.ssim"), cache_extrato=cache)
+    assert len(os.listdir(cache)) == 1
+    capsys.readouterr()
+    segunda = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "b.ssim"), cache_extrato=cache)
+    assert "cópia Parquet" in capsys.readouterr().out
+
+    with open(primeira) as a, open(segunda) as b:
+        assert a.read() == b.read()
+    pd.testing.assert_frame_equal(ler_planilha(entrada, header=4, cache_dir=cache), pd.read_excel(entrada, header=4))
+
+def test_entradas_csv_e_parquet(tmp_path):
+    """Exportações CSV/Parquet do extrato (cabeçalho na primeira linha) geram o mesmo SSIM do Excel"""
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 60)
+    df = pd.read_excel(entrada, header=4)
+    df.to_csv(os.path.join(tmp_path, "c.csv"), index=False)
+    df.assign(Flight=pd.to_numeric(df['Flight'], errors='coerce')).to_parquet(os.path.join(tmp_path, "c.parquet"))
+
+    saidas = []
+    for extensao in ('xlsx', 'csv', 'parquet'):
+        saida = gerar_ssim_todas_companias(os.path.join(tmp_path, f"c.{extensao}"), os.path.join(tmp_path, f"{extensao}.ssim"))
+        with open(saida) as file:
+            saidas.append(file.read())
+    assert saidas[0] == saidas[1] == saidas[2]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Testes do índice de estações e da conversão por estação
+"""
+
+import os
+
+import pandas as pd
+
+from gerador_sintetico import gerar_cirium
+from indice_estacoes import filtrar_estacoes, indexar_estacoes, posicoes_estacoes
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3
+
+def test_indice_igual_ao_filtro_direto():
+    df = pd.DataFrame({
+        'Orig': ['GRU', 'gig ', 'DXB', None, 'GRU', 'Use Data Loaded'],
+        'Dest': ['DXB', 'GRU', 'SYD', 'GRU', 'GIG', None],
+    }, index=range(10, 16))
+    indice = indexar_estacoes(df)
+    orig = df['Orig'].str.strip().str.upper()
+    dest = df['Dest'].str.strip().str.upper()
+
+    for estacoes, sentido, mascara in [
+        ('GRU', 'ambos', orig.eq('GRU') | dest.eq('GRU')),
+        (['gru', 'GIG'], 'origem', orig.isin(['GRU', 'GIG'])),
+        ('GIG,SYD', 'destino', dest.isin(['GIG', 'SYD'])),
+    ]:
+        assert filtrar_estacoes(df, estacoes, sentido, indice).index.tolist() == df.index[mascara.fillna(False)].tolist()
+    assert len(posicoes_estacoes(indice, ['XXX'])) == 0
+    assert filtrar_estacoes(df, None) is df
+
+    # Índice de outro extrato com o mesmo número de linhas não é reaproveitado
+    outro = df.assign(Orig=df['Orig'].iloc[::-1].to_numpy())
+    esperado = outro.index[outro['Orig'].str.strip().str.upper().eq('GRU').fillna(False)].tolist()
+    assert filtrar_estacoes(outro, 'GRU', 'origem', indice).index.tolist() == esperado
+
+def test_conversao_por_estacao(tmp_path):
+    """Só os voos que tocam a estação, com os mesmos registros da conversão completa"""
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 200)
+    eventos = []
+    completo = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"))
+    estacao = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "gru.ssim"), progresso=eventos.append,
+                                         estacoes=['GRU'], sentido_estacoes='origem')
+
+    def voos(path):
+        with open(path) as file:
+            return [linha[:CAMPOS_TIPO3['serial'].start] for linha in file if linha.startswith('3')]
+
+    esperados = [linha for linha in voos(completo) if linha[CAMPOS_TIPO3['origem']] == 'GRU']
+    assert esperados and voos(estacao) == esperados
+    evento = next(evento for evento in eventos if evento['evento'] == 'estacoes')
+    assert evento['estacoes'] == ['GRU'] and evento['linhas_saida'] < evento['linhas_entrada']
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Testes do monitor de pasta
+"""
+
+import os
+import shutil
+
+from monitor_pasta import ARQUIVO_ESTADO, monitorar_pasta
+
+def test_monitor_converte_uma_vez_por_conteudo(tmp_path, extrato):
+    """Arquivo novo é convertido; a mesma planilha com outro nome é ignorada pelo hash"""
+    entrada = tmp_path / "entrada"
+    saida = tmp_path / "saida"
+    entrada.mkdir()
+    shutil.copy(extrato, entrada / "semana_1.xlsx")
+
+    resultados = monitorar_pasta(str(entrada), str(saida), workers=1, intervalo=0.01, espera=0, ciclos=3)
+    assert [r['registros'] for r in resultados] == [35]
+    assert (saida / "semana_1.ssim").exists()
+    assert (saida / ARQUIVO_ESTADO).exists()
+    assert not os.listdir(saida / ".tmp")
+
+    shutil.copy(extrato, entrada / "copia.xlsx")
+    resultados = monitorar_pasta(str(entrada), str(saida), workers=1, intervalo=0.01, espera=0, ciclos=3)
+    assert resultados == []
+    assert not (saida / "copia.ssim").exists()
+
+def test_monitor_copias_na_mesma_varredura(tmp_path, extrato):
+    """Duas cópias do mesmo conteúdo estáveis ao mesmo tempo: uma conversão só, sem disputar a pasta temporária"""
+    entrada = tmp_path / "entrada"
+    saida = tmp_path / "saida"
+    entrada.mkdir()
+    shutil.copy(extrato, entrada / "a.xlsx")
+    shutil.copy(extrato, entrada / "b.xlsx")
+
+    resultados = monitorar_pasta(str(entrada), str(saida), workers=2, intervalo=0.01, espera=0, ciclos=3)
+    assert [(r['registros'], r['erro']) for r in resultados] == [(35, None)]
+    assert len([nome for nome in os.listdir(saida) if nome.endswith('.ssim')]) == 1
+    assert not os.listdir(saida / ".tmp")
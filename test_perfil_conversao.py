@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Testes do relatório de desempenho das conversões
+"""
+
+import os
+import pstats
+
+from perfil_conversao import converter_com_perfil
+from sirium_to_ssim_converter import gerar_ssim_multiplas_companias
+
+def test_relatorio_por_etapa_e_cprofile(tmp_path, extrato):
+    """Relatório com tempo por etapa, contagem de linhas e cProfile gravado"""
+    prof = str(tmp_path / "conversao.prof")
+    arquivo, relatorio = converter_com_perfil(gerar_ssim_multiplas_companias, extrato, ["EK", "CZ"],
+                                              str(tmp_path / "mix.ssim"), cprofile_path=prof)
+
+    assert arquivo == str(tmp_path / "mix.ssim")
+    assert list(relatorio['etapas']) == ['leitura', 'limpeza', 'referencias', 'codificacao', 'escrita']
+    assert all(dados['duracao'] >= 0 and dados['cpu'] >= 0 for dados in relatorio['etapas'].values())
+    assert relatorio['linhas_entrada'] > relatorio['linhas_saida'] > 0
+    assert relatorio['rejeitadas'] == relatorio['linhas_entrada'] - relatorio['etapas']['limpeza']['linhas']
+    assert relatorio['bytes'] == os.path.getsize(arquivo)
+    assert pstats.Stats(prof).total_calls > 0
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Testes do perfil de memória por etapa
+"""
+
+import tracemalloc
+
+from perfil_memoria import converter_com_memoria, memoria_por_linha
+from sirium_to_ssim_converter import gerar_ssim_multiplas_companias
+
+def test_pico_por_etapa(tmp_path, extrato):
+    """Pico de alocação e linhas de maior alocação registrados para cada etapa"""
+    arquivo, relatorio = converter_com_memoria(gerar_ssim_multiplas_companias, extrato, ["EK"],
+                                               str(tmp_path / "ek.ssim"), top=3)
+
+    assert arquivo == str(tmp_path / "ek.ssim")
+    assert list(relatorio['etapas']) == ['leitura', 'limpeza', 'referencias', 'codificacao', 'escrita']
+    assert relatorio['pico_mb'] == max(dados['pico_mb'] for dados in relatorio['etapas'].values())
+    assert relatorio['etapas'][relatorio['etapa_pico']]['pico_mb'] == relatorio['pico_mb']
+    assert all(len(dados['top']) <= 3 for dados in relatorio['etapas'].values())
+    assert not tracemalloc.is_tracing()
+
+def test_alocacao_atribuida_a_linha_do_projeto():
+    tracemalloc.start()
+    try:
+        blocos = [bytearray(1024 * 1024) for _ in range(3)]
+        por_linha = memoria_por_linha()
+    finally:
+        tracemalloc.stop()
+
+    linha, tamanho = max(por_linha.items(), key=lambda item: item[1])
+    assert linha.startswith('test_perfil_memoria.py:') and tamanho >= 3 * 1024 * 1024
+    assert len(blocos) == 3
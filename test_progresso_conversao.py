@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Testes dos eventos de progresso e do cancelamento das conversões
+"""
+
+import os
+
+import pytest
+
+from progresso_conversao import ConversaoCancelada, coletor_eventos
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ts09_to_ssim_converter import gerar_ssim_ts09
+
+def test_eventos_por_companhia(tmp_path, extrato):
+    """Um evento 'companhia' por companhia, com contagem acumulada até o total"""
+    eventos = []
+    gerar_ssim_todas_companias(extrato, str(tmp_path / "all.ssim"), progresso=eventos.append)
+
+    etapas = [e['etapa'] for e in eventos if e['evento'] == 'etapa_fim']
+    assert etapas == ['leitura', 'limpeza', 'referencias', 'codificacao', 'escrita']
+    assert eventos[-1]['evento'] == 'saida' and eventos[-1]['bytes'] == os.path.getsize(tmp_path / "all.ssim")
+
+    companhias = [e for e in eventos if e['evento'] == 'companhia']
+    assert [e['companhia'] for e in companhias] == sorted(e['companhia'] for e in companhias)
+    assert companhias[-1]['processadas'] == companhias[-1]['total']
+    assert sum(e['voos'] for e in companhias) == 35
+
+def test_cancelamento_interrompe_conversao(tmp_path, extrato):
+    """ConversaoCancelada levantada pelo callback atravessa o conversor"""
+    def cancelar(evento):
+        raise ConversaoCancelada()
+
+    with pytest.raises(ConversaoCancelada):
+        gerar_ssim_todas_companias(extrato, str(tmp_path / "all.ssim"), progresso=cancelar)
+
+def test_etapas_e_bytes_ts09(tmp_path, malha_ts09):
+    """TS.09 também emite etapas, contagem de linhas e bytes gravados"""
+    progresso, estatisticas = coletor_eventos()
+    saida = gerar_ssim_ts09(malha_ts09, "TS", str(tmp_path / "ts09.ssim"), progresso=progresso)
+
+    assert set(estatisticas['etapas']) == {'leitura', 'limpeza', 'referencias', 'codificacao', 'escrita'}
+    assert estatisticas['linhas'] == 926
+    assert estatisticas['bytes'] == os.path.getsize(saida)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Testes do resumo do extrato usado nas métricas do app
+"""
+
+import pandas as pd
+
+from resumo_upload import metricas_selecao, resumir_upload
+
+def test_resumo_igual_ao_calculo_direto():
+    """Métricas da seleção iguais às calculadas filtrando o DataFrame"""
+    df = pd.DataFrame({
+        'Mkt Al': ['EK', 'EK', 'CZ', 'cz ', 'QF', None, 'Use Data Loaded'],
+        'Flight': [1, 1, 1, 2, 7, None, None],
+        'Orig': ['SYD', 'SYD', 'SYD', 'CAN', 'SYD', None, None],
+        'Dest': ['DXB', 'DXB', 'CAN', 'SYD', 'AKL', None, None],
+        'Eff Date': ['2025-10-01', '2025-10-05', '2025-09-28', None, '2025-10-02', None, None],
+        'Disc Date': ['2025-10-20', '2025-11-01', '2025-10-10', None, '2025-10-03', None, None],
+    })
+    resumo = resumir_upload(df)
+
+    assert resumo['companhias'] == ['CZ', 'EK', 'QF']
+    assert resumo['voos_por_companhia'] == {'CZ': 2, 'EK': 2, 'QF': 1}
+    assert str(resumo['data_inicio']) == '2025-09-28' and str(resumo['data_fim']) == '2025-11-01'
+    assert metricas_selecao(resumo) == (7, df['Flight'].nunique(), len(df[['Orig', 'Dest']].drop_duplicates()))
+    assert metricas_selecao(resumo, ['EK', 'CZ']) == (4, 2, 3)
+    assert metricas_selecao(resumo, []) == (0, 0, 0)
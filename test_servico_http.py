@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Testes do serviço HTTP de conversão
+"""
+
+import asyncio
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+from servico_http import criar_servico, iniciar_servico, limpar_jobs, parar_servico
+
+def requisicao(url, dados=None):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=dados, method='POST' if dados else 'GET')) as resposta:
+            return resposta.status, resposta.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+def cenario(base, extrato):
+    with open(extrato, 'rb') as file:
+        status, corpo = requisicao(f"{base}/jobs?modo=MULTIPLE&companhias=EK,CZ&nome=semana.xlsx", file.read())
+    assert status == 202
+    job_id = json.loads(corpo)['id']
+
+    for _ in range(200):
+        status, corpo = requisicao(f"{base}/jobs/{job_id}")
+        if json.loads(corpo)['status'] in ('concluido', 'erro'):
+            break
+        time.sleep(0.05)
+    assert json.loads(corpo)['status'] == 'concluido'
+
+    status, ssim = requisicao(f"{base}/jobs/{job_id}/download")
+    assert status == 200
+    linhas = ssim.decode().splitlines()
+    assert linhas[0].startswith("1AIRLINE STANDARD SCHEDULE DATA SET")
+    assert all(len(linha) == 200 for linha in linhas)
+
+    assert requisicao(f"{base}/jobs/inexistente")[0] == 404
+    assert requisicao(f"{base}/jobs?modo=SINGLE", b"x")[0] == 400
+
+def test_servico_submit_status_download(tmp_path, extrato):
+    """Job MULTIPLE enviado, acompanhado e baixado pelo HTTP; os caches ficam na pasta informada"""
+    pasta_cache = os.path.join(tmp_path, "cache")
+
+    async def executar():
+        server, servico, tarefas = await iniciar_servico(porta=0, workers=1, fila_maxima=2,
+                                                         pasta_trabalho=os.path.join(tmp_path, "jobs"),
+                                                         pasta_cache=pasta_cache)
+        porta = server.sockets[0].getsockname()[1]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, cenario, f"http://127.0.0.1:{porta}", extrato)
+        finally:
+            await parar_servico(server, servico, tarefas)
+
+    asyncio.run(executar())
+    # Cache começa vazio, então a conversão foi feita de verdade e gravada só em pasta_cache
+    assert os.listdir(os.path.join(pasta_cache, "conversoes"))
+
+def test_limpar_jobs_remove_vencidos_e_excedentes(tmp_path):
+    """Jobs concluídos saem do dict e do disco após o prazo ou além do limite; os em andamento ficam"""
+    servico = criar_servico(workers=1, pasta_trabalho=str(tmp_path), retencao=60, maximo_concluidos=2)
+    servico['pool'].shutdown()
+    agora = time.time()
+    for job_id, fim in (('vencido', agora - 120), ('antigo', agora - 30), ('medio', agora - 20),
+                        ('recente', agora - 10), ('processando', None)):
+        pasta = os.path.join(tmp_path, job_id)
+        os.makedirs(pasta)
+        servico['jobs'][job_id] = {'id': job_id, 'pasta': pasta, 'fim': fim}
+
+    assert sorted(limpar_jobs(servico, agora)) == ['antigo', 'vencido']
+    assert sorted(servico['jobs']) == ['medio', 'processando', 'recente']
+    assert sorted(os.listdir(tmp_path)) == ['medio', 'processando', 'recente']
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes da linha de comando (conversão em lote)
+"""
+
+import json
+import os
+
+import pandas as pd
+
+import conversao_lote
+from conversao_lote import converter_arquivo
+from gerador_sintetico import gerar_cirium
+from siriumtossim import main
+
+def test_convert_lote_com_resumo(tmp_path, extrato, malha_ts09):
+    """Formatos detectados automaticamente, conversão em paralelo e resumo JSON por arquivo"""
+    saida = tmp_path / "saida"
+    codigo = main(['convert', extrato, malha_ts09, 'nao_existe.xlsx', '-o', str(saida), '-w', '2'])
+    assert codigo == 1
+
+    with open(saida / "resumo_conversao.json") as file:
+        resumo = json.load(file)
+    assert (resumo['total'], resumo['sucesso'], resumo['falhas']) == (3, 2, 1)
+
+    por_arquivo = {r['arquivo']: r for r in resumo['arquivos']}
+    assert por_arquivo[extrato]['formato'] == "CIRIUM"
+    assert por_arquivo[extrato]['registros'] == 35
+    assert por_arquivo[malha_ts09]['formato'] == "TS09"
+    assert por_arquivo['nao_existe.xlsx']['erro']
+
+def _converter_ou_encerrar(path, destino_dir, opcoes, nome=None):
+    """Simula um processo do pool que morre (falta de memória, segfault) no arquivo 'quebra'"""
+    if 'quebra' in os.path.basename(path):
+        os._exit(1)
+    return converter_arquivo(path, destino_dir, opcoes, nome)
+
+def test_saidas_unicas_para_nomes_repetidos(tmp_path):
+    """x.xlsx, x.csv e outra/x.xlsx não gravam o mesmo .ssim"""
+    os.makedirs(tmp_path / "a")
+    os.makedirs(tmp_path / "b")
+    gerar_cirium(str(tmp_path / "a" / "x.xlsx"), 40, companhias=2)
+    gerar_cirium(str(tmp_path / "b" / "x.xlsx"), 60, companhias=2, seed=1)
+    pd.read_excel(tmp_path / "a" / "x.xlsx", header=4).dropna(subset=['Orig']).head(20).to_csv(tmp_path / "a" / "x.csv", index=False)
+
+    saida = tmp_path / "saida"
+    assert main(['convert', str(tmp_path / "a"), str(tmp_path / "b" / "*.xlsx"), '-o', str(saida), '-w', '2']) == 0
+    with open(saida / "resumo_conversao.json") as file:
+        resumo = json.load(file)
+
+    saidas = [r['saida'] for r in resumo['arquivos']]
+    assert resumo['sucesso'] == 3 and len(set(saidas)) == 3
+    for r in resumo['arquivos']:
+        with open(r['saida']) as file:
+            assert sum(linha.startswith('3') for linha in file) == r['registros']
+    assert sorted(r['registros'] for r in resumo['arquivos']) == [20, 40, 60]
+
+def test_processo_encerrado_vira_falha_do_arquivo(tmp_path, monkeypatch):
+    """Um processo do pool que morre não interrompe o lote: o resumo é gravado com a falha"""
+    gerar_cirium(str(tmp_path / "quebra.xlsx"), 20)
+    monkeypatch.setattr(conversao_lote, 'converter_arquivo', _converter_ou_encerrar)
+
+    resumo_path = str(tmp_path / "resumo.json")
+    resumo = conversao_lote.converter_lote([str(tmp_path / "quebra.xlsx")], str(tmp_path / "saida"), workers=1,
+                                           resumo_path=resumo_path)
+    assert (resumo['total'], resumo['falhas']) == (1, 1)
+    assert 'interrompido' in resumo['arquivos'][0]['erro'] and os.path.exists(resumo_path)
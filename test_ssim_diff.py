@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Testes da comparação de arquivos SSIM
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+
+from ssim_diff import comparar_ssim, comparar_extracts, gerar_ssim_delta, campos_alterados
+from ssim_layout import escrever_ssim, prefixo_registro
+from ts09_to_ssim_converter import gerar_ssim_ts09
+
+def linha_voo(companhia, voo, variacao, inicio, fim, frequencia, origem, destino, partida):
+    """Monta um registro tipo 3 simplificado (sem número da linha)"""
+    linha = (
+        f"3 {companhia:<2} {voo:04d}{variacao:02d}01J{inicio}{fim}{frequencia} "
+        f"{origem}{partida}{partida}+0000  {destino}12001200+0000  789"
+    )
+    return linha.ljust(192)
+
+def escrever(path, linhas):
+    with open(path, 'w') as file:
+        escrever_ssim(file, "ALL", "01OCT25", "31OCT25", "01OCT25", linhas, " ")
+
+def test_comparar_ssim(tmp_path):
+    """Adicionados, removidos e alterados são identificados pela chave"""
+    antigo = [
+        linha_voo("EK", 413, 1, "01OCT25", "31OCT25", "1234567", "SYD", "DXB", "0600"),
+        linha_voo("EK", 415, 1, "01OCT25", "31OCT25", "1234567", "SYD", "DXB", "2100"),
+        linha_voo("CZ", 326, 1, "01OCT25", "31OCT25", "1 3 5 7", "SYD", "CAN", "1115"),
+    ]
+    novo = [
+        linha_voo("CZ", 302, 1, "01OCT25", "31OCT25", "123    ", "SYD", "CAN", "2200"),
+        linha_voo("CZ", 326, 2, "01OCT25", "31OCT25", "1 3 5 7", "SYD", "CAN", "1115"),
+        linha_voo("EK", 413, 1, "01OCT25", "31OCT25", "1234567", "SYD", "DXB", "0630"),
+    ]
+    escrever(tmp_path / "antigo.ssim", antigo)
+    escrever(tmp_path / "novo.ssim", novo)
+
+    resultado = comparar_ssim(tmp_path / "antigo.ssim", tmp_path / "novo.ssim")
+
+    assert resultado['inalterados'] == 1
+    assert [linha[5:9] for linha in resultado['adicionados']] == ["0302"]
+    assert [linha[5:9] for linha in resultado['removidos']] == ["0415"]
+    assert len(resultado['alterados']) == 1
+    antiga, nova = resultado['alterados'][0]
+    assert campos_alterados(antiga, nova) == ['partida']
+
+    delta = gerar_ssim_delta(resultado, tmp_path / "delta.ssim")
+    with open(delta) as file:
+        linhas = file.read().splitlines()
+    assert all(len(linha) == 200 for linha in linhas)
+    assert len([linha for linha in linhas if linha.startswith('3')]) == 2
+
+def test_ts09_serial_fora_da_comparacao(tmp_path, malha_ts09):
+    """No TS.09 o serial vem antes da coluna 193: uma etapa a menos é 1 removida, não centenas de alteradas"""
+    df = pd.read_excel(malha_ts09)
+    sem_primeira = tmp_path / "sem_primeira.xlsx"
+    df.iloc[1:].to_excel(sem_primeira, index=False)
+    df.loc[df.index[-1], 'Std-LT'] = '23:59' if df['Std-LT'].iloc[-1] != '23:59' else '00:01'
+    alterada = tmp_path / "alterada.xlsx"
+    df.to_excel(alterada, index=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        original = gerar_ssim_ts09(malha_ts09, "TS", str(tmp_path / "original.ssim"))
+        menor = gerar_ssim_ts09(str(sem_primeira), "TS", str(tmp_path / "menor.ssim"))
+        modificado = gerar_ssim_ts09(str(alterada), "TS", str(tmp_path / "modificado.ssim"))
+
+    resultado = comparar_ssim(original, menor)
+    assert (len(resultado['removidos']), len(resultado['adicionados']), len(resultado['alterados'])) == (1, 0, 0)
+
+    # Delta com a versão nova sem o serial antigo: um único número de linha por registro
+    resultado = comparar_ssim(original, modificado)
+    assert len(resultado['alterados']) == 1
+    antiga, nova = resultado['alterados'][0]
+    assert 'proximo_voo' not in campos_alterados(antiga, nova)
+    with open(gerar_ssim_delta(resultado, tmp_path / "delta.ssim")) as file:
+        voos = [(numero, linha) for numero, linha in enumerate(file.read().splitlines(), 1) if linha.startswith('3')]
+    assert len(voos) == 1
+    numero, linha = voos[0]
+    assert prefixo_registro(linha) == prefixo_registro(nova) and linha.rstrip().endswith(f"{numero:08}")
+
+def test_comparar_extracts(extrato, extrato_seguinte):
+    """Os extratos semanais de exemplo geram uma comparação consistente"""
+    resultado = comparar_extracts(extrato, extrato_seguinte)
+    total_novo = resultado['inalterados'] + len(resultado['adicionados']) + len(resultado['alterados'])
+    total_antigo = resultado['inalterados'] + len(resultado['removidos']) + len(resultado['alterados'])
+
+    assert total_novo == 28
+    assert total_antigo == 35
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Testes das operações sobre arquivos SSIM prontos e das importações dos módulos leves
+"""
+
+import contextlib
+import io
+import os
+
+from benchmark_conversores import MODULOS_LEVES, medir_importacao, regressoes_importacao
+from gerador_sintetico import gerar_cirium
+from sirium_to_ssim_converter import gerar_ssim_todas_companias
+from ssim_layout import CAMPOS_TIPO3, prefixo_registro
+from ssim_utils import cabecalho_ssim, dividir_ssim, registros_tipo3, renumerar_ssim, validar_ssim
+from ts09_to_ssim_converter import gerar_ssim_ts09
+
+def test_validar_renumerar_e_dividir(tmp_path):
+    entrada = gerar_cirium(os.path.join(tmp_path, "c.xlsx"), 300, companhias=4)
+    ssim = gerar_ssim_todas_companias(entrada, os.path.join(tmp_path, "all.ssim"))
+    resultado = validar_ssim(ssim)
+    assert resultado['erros'] == [] and resultado['registros'] == sum(resultado['companhias'].values()) > 0
+
+    # Um voo removido à mão quebra a numeração das linhas seguintes; a renumeração corrige
+    with open(ssim) as file:
+        linhas = file.readlines()
+    editado = os.path.join(tmp_path, "editado.ssim")
+    with open(editado, 'w') as file:
+        file.writelines(linhas[:10] + linhas[11:])
+    assert validar_ssim(editado)['erros']
+    assert validar_ssim(renumerar_ssim(editado))['erros'] == []
+
+    sem_serial = [linha[:CAMPOS_TIPO3['serial'].start] for linha in registros_tipo3(ssim)]
+    arquivos = dividir_ssim(ssim, os.path.join(tmp_path, "div"))
+    assert sorted(arquivos) == sorted(resultado['companhias'])
+    for codigo, arquivo in arquivos.items():
+        assert validar_ssim(arquivo)['erros'] == []
+        assert cabecalho_ssim(arquivo)['codigo'] == codigo
+        assert cabecalho_ssim(arquivo)['emissao'] == cabecalho_ssim(ssim)['emissao']
+        assert [linha[:CAMPOS_TIPO3['serial'].start] for linha in registros_tipo3(arquivo)] == [
+            linha for linha in sem_serial if linha[CAMPOS_TIPO3['companhia']].strip() == codigo]
+
+def test_renumerar_ts09(tmp_path, malha_ts09):
+    """No TS.09 o serial vem antes da coluna 193: a renumeração o troca no lugar, sem deixar dois seriais"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ssim = gerar_ssim_ts09(malha_ts09, "TS", os.path.join(tmp_path, "ts09.ssim"))
+    assert validar_ssim(ssim)['erros'] == []
+    with open(ssim) as file:
+        original = file.read()
+    with open(renumerar_ssim(ssim, os.path.join(tmp_path, "igual.ssim"))) as file:
+        assert file.read() == original
+
+    linhas = original.splitlines(keepends=True)
+    editado = os.path.join(tmp_path, "editado.ssim")
+    with open(editado, 'w') as file:
+        file.writelines(linhas[:10] + linhas[11:])
+    renumerado = renumerar_ssim(editado, os.path.join(tmp_path, "renumerado.ssim"))
+    assert validar_ssim(renumerado)['erros'] == []
+    assert [prefixo_registro(linha) for linha in registros_tipo3(renumerado)] == [
+        prefixo_registro(linha) for linha in registros_tipo3(ssim)][1:]
+    assert all(not prefixo_registro(linha).rstrip()[-8:].isdigit() for linha in registros_tipo3(renumerado))
+
+def test_importacao_sem_dependencias_pesadas():
+    """Módulos SSIM e a CLI iniciam sem pandas/numpy/streamlit (o tempo fica no benchmark --importacao)"""
+    assert regressoes_importacao([medir_importacao(modulo) for modulo in MODULOS_LEVES], limite=None) == []
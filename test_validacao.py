@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes da validação vetorizada e da tabela de linhas rejeitadas
+"""
+
+import numpy as np
+import pandas as pd
+
+from progresso_conversao import coletor_eventos
+from sirium_to_ssim_converter import gerar_ssim_multiplas_companias
+from validacao import LINHA_INICIAL_CIRIUM, resumo_rejeitadas, validar_cirium, validar_ts09
+
+def test_motivos_cirium():
+    """Cada linha inválida recebe o primeiro motivo aplicável e o número da linha na planilha"""
+    df = pd.DataFrame({
+        'Mkt Al': ['EK', 'EK', 'EK', None, 'EK', 'EK'],
+        'Flight': [1, 2, 'abc', None, 99999, 3],
+        'Orig': ['GRU', None, 'GRU', None, 'GRU', 'GRU'],
+        'Dest': ['DXB', 'DXB', 'DXB', np.nan, 'DXB', ' '],
+    })
+    validas, rejeitadas = validar_cirium(df)
+
+    assert validas.index.tolist() == [0]
+    assert rejeitadas['linha'].tolist() == [i + LINHA_INICIAL_CIRIUM for i in range(1, 6)]
+    assert rejeitadas['motivo'].tolist() == ['ORIG_AUSENTE', 'VOO_INVALIDO', 'SEM_ROTA', 'VOO_FORA_FAIXA', 'DEST_AUSENTE']
+    assert resumo_rejeitadas(rejeitadas)['ORIG_AUSENTE'] == 1
+
+def test_companhia_das_rejeitadas_so_operadora():
+    """No modo só operadora as rejeitadas levam a Op Al, a mesma coluna usada na conversão"""
+    df = pd.DataFrame({'Mkt Al': ['EK', 'JL'], 'Op Al': ['QF', 'EK'], 'Flight': [5412, 7413],
+                       'Orig': [None, 'SYD'], 'Dest': ['MEL', None]})
+    assert validar_cirium(df)[1]['companhia'].tolist() == ['EK', 'JL']
+    assert validar_cirium(df, somente_operadora=True)[1]['companhia'].tolist() == ['QF', 'EK']
+
+def test_motivos_ts09():
+    df = pd.DataFrame({
+        'Flight-Carrier': ['TS'] * 4,
+        'Flight-Number': [100, 101, 'X', 103],
+        'Route': ['YYZ / LIS', 'YYZ-LIS', 'YYZ / OPO', 'YYZ / FAO'],
+        'Week-Day-LT': [1, 2, 3, 9],
+    })
+    validas, rejeitadas = validar_ts09(df)
+
+    assert validas.index.tolist() == [0]
+    assert rejeitadas['motivo'].tolist() == ['ROTA_INVALIDA', 'VOO_INVALIDO', 'DIA_INVALIDO']
+    assert rejeitadas['orig'].tolist()[1:] == ['YYZ', 'YYZ']
+
+def test_rejeitadas_no_extrato(tmp_path, extrato):
+    """Rodapé e linhas em branco do extrato viram uma única tabela de rejeitadas"""
+    eventos = []
+    gerar_ssim_multiplas_companias(extrato, ['EK'], str(tmp_path / "ek.ssim"), progresso=eventos.append)
+    rejeicoes = [e for e in eventos if e['evento'] == 'rejeitadas']
+    assert len(rejeicoes) <= 1
+    for evento in rejeicoes:
+        assert evento['total'] == len(evento['tabela']) == sum(evento['motivos'].values())
+
+    coletar, estatisticas = coletor_eventos()
+    for evento in eventos:
+        coletar(evento)
+    assert estatisticas['rejeitadas'] == sum(e['total'] for e in rejeicoes)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Validação vetorizada das linhas de entrada - Dnata Brasil
+Identifica de uma vez as linhas que não geram registro SSIM e devolve uma tabela compacta
+de rejeitadas com o código do motivo, para o laço de formatação rodar sem exceções
+"""
+
+import numpy as np
+import pandas as pd
+
+from companhias import coluna_companhia
+from progresso_conversao import notificar
+
+MOTIVOS = {
+    'SEM_ROTA': "Linha sem Orig/Dest (linha em branco ou rodapé do relatório)",
+    'ORIG_AUSENTE': "Aeroporto de origem (Orig) ausente",
+    'DEST_AUSENTE': "Aeroporto de destino (Dest) ausente",
+    'VOO_INVALIDO': "Número de voo não numérico",
+    'VOO_FORA_FAIXA': "Número de voo fora da faixa 1-9999",
+    'ROTA_INVALIDA': "Rota fora do formato 'AAA / BBB'",
+    'DIA_INVALIDO': "Dia da semana inválido",
+    'ERRO_FORMATACAO': "Erro ao montar o registro",
+}
+
+# Cabeçalho na linha 5 do Excel CIRIUM: o índice 0 do DataFrame é a linha 6 da planilha
+LINHA_INICIAL_CIRIUM = 6
+LINHA_INICIAL_TS09 = 2
+
+COLUNAS_REJEITADAS = ['linha', 'motivo', 'companhia', 'voo', 'orig', 'dest']
+
+def _texto_preenchido(serie):
+    texto = serie.astype(str).str.strip()
+    return serie.notna() & (texto != '') & (texto != 'nan')
+
+def _tabela(df, mascaras, linha_inicial, colunas):
+    """Monta (mascara_validas, rejeitadas) a partir de uma lista ordenada de (motivo, mascara_invalida)"""
+    invalida = np.zeros(len(df), dtype=bool)
+    for _, mascara in mascaras:
+        invalida |= np.asarray(mascara, dtype=bool)
+
+    if not invalida.any():
+        return ~invalida, pd.DataFrame(columns=COLUNAS_REJEITADAS)
+
+    # Primeiro motivo que se aplica a cada linha
+    motivo = np.select([np.asarray(m, dtype=bool) for _, m in mascaras], [codigo for codigo, _ in mascaras], default='')
+    rejeitadas = pd.DataFrame({
+        'linha': np.asarray(df.index)[invalida] + linha_inicial,
+        'motivo': motivo[invalida],
+    })
+    for destino, origem in zip(COLUNAS_REJEITADAS[2:], colunas):
+        rejeitadas[destino] = df[origem].to_numpy()[invalida] if origem in df.columns else None
+    return ~invalida, rejeitadas
+
+def validar_cirium(df, linha_inicial=LINHA_INICIAL_CIRIUM, somente_operadora=False):
+    """
+    Valida extratos CIRIUM/SFO (colunas Orig, Dest, Flight)
+    somente_operadora: as rejeitadas levam a companhia operadora (mesma coluna do conversor)
+    Retorna (df_validas, rejeitadas)
+    """
+    tem_orig = _texto_preenchido(df['Orig'])
+    tem_dest = _texto_preenchido(df['Dest'])
+    mascaras = [
+        ('SEM_ROTA', ~tem_orig & ~tem_dest),
+        ('ORIG_AUSENTE', ~tem_orig),
+        ('DEST_AUSENTE', ~tem_dest),
+    ]
+    if 'Flight' in df.columns:
+        voo = pd.to_numeric(df['Flight'], errors='coerce')
+        mascaras.append(('VOO_INVALIDO', voo.isna()))
+        mascaras.append(('VOO_FORA_FAIXA', (voo < 1) | (voo > 9999)))
+
+    colunas = [coluna_companhia(df, somente_operadora), 'Flight', 'Orig', 'Dest']
+    validas, rejeitadas = _tabela(df, mascaras, linha_inicial, colunas)
+    return df[validas], rejeitadas
+
+def validar_ts09(df, linha_inicial=LINHA_INICIAL_TS09):
+    """
+    Valida malhas TS.09 (Flight-Number, Route 'AAA / BBB', Week-Day-LT)
+    Retorna (df_validas, rejeitadas)
+    """
+    rota = df['Route'].astype(str).str.split('/')
+    mascaras = [
+        ('VOO_INVALIDO', pd.to_numeric(df['Flight-Number'], errors='coerce').isna()),
+        ('ROTA_INVALIDA', df['Route'].isna() | (rota.str.len() != 2)),
+        ('DIA_INVALIDO', ~pd.to_numeric(df['Week-Day-LT'], errors='coerce').between(1, 7)),
+    ]
+    validas, rejeitadas = _tabela(df, mascaras, linha_inicial, ['Flight-Carrier', 'Flight-Number', 'Route', 'Route'])
+    if len(rejeitadas):
+        partes = rejeitadas['orig'].astype(str).str.split('/')
+        rejeitadas['orig'] = partes.str[0].str.strip()
+        rejeitadas['dest'] = partes.str[-1].str.strip()
+    return df[validas], rejeitadas
+
+def rejeicao_formatacao(linhas, companhia):
+    """Tabela de rejeitadas para os raros erros no laço de formatação: lista de (linha, voo, orig, dest)"""
+    return pd.DataFrame(
+        [(linha, 'ERRO_FORMATACAO', companhia, voo, orig, dest) for linha, voo, orig, dest in linhas],
+        columns=COLUNAS_REJEITADAS,
+    )
+
+def resumo_rejeitadas(rejeitadas):
+    """Contagem por motivo: {codigo: quantidade}"""
+    if rejeitadas is None or len(rejeitadas) == 0:
+        return {}
+    return {motivo: int(n) for motivo, n in rejeitadas['motivo'].value_counts().items()}
+
+def reportar_rejeitadas(progresso, rejeitadas, etapa):
+    """Imprime uma linha de resumo e envia o evento 'rejeitadas' (com a tabela) ao callback de progresso"""
+    if rejeitadas is None or len(rejeitadas) == 0:
+        return
+    motivos = resumo_rejeitadas(rejeitadas)
+    print(f"🚫 Linhas rejeitadas ({etapa}): {len(rejeitadas)} - " + ", ".join(f"{m}: {n}" for m, n in motivos.items()))
+    notificar(progresso, 'rejeitadas', etapa=etapa, total=len(rejeitadas), motivos=motivos, tabela=rejeitadas)